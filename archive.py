@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""Memory-mapped columnar archive of custom events (read-only).
+
+Layout: an 8-byte magic, a uint32 header length and a JSON header (settings,
+row count, byte order, section offsets), followed by 8-byte aligned sections:
+
+    times         int64[n]   target_dt as epoch seconds, sorted (rows are in time order)
+    location_ids  uint32[n]  index into the location table, 0 for no location
+    recurrence_ids uint32[n] index into the recurrence table, 0 for a one-off event
+    label_order   uint32[n]  row numbers sorted by lower-cased label
+    labels        string table, one entry per row (labels are unique)
+    locations     string table of the distinct locations, entry 0 is ""
+    recurrences   string table of RecurrenceRule.to_text() forms, entry 0 is ""
+
+A string table is uint64[m + 1] offsets followed by the UTF-8 blob. Opening an
+archive maps the file and decodes nothing; rows are built into event records only
+when a view or query reads them, and cached so they keep their identity.
+ArchiveStore exposes the same index attributes as EventStore, so the views in
+event_store work on it unchanged. A series is stored at the occurrence it was
+listed at when the archive was written; its rule comes back with the row.
+
+open_store() (sqlite_store.py) opens *.evarc files as an ArchiveStore, so the
+GUI and cli.py can browse an archive directly. It is read-only: adds and
+removes are refused (read_only is True), setting changes last only for the
+session, built-in holidays aren't listed, and series stay at the occurrence
+they were archived at (occurrences_between() still expands every occurrence).
+
+Convert with:  python archive.py to-archive event_tracker_data.json events.evarc
+               python archive.py to-json events.evarc event_tracker_data.json
+"""
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import json
+import mmap
+import os
+import struct
+import sys
+
+from recurrence import RecurrenceRule
+from event_store import (
+    EventStore, LabelOrderView, ClosestFirstView, WeekVersions, make_event, snapshot_data, write_json_atomic, merge_occurrences,
+    to_epoch_seconds, from_epoch_seconds,
+    DEFAULT_SETTINGS, SORT_ALPHA, SORT_ALPHA_REV, DEFAULT_SORT,
+)
+from journal import EventJournal
+
+
+ARCHIVE_MAGIC = b"EVTARC01"
+ARCHIVE_VERSION = 2
+_HEADER_LENGTH = struct.Struct('<I')
+
+
+# --- Writing ---
+
+def _interned_ids(strings):
+    """Returns (table, ids): the distinct strings (entry 0 is "") and each string's index in it."""
+    table = [""]; ids = {"": 0}; row_ids = array('I')
+    for string in strings:
+        if string not in ids: ids[string] = len(table); table.append(string)
+        row_ids.append(ids[string])
+    return table, row_ids
+
+def _string_table(strings):
+    """Returns (offsets bytes, blob bytes) for a list of strings."""
+    encoded = [s.encode('utf-8') for s in strings]
+    offsets = array('Q', [0]); total = 0
+    for data in encoded: total += len(data); offsets.append(total)
+    return offsets.tobytes(), b"".join(encoded)
+
+def write_archive(path, events, settings=None, journal_seq=0):
+    """Writes the custom events among events (plus settings) as an archive, atomically.
+
+    Returns the number of events written.
+    """
+    rows = sorted((ev for ev in events if ev['is_custom']), key=lambda ev: ev['target_dt'])
+    location_table, row_location_ids = _interned_ids(ev['location'] or "" for ev in rows)
+    recurrence_table, row_recurrence_ids = _interned_ids(ev['recurrence'].to_text() if ev.get('recurrence') else "" for ev in rows)
+    labels = [ev['label'] for ev in rows]
+    label_order = array('I', sorted(range(len(rows)), key=lambda row: labels[row].lower()))
+    label_offsets, label_blob = _string_table(labels)
+    location_offsets, location_blob = _string_table(location_table)
+    recurrence_offsets, recurrence_blob = _string_table(recurrence_table)
+    sections = [
+        ('times', array('q', [to_epoch_seconds(ev['target_dt']) for ev in rows]).tobytes()),
+        ('location_ids', row_location_ids.tobytes()),
+        ('recurrence_ids', row_recurrence_ids.tobytes()),
+        ('label_order', label_order.tobytes()),
+        ('label_offsets', label_offsets), ('label_blob', label_blob),
+        ('location_offsets', location_offsets), ('location_blob', location_blob),
+        ('recurrence_offsets', recurrence_offsets), ('recurrence_blob', recurrence_blob),
+    ]
+
+    # The header holds the section offsets, which depend on the header's own length: pad it to a fixed size
+    header = {"version": ARCHIVE_VERSION, "byteorder": sys.byteorder, "count": len(rows),
+              "settings": dict(settings or DEFAULT_SETTINGS), "journal_seq": journal_seq, "sections": {}}
+    header_size = len(json.dumps(header)) + 64 * len(sections) + 64
+    position = len(ARCHIVE_MAGIC) + _HEADER_LENGTH.size + header_size
+    for name, data in sections:
+        position = (position + 7) & ~7
+        header["sections"][name] = [position, len(data)]; position += len(data)
+    header_bytes = json.dumps(header).encode('utf-8').ljust(header_size)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(ARCHIVE_MAGIC); f.write(_HEADER_LENGTH.pack(header_size)); f.write(header_bytes)
+        for name, data in sections:
+            f.write(b"\0" * (header["sections"][name][0] - f.tell())); f.write(data)
+        f.flush(); os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return len(rows)
+
+
+# --- Reading ---
+
+class _LazyRows:
+    """Read-only sequence of length items where item i is decode(i), computed on access."""
+
+    def __init__(self, length, decode):
+        self.length = length; self.decode = decode
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice): return [self.decode(i) for i in range(*index.indices(self.length))]
+        if index < 0: index += self.length
+        if not 0 <= index < self.length: raise IndexError("archive row index out of range")
+        return self.decode(index)
+
+
+class ArchiveStore:
+    """Read-only, memory-mapped store with EventStore's query and view API.
+
+    ``events`` (label order), ``_index_times`` and ``_index_events`` (time
+    order) are lazy sequences over the mapped columns, so LabelOrderView and
+    ClosestFirstView read only the rows they show and bisect over the
+    timestamp column without decoding it. The edit methods exist so callers
+    needn't special-case the backend, but change nothing (check read_only).
+    """
+    read_only = True
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.journal_seq = 0
+        self.version = 0 # Never changes: the archive is read-only
+        self.week_versions = WeekVersions()
+        self._series_rows = None # Rows that hold a series, found on first use
+        self._mmap = None; self._views = []
+        self._rows = {} # row -> decoded event record, so a row keeps its identity
+        self._row_of = {} # id(event) -> row
+        self._by_tree_id = {}
+        self._count = 0
+        self.events = self._index_times = self._index_events = self._label_keys = _LazyRows(0, None)
+
+    def open(self):
+        """Maps the archive and reads its header. Returns the number of events. Raises OSError/ValueError."""
+        with open(self.filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0: raise ValueError(f"{self.filename} is empty")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mm = self._mmap
+        if mm[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC: self.close(); raise ValueError(f"{self.filename} is not an event archive")
+        header_start = len(ARCHIVE_MAGIC) + _HEADER_LENGTH.size
+        (header_size,) = _HEADER_LENGTH.unpack_from(mm, len(ARCHIVE_MAGIC))
+        header = json.loads(mm[header_start:header_start + header_size])
+        if header.get("version") != ARCHIVE_VERSION or header.get("byteorder") != sys.byteorder:
+            self.close(); raise ValueError(f"{self.filename}: unsupported archive version or byte order")
+        self.settings.update(header.get("settings", {}))
+        self.journal_seq = header.get("journal_seq", 0)
+        self._count = count = header["count"]
+        whole = memoryview(mm); self._views.append(whole)
+        def column(name, typecode):
+            offset, length = header["sections"][name]
+            view = whole[offset:offset + length].cast(typecode); self._views.append(view)
+            return view
+        self._times = column('times', 'q')
+        self._location_ids = column('location_ids', 'I')
+        self._recurrence_ids = column('recurrence_ids', 'I')
+        self._label_order = column('label_order', 'I')
+        self._label_offsets = column('label_offsets', 'Q')
+        self._location_offsets = column('location_offsets', 'Q')
+        self._recurrence_offsets = column('recurrence_offsets', 'Q')
+        self._label_blob = header["sections"]['label_blob'][0]
+        self._location_blob = header["sections"]['location_blob'][0]
+        self._recurrence_blob = header["sections"]['recurrence_blob'][0]
+        self._locations = {} # Interned: location id -> str, decoded once
+        self._recurrences = {} # recurrence id -> RecurrenceRule, parsed once
+
+        label_order = self._label_order
+        self.events = _LazyRows(count, lambda i: self.row(label_order[i]))
+        self._label_keys = _LazyRows(count, lambda i: self._label(label_order[i]).lower())
+        self._index_times = _LazyRows(count, lambda row: from_epoch_seconds(self._times[row]))
+        self._index_events = _LazyRows(count, self.row)
+        return count
+
+    def load(self, filename=None):
+        """Same as open(), under EventStore's name."""
+        return self.open()
+
+    def exists(self, filename=None):
+        return os.path.exists(filename or self.filename)
+
+    def close(self):
+        for view in reversed(self._views): view.release()
+        self._views = []
+        if self._mmap is not None: self._mmap.close(); self._mmap = None
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return (self.events[i] for i in range(self._count))
+
+    # --- Row Decoding ---
+
+    def _label(self, row):
+        start = self._label_blob + self._label_offsets[row]; end = self._label_blob + self._label_offsets[row + 1]
+        return self._mmap[start:end].decode('utf-8')
+
+    def _location(self, location_id):
+        if not location_id: return None
+        location = self._locations.get(location_id)
+        if location is None:
+            start = self._location_blob + self._location_offsets[location_id]
+            end = self._location_blob + self._location_offsets[location_id + 1]
+            location = self._locations[location_id] = self._mmap[start:end].decode('utf-8')
+        return location
+
+    def _recurrence(self, recurrence_id):
+        if not recurrence_id: return None
+        recurrence = self._recurrences.get(recurrence_id)
+        if recurrence is None:
+            start = self._recurrence_blob + self._recurrence_offsets[recurrence_id]
+            end = self._recurrence_blob + self._recurrence_offsets[recurrence_id + 1]
+            recurrence = self._recurrences[recurrence_id] = RecurrenceRule.from_text(self._mmap[start:end].decode('utf-8'))
+        return recurrence
+
+    def row(self, row):
+        """The event record for a row (time order), decoded on first access."""
+        event = self._rows.get(row)
+        if event is None:
+            event = make_event(self._label(row), from_epoch_seconds(self._times[row]),
+                               location=self._location(self._location_ids[row]), is_custom=True,
+                               recurrence=self._recurrence(self._recurrence_ids[row]))
+            self._rows[row] = event; self._row_of[id(event)] = row
+        return event
+
+    # --- Lookups ---
+
+    def find_by_label(self, label):
+        """Returns the event whose label matches case-insensitively, or None (binary search)."""
+        label_key = label.lower(); identity_key = label.casefold()
+        position = bisect_left(self._label_keys, label_key)
+        while position < self._count and self._label_keys[position] == label_key:
+            event = self.events[position]
+            if event['label'].casefold() == identity_key: return event
+            position += 1
+        return None
+
+    def find_by_tree_id(self, tree_id):
+        return self._by_tree_id.get(tree_id)
+
+    def set_tree_id(self, event, tree_id):
+        """Records which front-end row (if any) shows event."""
+        old_tree_id = event['tree_id']
+        if old_tree_id is not None and self._by_tree_id.get(old_tree_id) is event: del self._by_tree_id[old_tree_id]
+        event['tree_id'] = tree_id
+        if tree_id is not None: self._by_tree_id[tree_id] = event
+
+    def _time_position(self, event):
+        return self._row_of.get(id(event))
+
+    def _label_position(self, event):
+        row = self._row_of.get(id(event))
+        if row is None: return None
+        label_key = event['label'].lower()
+        position = bisect_left(self._label_keys, label_key)
+        while position < self._count and self._label_order[position] != row: position += 1
+        return position if position < self._count else None
+
+    # --- Queries ---
+
+    def events_between(self, start_dt, end_dt):
+        """Returns the events with start_dt <= target_dt < end_dt, in time order."""
+        start = bisect_left(self._times, to_epoch_seconds(start_dt))
+        end = bisect_left(self._times, to_epoch_seconds(end_dt), start)
+        return self._index_events[start:end]
+
+    def events_on(self, day):
+        """Returns the events on the given date, in time order."""
+        day_start = datetime.combine(day, datetime.min.time())
+        return self.events_between(day_start, day_start + timedelta(days=1))
+
+    def _series(self):
+        if self._series_rows is None: self._series_rows = [row for row, recurrence_id in enumerate(self._recurrence_ids) if recurrence_id]
+        return [self.row(row) for row in self._series_rows]
+
+    def occurrences_between(self, start_dt, end_dt):
+        """Like events_between(), but with every occurrence of each series in the window (as copies)."""
+        return merge_occurrences(self.events_between(start_dt, end_dt), self._series(), start_dt, end_dt)
+
+    def occurrences_on(self, day):
+        """Events and series occurrences on the given date, in time order."""
+        day_start = datetime.combine(day, datetime.min.time())
+        return self.occurrences_between(day_start, day_start + timedelta(days=1))
+
+    def event_dates(self):
+        """Returns the set of dates that have at least one event (from the timestamp column alone)."""
+        return {from_epoch_seconds(day * 86400).date() for day in {seconds // 86400 for seconds in self._times}}
+
+    def view(self, sort_method=DEFAULT_SORT):
+        """Returns a read-only sequence of the events in one of the SORT_OPTIONS orders."""
+        if sort_method == SORT_ALPHA: return LabelOrderView(self)
+        if sort_method == SORT_ALPHA_REV: return LabelOrderView(self, reverse=True)
+        return ClosestFirstView(self)
+
+    # --- Edits (read-only: none of these change anything) ---
+
+    def add(self, label, target_dt, location=None, is_custom=False, recurrence=None):
+        return None
+
+    def add_many(self, new_events):
+        return 0
+
+    def remove(self, events_to_remove):
+        return 0
+
+    def add_builtin_events(self):
+        return 0
+
+    def move(self, event, target_dt):
+        return False
+
+    def advance_series(self, now=None):
+        return []
+
+    # --- Persistence ---
+
+    def reset_settings(self):
+        self.settings.clear(); self.settings.update(DEFAULT_SETTINGS)
+
+    def to_dict(self):
+        """Returns the JSON save layout (decodes every row)."""
+        return snapshot_data(self, self.settings, self.journal_seq)
+
+    def save(self, filename=None):
+        """Writes nothing (the archive is read-only). Returns the number of events."""
+        return self._count
+
+
+# --- Converters ---
+
+def json_to_archive(json_path, archive_path):
+    """Converts a JSON save file, plus the edits still only in its journal, to an archive. Returns the number of events written."""
+    store = EventStore(json_path)
+    if store.exists(): store.load()
+    journal = EventJournal(store); journal.replay()
+    return write_archive(archive_path, store.events, store.settings, journal.seq)
+
+def archive_to_json(archive_path, json_path):
+    """Converts an archive back to the JSON save layout. Returns the number of events written."""
+    archive = ArchiveStore(archive_path); archive.open()
+    try:
+        data = archive.to_dict()
+        write_json_atomic(json_path, data)
+        return len(data["events"])
+    finally: archive.close()
+
+
+if __name__ == "__main__":
+    converters = {"to-archive": json_to_archive, "to-json": archive_to_json}
+    if len(sys.argv) != 4 or sys.argv[1] not in converters:
+        print(f"Usage: {sys.argv[0]} to-archive|to-json SOURCE DESTINATION"); sys.exit(2)
+    converted_count = converters[sys.argv[1]](sys.argv[2], sys.argv[3])
+    print(f"Converted {converted_count} events.")
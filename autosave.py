@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Debounced background autosave.
+
+Edits are already durable in the journal the moment they happen; autosave
+folds them into the snapshot file once a burst of edits has settled, so the
+journal stays short and startup replays little. The snapshot is taken on the
+Tk thread (a list copy), while serializing, fsync and the atomic rename over
+the save file run on the journal's compaction thread.
+"""
+import tkinter as tk
+
+
+AUTOSAVE_DELAY_MS = 2000 # Quiet period after the last edit before saving
+
+
+class AutosaveService:
+    """Coalesces edits and compacts the journal once no edit has arrived for delay_ms."""
+
+    def __init__(self, root, journal, delay_ms=AUTOSAVE_DELAY_MS):
+        self.root = root; self.journal = journal
+        self.delay_ms = delay_ms
+        self._job = None
+
+    def notify(self):
+        """Call after every edit; restarts the debounce window."""
+        if self._job is not None:
+            try: self.root.after_cancel(self._job)
+            except tk.TclError: pass
+        try: self._job = self.root.after(self.delay_ms, self._save)
+        except tk.TclError: self._job = None # Root destroyed
+
+    def pending(self):
+        """True if there are edits the snapshot file does not include yet."""
+        return self.journal.seq > self.journal.store.journal_seq
+
+    def _save(self):
+        self._job = None
+        if self.pending(): self.journal.compact_async()
+
+    def close(self):
+        """Cancels the debounce and waits for a running save; unsaved edits stay in the journal."""
+        if self._job is not None:
+            try: self.root.after_cancel(self._job)
+            except tk.TclError: pass
+            self._job = None
+        self.journal.wait()
+        self.journal.close()
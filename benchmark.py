@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for the core hot paths, on synthetic stores of 10^3 to 10^6 events.
+
+    python benchmark.py                          # 10^3, 10^4, 10^5 events
+    python benchmark.py --sizes 1000000          # one size only
+    python benchmark.py --save-baseline          # store these results as the baseline
+    python benchmark.py --tolerance 0.2          # fail if anything is >20% slower than the baseline
+
+Events come from generate_events(), a seeded generator, so every run (and
+every machine) benchmarks the same data; the past/future mix, the share
+with a location and the label lengths are options. Only GUI-free code is
+measured: the helpers each Event List row uses, reading the three sort
+orders the way the virtual list does, week and day queries, a JSON
+save/load round trip, and the countdown work of update_display() ticks.
+--memory instead reports what the event records themselves take, per
+event and per million events, as Event records and as the plain dicts
+earlier versions used.
+
+Results are written as JSON (--output). When a baseline file exists the
+results are compared against it and the run exits with status 1 if any
+benchmark's best time got more than --tolerance slower. Baselines are
+machine-specific: record one per machine with --save-baseline.
+"""
+import argparse
+from datetime import datetime, timedelta
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+from time import perf_counter
+import tracemalloc
+
+from countdown import RefreshScheduler
+from countdown_array import CountdownArray, NUMPY_AVAILABLE
+from event_store import (
+    EventStore, ClosestFirstView, make_event, get_week_start, format_timedelta, calculate_indicator_symbol,
+    SORT_OPTIONS, write_json_atomic,
+)
+
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_SEED = 2024
+BENCH_NOW = datetime(2025, 6, 16, 12, 0, 0) # Fixed "now" the events are spread around
+SPAN_DAYS = 3650 # Events fall within this many days either side of BENCH_NOW
+LIST_WINDOW_ROWS = 80 # Rows the virtual list materializes (visible rows plus overscan)
+QUERY_COUNT = 52 # Weeks (and days) queried per week/day filtering run
+TICK_COUNT = 60 # update_display() ticks per tick run (one minute at one tick per second)
+DEFAULT_REPEAT = 7
+MIN_SAMPLE_SECONDS = 0.05 # Fast benchmarks loop within one sample until it takes at least this long
+MAX_SECONDS_PER_BENCHMARK = 5.0 # Stop taking samples of a benchmark once it has used this much time
+DEFAULT_TOLERANCE = 0.25 # Fractional slowdown of the best time that counts as a regression
+NOISE_FLOOR_SECONDS = 0.0001 # Slowdowns smaller than this are timer noise, not regressions
+BASELINE_FILENAME = "benchmark_baseline.json"
+RESULTS_FILENAME = "benchmark_results.json"
+MILLION = 1000000; MIB = 1024 * 1024
+WORDS = ("team", "review", "dentist", "flight", "sprint", "planning", "birthday", "dinner", "standup", "launch",
+         "deadline", "concert", "school", "payroll", "renewal", "meetup", "workshop", "recital", "checkup", "demo")
+LOCATIONS = ("Room 101", "Main Office", "Downtown Clinic", "Airport T2", "Community Hall", "Online", "Cafe Central")
+
+
+# --- Synthetic Data ---
+
+def generate_events(count, seed=DEFAULT_SEED, past_fraction=0.3, location_fraction=0.5, label_length=(8, 40), now=BENCH_NOW):
+    """count make_event() records, the same for the same arguments.
+
+    past_fraction of them fall before now; location_fraction have a location;
+    labels (unique, as the store requires) are label_length[0]..label_length[1] characters.
+    """
+    rng = random.Random(seed)
+    events = []
+    for number in range(count):
+        suffix = f" #{number}"
+        length = max(rng.randint(*label_length), len(suffix) + 1)
+        words = []
+        while sum(len(word) + 1 for word in words) < length - len(suffix): words.append(rng.choice(WORDS))
+        label = (" ".join(words)[:length - len(suffix)] + suffix).capitalize()
+        offset = timedelta(seconds=rng.randrange(1, SPAN_DAYS * 86400))
+        target_dt = now - offset if rng.random() < past_fraction else now + offset
+        location = rng.choice(LOCATIONS) if rng.random() < location_fraction else None
+        events.append(make_event(label, target_dt, location=location, is_custom=True))
+    return events
+
+def build_store(events, filename=None):
+    store = EventStore(filename or os.devnull)
+    store.add_many(event.copy() for event in events) # Copies: a store owns its records
+    return store
+
+
+# --- Timing ---
+
+def measure(func, repeat=DEFAULT_REPEAT, max_seconds=MAX_SECONDS_PER_BENCHMARK):
+    """Times func in up to repeat samples (at least one). Returns {"min", "median", "loops", "samples"}, in seconds per call.
+
+    The first call warms caches and sets how many calls make up a sample (enough
+    for MIN_SAMPLE_SECONDS), so short benchmarks aren't at the timer's mercy.
+    """
+    started = perf_counter(); func(); first = perf_counter() - started
+    loops = max(1, int(MIN_SAMPLE_SECONDS / first)) if first > 0 else 1
+    times = []
+    while len(times) < repeat:
+        sample_started = perf_counter()
+        for _ in range(loops): func()
+        times.append((perf_counter() - sample_started) / loops)
+        if perf_counter() - started > max_seconds: break
+    return {"min": min(times), "median": statistics.median(times), "loops": loops, "samples": len(times)}
+
+def read_window(view, start, stop, now):
+    if isinstance(view, ClosestFirstView): return view.rows(start, stop, now)
+    return view[start:stop]
+
+
+# --- Benchmarks ---
+# Each takes (store, events, scratch directory) and returns a no-argument function to time, plus the items one run processes.
+
+def bench_format_timedelta(store, events, workdir):
+    deltas = [event['target_dt'] - BENCH_NOW for event in events]
+    def run():
+        for delta in deltas: format_timedelta(delta)
+    return run, len(deltas)
+
+def bench_indicator_symbol(store, events, workdir):
+    targets = [event['target_dt'] for event in events]
+    def run():
+        for target_dt in targets: calculate_indicator_symbol(target_dt, BENCH_NOW)
+    return run, len(targets)
+
+def make_sort_benchmark(sort_method):
+    def bench(store, events, workdir):
+        """The view sort_and_redisplay() hands the list, read a window at a time at the top, middle and end."""
+        total = len(store)
+        starts = (0, max(0, total // 2 - LIST_WINDOW_ROWS // 2), max(0, total - LIST_WINDOW_ROWS))
+        def run():
+            view = store.view(sort_method)
+            for start in starts: read_window(view, start, start + LIST_WINDOW_ROWS, BENCH_NOW)
+        return run, len(starts) * min(total, LIST_WINDOW_ROWS)
+    return bench
+
+def bench_week_filter(store, events, workdir):
+    first_week = datetime.combine(get_week_start(BENCH_NOW.date()), datetime.min.time()) - timedelta(weeks=QUERY_COUNT // 2)
+    def run():
+        for week in range(QUERY_COUNT):
+            week_start = first_week + timedelta(weeks=week)
+            store.occurrences_between(week_start, week_start + timedelta(days=7))
+    return run, QUERY_COUNT
+
+def bench_day_filter(store, events, workdir):
+    first_day = BENCH_NOW.date() - timedelta(days=QUERY_COUNT // 2)
+    def run():
+        for day in range(QUERY_COUNT): store.occurrences_on(first_day + timedelta(days=day))
+    return run, QUERY_COUNT
+
+def bench_save(store, events, workdir):
+    path = os.path.join(workdir, "save.json")
+    def run(): store.save(path)
+    return run, len(store)
+
+def bench_load(store, events, workdir):
+    path = os.path.join(workdir, "load.json")
+    write_json_atomic(path, store.to_dict())
+    def run(): EventStore(path).load()
+    return run, len(store)
+
+def bench_update_ticks(store, events, workdir):
+    """TICK_COUNT update_display() ticks over the Closest First window: due rows re-formatted and rescheduled."""
+    window = read_window(store.view(), 0, LIST_WINDOW_ROWS, BENCH_NOW)
+    def run():
+        scheduler = RefreshScheduler()
+        scheduler.schedule_many(((number, event['target_dt']) for number, event in enumerate(window)), BENCH_NOW)
+        for tick in range(1, TICK_COUNT + 1):
+            now = BENCH_NOW + timedelta(seconds=tick)
+            for row, target_dt in scheduler.pop_due(now):
+                format_timedelta(target_dt - now); calculate_indicator_symbol(target_dt, now)
+                scheduler.schedule(row, target_dt, now)
+            store.advance_series(now)
+    return run, TICK_COUNT
+
+def bench_countdown_array_ticks(store, events, workdir):
+    """The same TICK_COUNT ticks with CountdownArray over every event (NumPy); text for the changed rows of a window."""
+    countdowns = CountdownArray([event['target_dt'] for event in events])
+    window = slice(0, LIST_WINDOW_ROWS)
+    def run():
+        countdowns.now_us = None; countdowns.tick(BENCH_NOW, rows=window) # Back to a first tick
+        for tick in range(1, TICK_COUNT + 1): countdowns.display(countdowns.tick(BENCH_NOW + timedelta(seconds=tick), rows=window))
+    return run, TICK_COUNT
+
+BENCHMARKS = {
+    "format_timedelta": bench_format_timedelta,
+    "calculate_indicator_symbol": bench_indicator_symbol,
+    **{f"sort[{sort_method}]": make_sort_benchmark(sort_method) for sort_method in SORT_OPTIONS},
+    "week_filter": bench_week_filter,
+    "day_filter": bench_day_filter,
+    "save": bench_save,
+    "load": bench_load,
+    "update_ticks": bench_update_ticks,
+}
+if NUMPY_AVAILABLE: BENCHMARKS["countdown_array_ticks"] = bench_countdown_array_ticks
+
+
+# --- Running and Comparing ---
+
+def run_benchmarks(sizes, names=None, repeat=DEFAULT_REPEAT, **generator_options):
+    """{"meta": ..., "results": {"name@size": {"min", "median", "loops", "samples", "items"}}}."""
+    results = {}
+    for size in sizes:
+        events = generate_events(size, **generator_options)
+        store = build_store(events)
+        for name, bench in BENCHMARKS.items():
+            if names and name not in names: continue
+            with tempfile.TemporaryDirectory(prefix="event-bench-") as workdir:
+                run, items = bench(store, events, workdir)
+                result = measure(run, repeat)
+            result["items"] = items
+            results[f"{name}@{size}"] = result
+            print(f"{name + '@' + str(size):<40} {result['min'] * 1000:10.3f} ms  (median {result['median'] * 1000:.3f}, {result['samples']} x {result['loops']})", flush=True)
+    meta = {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "machine": platform.machine(), "sizes": list(sizes),
+            "generator": {key: list(value) if isinstance(value, tuple) else value for key, value in generator_options.items()},
+            "created": datetime.now().isoformat(timespec='seconds')}
+    return {"meta": meta, "results": results}
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """(lines of the comparison table, names of the benchmarks that regressed).
+
+    Compares best times: the minimum is what the code costs, the rest is other load on the machine.
+    """
+    lines = []; regressions = []
+    if results["meta"].get("generator") != baseline["meta"].get("generator"):
+        lines.append("Warning: the baseline was generated with different options; the comparison may not be meaningful.")
+    for key, result in results["results"].items():
+        base = baseline["results"].get(key)
+        if base is None: lines.append(f"{key:<40} {'(not in baseline)':>22}"); continue
+        ratio = result["min"] / base["min"] if base["min"] else float('inf')
+        regressed = ratio > 1 + tolerance and result["min"] - base["min"] > NOISE_FLOOR_SECONDS
+        if regressed: regressions.append(key)
+        lines.append(f"{key:<40} {base['min'] * 1000:10.3f} -> {result['min'] * 1000:10.3f} ms  x{ratio:5.2f}{'  REGRESSION' if regressed else ''}")
+    return lines, regressions
+
+
+# --- Memory ---
+
+def loaded_string(text):
+    """A fresh copy of text, as json.load() gives every record its own strings."""
+    return text.encode('utf-8').decode('utf-8') if text else text
+
+def dict_records(events):
+    """events as the per-event dicts earlier versions of make_event() built."""
+    return [{'label': ev['label'], 'target_dt': ev['target_dt'], 'location': loaded_string(ev['location']),
+             'is_custom': ev['is_custom'], 'tree_id': None} for ev in events]
+
+def event_records(events):
+    return [make_event(ev['label'], ev['target_dt'], location=loaded_string(ev['location']), is_custom=ev['is_custom']) for ev in events]
+
+def traced_bytes(build, events):
+    """Bytes that build(events) allocates and its result keeps alive (labels and datetimes are shared with events, so not counted)."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        records = build(events)
+        used = tracemalloc.get_traced_memory()[0] - before
+        del records
+        return used
+    finally: tracemalloc.stop()
+
+def memory_report(sizes, **generator_options):
+    """Lines comparing the memory of dict and Event records, per event and scaled to a million events."""
+    lines = [f"{'size':>9}  {'dict B/event':>12}  {'Event B/event':>13}  {'dict MiB/1M':>11}  {'Event MiB/1M':>12}  {'saved':>6}"]
+    for size in sizes:
+        events = generate_events(size, **generator_options)
+        dict_bytes = traced_bytes(dict_records, events) / size; event_bytes = traced_bytes(event_records, events) / size
+        lines.append(f"{size:9d}  {dict_bytes:12.1f}  {event_bytes:13.1f}  {dict_bytes * MILLION / MIB:11.1f}  {event_bytes * MILLION / MIB:12.1f}  {1 - event_bytes / dict_bytes:6.0%}")
+    return lines
+
+def _label_length_arg(text):
+    try: shortest, _, longest = text.partition('-'); return int(shortest), int(longest or shortest)
+    except ValueError: raise argparse.ArgumentTypeError(f"invalid label length {text!r} (use MIN-MAX, e.g. 8-40)")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmark.py", description="Benchmark the Event Time Tracker's core hot paths.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="store sizes (default: 1000 10000 100000)")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), metavar='NAME', help="run only these benchmarks: " + ", ".join(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help=f"timed samples per benchmark (default: {DEFAULT_REPEAT})")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--past-fraction', type=float, default=0.3, help="share of events before now (default: 0.3)")
+    parser.add_argument('--location-fraction', type=float, default=0.5, help="share of events with a location (default: 0.5)")
+    parser.add_argument('--label-length', type=_label_length_arg, default=(8, 40), help="label length range, MIN-MAX (default: 8-40)")
+    parser.add_argument('--output', default=RESULTS_FILENAME, help=f"results JSON (default: {RESULTS_FILENAME})")
+    parser.add_argument('--baseline', default=BASELINE_FILENAME, help=f"baseline JSON to compare against (default: {BASELINE_FILENAME})")
+    parser.add_argument('--memory', action='store_true', help="report the memory of the event records instead of timing")
+    parser.add_argument('--save-baseline', action='store_true', help="write the results to the baseline file instead of comparing")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help=f"allowed slowdown before failing (default: {DEFAULT_TOLERANCE})")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.memory:
+        print("\n".join(memory_report(args.sizes, seed=args.seed, past_fraction=args.past_fraction,
+                                       location_fraction=args.location_fraction, label_length=args.label_length)))
+        return 0
+    results = run_benchmarks(args.sizes, args.only, args.repeat, seed=args.seed, past_fraction=args.past_fraction,
+                             location_fraction=args.location_fraction, label_length=args.label_length)
+    write_json_atomic(args.output, results)
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        write_json_atomic(args.baseline, results); print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --save-baseline.")
+        return 0
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f: baseline = json.load(f)
+    except (OSError, ValueError) as e: print(f"Error reading baseline {args.baseline}: {e}", file=sys.stderr); return 2
+    lines, regressions = compare(results, baseline, args.tolerance)
+    print("\n".join(lines))
+    if regressions:
+        print(f"FAILED: {len(regressions)} benchmark(s) more than {args.tolerance:.0%} slower than the baseline: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    print(f"OK: no benchmark more than {args.tolerance:.0%} slower than the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
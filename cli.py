@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""Command-line queries and edits on the saved events, without starting Tk.
+
+    python cli.py upcoming [--days 7]
+    python cli.py week [YYYY-MM-DD]
+    python cli.py day [YYYY-MM-DD]
+    python cli.py search TEXT
+    python cli.py add LABEL YYYY-MM-DD [HH:MM[:SS]] [--location L] [--repeat RRULE]
+    python cli.py remove LABEL
+
+(code.py passes these commands on as well.) A *.evarc archive can be
+queried but not edited. Only event_store and the
+backend for the data file are imported: no tkinter, tkcalendar or locale
+setup, so a query on a typical data file starts in a few tens of
+milliseconds. Edits to a JSON data file go to its journal, like the GUI's;
+make them while the GUI isn't running, or it won't see them.
+"""
+import argparse
+from datetime import datetime, timedelta
+import os
+import sys
+
+from event_store import (
+    EventStore, get_week_start, format_timedelta, calculate_indicator_symbol,
+    DATE_FORMAT_SHORT, TIME_FORMAT, DATETIME_DISPLAY_FORMAT, SAVE_FILENAME, SQLITE_SUFFIXES, ARCHIVE_SUFFIX,
+)
+from recurrence import RecurrenceRule
+
+
+CLI_COMMANDS = ('upcoming', 'week', 'day', 'search', 'add', 'remove')
+CLI_DATE_FORMAT = "%Y-%m-%d"
+DEFAULT_UPCOMING_DAYS = 7
+
+
+def open_cli_store(filename, writes=False):
+    """Loads the store (plus journal and built-in events). Returns (store, journal or None).
+
+    A SQLite database is only created, and its built-in events only updated,
+    by a command that writes; queries leave the file untouched.
+    """
+    if filename.lower().endswith(SQLITE_SUFFIXES):
+        from sqlite_store import SQLiteEventStore # sqlite3 only for SQLite data files
+        if not writes and not os.path.exists(filename): raise FileNotFoundError(f"no such database: {filename}")
+        store = SQLiteEventStore(filename); store.load()
+        if writes: store.add_builtin_events()
+        return store, None
+    elif filename.lower().endswith(ARCHIVE_SUFFIX):
+        from archive import ArchiveStore # Read-only: no journal, no built-in events
+        store = ArchiveStore(filename); store.load(); journal = None
+    else:
+        from journal import EventJournal
+        store = EventStore(filename)
+        if store.exists(): store.load()
+        journal = EventJournal(store); journal.replay()
+    store.add_builtin_events()
+    return store, journal
+
+
+# --- Output ---
+
+def format_event_line(event, now, show_date=True):
+    """One event as the Event List shows it: indicator, label, location, time and countdown."""
+    when = event['target_dt'].strftime(DATETIME_DISPLAY_FORMAT if show_date else TIME_FORMAT)
+    label = event['label'] + (" ↻" if 'recurrence' in event else "")
+    location = f" ({event['location']})" if event.get('location') else ""
+    return f"{calculate_indicator_symbol(event['target_dt'], now)} {when}  {label}{location}  [{format_timedelta(event['target_dt'] - now)}]"
+
+def print_days(events, first_day, day_count, now):
+    """Events grouped under a header per day, like the Week View."""
+    events_by_day = {}
+    for event in events: events_by_day.setdefault(event['target_dt'].date(), []).append(event)
+    for offset in range(day_count):
+        day = first_day + timedelta(days=offset)
+        print(day.strftime(DATE_FORMAT_SHORT))
+        for event in events_by_day.get(day, ()): print("  " + format_event_line(event, now, show_date=False))
+        if day not in events_by_day: print("  No events scheduled")
+
+
+# --- Commands ---
+
+def cmd_upcoming(store, journal, args, now):
+    events = store.occurrences_between(now, now + timedelta(days=args.days))
+    for event in events: print(format_event_line(event, now))
+    if not events: print(f"No events in the next {args.days} days.")
+    return 0
+
+def cmd_week(store, journal, args, now):
+    week_start = get_week_start(args.date or now.date())
+    week_start_dt = datetime.combine(week_start, datetime.min.time())
+    print_days(store.occurrences_between(week_start_dt, week_start_dt + timedelta(days=7)), week_start, 7, now)
+    return 0
+
+def cmd_day(store, journal, args, now):
+    print_days(store.occurrences_on(args.date or now.date()), args.date or now.date(), 1, now)
+    return 0
+
+def cmd_search(store, journal, args, now):
+    needle = args.text.casefold()
+    matches = [ev for ev in store if needle in ev['label'].casefold() or needle in (ev.get('location') or '').casefold()]
+    matches.sort(key=lambda ev: ev['target_dt'])
+    for event in matches: print(format_event_line(event, now))
+    if not matches: print(f"No events match {args.text!r}.")
+    return 0 if matches else 1
+
+def refuse_read_only(store):
+    """Prints an error and returns True if store can't be edited."""
+    if store.read_only: print(f"Error: {store.filename} is a read-only archive (convert it with archive.py to-json to edit).", file=sys.stderr)
+    return store.read_only
+
+def cmd_add(store, journal, args, now):
+    if refuse_read_only(store): return 1
+    target_dt = datetime.combine(args.date, args.time)
+    recurrence = None
+    if args.repeat:
+        try: recurrence = RecurrenceRule.parse(args.repeat, target_dt)
+        except ValueError as e: print(f"Error: invalid repeat rule: {e}", file=sys.stderr); return 2
+    new_event = store.add(args.label, target_dt, location=args.location, is_custom=True, recurrence=recurrence)
+    if new_event is None: print(f"Error: an event named {args.label!r} already exists.", file=sys.stderr); return 1
+    if journal: journal.open(); journal.record_add(new_event); journal.wait(); journal.close() # Lets a compaction the append started finish before exit
+    print("Added: " + format_event_line(new_event, now))
+    return 0
+
+def cmd_remove(store, journal, args, now):
+    if refuse_read_only(store): return 1
+    event = store.find_by_label(args.label)
+    if event is None: print(f"Error: no event named {args.label!r}.", file=sys.stderr); return 1
+    if not event['is_custom']: print(f"Error: {event['label']!r} is a built-in event and comes back on every start.", file=sys.stderr); return 1
+    store.remove([event])
+    if journal: journal.open(); journal.record_remove([event]); journal.wait(); journal.close()
+    print(f"Removed: {event['label']}")
+    return 0
+
+
+# --- Argument Parsing ---
+
+def _date_arg(text):
+    try: return datetime.strptime(text, CLI_DATE_FORMAT).date()
+    except ValueError: raise argparse.ArgumentTypeError(f"invalid date {text!r} (use YYYY-MM-DD)")
+
+def _time_arg(text):
+    for time_format in (TIME_FORMAT, "%H:%M"):
+        try: return datetime.strptime(text, time_format).time()
+        except ValueError: pass
+    raise argparse.ArgumentTypeError(f"invalid time {text!r} (use HH:MM or HH:MM:SS)")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Query and edit the Event Time Tracker data without the GUI.")
+    parser.add_argument('--file', default=SAVE_FILENAME, help=f"data file (default: {SAVE_FILENAME}; *.db/*.sqlite use SQLite, *.evarc is a read-only archive)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    upcoming = commands.add_parser('upcoming', help="events in the next few days")
+    upcoming.add_argument('--days', type=int, default=DEFAULT_UPCOMING_DAYS, help=f"how many days ahead (default: {DEFAULT_UPCOMING_DAYS})")
+    upcoming.set_defaults(handler=cmd_upcoming)
+    week = commands.add_parser('week', help="the week (Mon-Sun) containing a date, default today")
+    week.add_argument('date', nargs='?', type=_date_arg)
+    week.set_defaults(handler=cmd_week)
+    day = commands.add_parser('day', help="the events on a date, default today")
+    day.add_argument('date', nargs='?', type=_date_arg)
+    day.set_defaults(handler=cmd_day)
+    search = commands.add_parser('search', help="events whose label or location contains TEXT")
+    search.add_argument('text')
+    search.set_defaults(handler=cmd_search)
+    add = commands.add_parser('add', help="add a custom event")
+    add.add_argument('label')
+    add.add_argument('date', type=_date_arg)
+    add.add_argument('time', nargs='?', type=_time_arg, default=datetime.min.time())
+    add.add_argument('--location')
+    add.add_argument('--repeat', help="RRULE, e.g. FREQ=WEEKLY;BYDAY=MO,WE")
+    add.set_defaults(handler=cmd_add, writes=True)
+    remove = commands.add_parser('remove', help="remove a custom event")
+    remove.add_argument('label')
+    remove.set_defaults(handler=cmd_remove, writes=True)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try: store, journal = open_cli_store(args.file, getattr(args, 'writes', False))
+    except (OSError, ValueError) as e: print(f"Error loading {args.file}: {e}", file=sys.stderr); return 1 # JSONDecodeError is a ValueError
+    try: return args.handler(store, journal, args, datetime.now())
+    finally:
+        if not isinstance(store, EventStore): store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
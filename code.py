@@ -1,50 +1,64 @@
 # -*- coding: utf-8 -*-
+import sys
+if __name__ == "__main__" and len(sys.argv) > 1:
+    from cli import CLI_COMMANDS, main as cli_main
+    if sys.argv[1] in CLI_COMMANDS: sys.exit(cli_main()) # Query mode: never touches Tk
+from startup_profile import StartupProfile
+startup_profile = StartupProfile() # Phase timings, printed with --startup-profile
+
 import tkinter as tk
 from tkinter import ttk
 from tkinter import font as tkFont # Import font module
 from tkinter import messagebox
+from tkinter import filedialog
+from tkinter import simpledialog
 from datetime import datetime, date, time, timedelta
-import calendar
 import json
 import os
 
-# Attempt to import tkcalendar components
-try:
-    from tkcalendar import DateEntry, Calendar # Import Calendar widget too
-    tkcalendar_AVAILABLE = True
-except ImportError:
-    tkcalendar_AVAILABLE = False
-    print("Warning: 'tkcalendar' library not found. Some features disabled.")
-    print("         Install with: pip install tkcalendar")
-
-# Set first day of the week (optional, Monday is default in many locales)
-# calendar.setfirstweekday(calendar.SUNDAY) # Or MONDAY
-# Let's default to Monday for consistency in the view
-calendar.setfirstweekday(calendar.MONDAY)
+# tkcalendar (and the locale setup for its date pattern) is the slowest import by far, so it's
+# imported by load_tkcalendar() after the first frame, or when the Calendar tab is first opened
+tkcalendar_AVAILABLE = False # True once load_tkcalendar() has imported it
+tkcalendar_checked = False # load_tkcalendar() has run (successfully or not)
+DateEntry = None; Calendar = None
+tkcalendar_pattern = 'mm/dd/yyyy' # DateEntry/Calendar date pattern, from the locale once loaded
+
+from event_store import (
+    EventStore, ClosestFirstView, get_week_start, format_timedelta, calculate_indicator_symbol,
+    DATE_FORMAT, DATE_FORMAT_SHORT, TIME_FORMAT, DATETIME_DISPLAY_FORMAT,
+    SORT_OPTIONS, DEFAULT_SORT, SAVE_FILENAME,
+)
+from sqlite_store import open_store
+from recurrence import RecurrenceRule
+from countdown import RefreshScheduler
+from journal import EventJournal
+from autosave import AutosaveService
+from prefetch import Prefetcher
+from ical import ImportProgress, import_batches
+from export import ExportJob, events_for_export
+from virtual_list import VirtualTreeview
+from perf_stats import PerfRecorder
+startup_profile.mark("imports")
 
 
 # --- Constants ---
-DATE_FORMAT = "%B %d, %Y" # For display in treeview, status messages etc.
-DATE_FORMAT_SHORT = "%a, %b %d, %Y" # For Week View day headers
-TIME_FORMAT = "%H:%M:%S"
-DATETIME_ISO_FORMAT = "%Y-%m-%dT%H:%M:%S" # For saving/loading
-DATETIME_DISPLAY_FORMAT = "%b %d, %Y %H:%M:%S" # For treeview display
 DEFAULT_TIME = "00:00:00"
 UPDATE_INTERVAL_MS = 1000
-SAVE_FILENAME = "event_tracker_data.json" # Renamed to reflect content
 STATUS_CLEAR_DELAY_MS = 4000
-
-# Sort Options
-SORT_ALPHA = "Alphabetical (A-Z)"
-SORT_ALPHA_REV = "Alphabetical (Z-A)"
-SORT_CLOSEST = "Closest First"
-SORT_OPTIONS = [SORT_CLOSEST, SORT_ALPHA, SORT_ALPHA_REV]
-DEFAULT_SORT = SORT_CLOSEST
-
-# Indicator Symbols & Thresholds
-INDICATOR_PAST = '✅'; INDICATOR_URGENT = '🔥'; INDICATOR_SOON = '⏳'
-INDICATOR_NEAR = '🗓️'; INDICATOR_FAR = '•'
-INDICATOR_THRESHOLD_URGENT = 1; INDICATOR_THRESHOLD_SOON = 7; INDICATOR_THRESHOLD_NEAR = 30
+BULK_REMOVE_THRESHOLD = 64 # Above this many rows, removal re-renders the list window once
+COUNTDOWN_ARRAY_MIN_EVENTS = 200000 # From this many events (in memory), ticks use NumPy if it's installed
+REPEAT_NEVER = "Never"
+REPEAT_PRESETS = {REPEAT_NEVER: None, "Daily": "FREQ=DAILY", "Weekly": "FREQ=WEEKLY", "Monthly": "FREQ=MONTHLY", "Yearly": "FREQ=YEARLY"}
+SERIES_MARK = " ↻" # Appended to the label of recurring events in the list
+WEEK_VIEW_CACHE_WEEKS = 104 # Rendered weeks kept for paging back and forth
+MONTH_MARKER_CACHE_MONTHS = 48 # Calendar months whose marker dates are kept
+PREFETCH_OFFSETS = (1, -1, 2, -2) # Neighbouring weeks/months to precompute, nearest first
+EXPORT_POLL_MS = 100 # How often the status bar checks on a running export
+EXPORT_RANGE_FORMAT = "%Y-%m-%d" # Dates typed into the export range prompt
+PERF_REFRESH_MS = 1000 # How often the diagnostics window (F12) redraws its numbers
+CALENDAR_GRID_LEAD_DAYS = 7; CALENDAR_GRID_TRAIL_DAYS = 14 # Days of the neighbouring months a 6-week grid can show
+DEFERRED_STARTUP_DELAY_MS = 250 # After the first frame: lets the window draw and take input before tkcalendar loads
+DATE_INPUT_RETRY_MS = 2000 # The date field is only swapped for a DateEntry while the user isn't typing in it
 
 # Color Palettes (Added text widget colors)
 LIGHT_COLORS = {
@@ -91,30 +105,53 @@ DARK_COLORS = {
     "cal_entry_select_bg": "#005A9E", "cal_entry_select_fg": "white",
 }
 
-# INITIAL_EVENTS_DATA (Ensure this is defined)
-INITIAL_EVENTS_DATA = {
-    "New Year's Day": (1, 1), "Martin Luther King, Jr. Day (Approx)": (1, 15),
-    "Groundhog Day": (2, 2), "My Birthday": (2, 5), "Valentine's Day": (2, 14),
-    "Presidents' Day (Approx)": (2, 19), "St. Patrick's Day": (3, 17),
-    "April Fools' Day": (4, 1), "Memorial Day (Approx)": (5, 27),
-    "Juneteenth": (6, 19), "Independence Day": (7, 4),
-    "Labor Day (Approx)": (9, 2), "Columbus Day (Approx)": (10, 14),
-    "Halloween": (10, 31), "Veterans Day": (11, 11),
-    "Thanksgiving Day (Approx)": (11, 28), "Christmas Day": (12, 25),
-    "New Year's Eve": (12, 31),
-}
-
+# --- Command Line ---
+def parse_gui_args(argv):
+    """(data file, show startup profile, perf dump file or None) from the command line; argparse is only imported if there are arguments."""
+    if not argv: return SAVE_FILENAME, False, None
+    import argparse
+    parser = argparse.ArgumentParser(prog="code.py", description="Event Time Tracker.",
+                                     epilog="Query commands that don't start the GUI: code.py upcoming|week|day|search|add|remove (see cli.py --help).")
+    parser.add_argument('file', nargs='?', default=SAVE_FILENAME, help=f"data file (default: {SAVE_FILENAME}; *.db/*.sqlite use SQLite, *.evarc is a read-only archive)")
+    parser.add_argument('--startup-profile', action='store_true', help="print how long each startup phase took")
+    parser.add_argument('--perf-dump', metavar='FILE', help="on exit, write the hot-path timings (see F12) to FILE as JSON")
+    args = parser.parse_args(argv)
+    return args.file, args.startup_profile, args.perf_dump
+
+data_filename, show_startup_profile, perf_dump_filename = parse_gui_args(sys.argv[1:])
 
 # --- Data Store ---
-tracked_events = []
-settings = {"dark_mode": False} # Default to light mode
+# *.db/*.sqlite/*.sqlite3 opens the SQLite backend, *.evarc a read-only archive, anything else JSON
+store = open_store(data_filename)
+settings = store.settings # Updated in place by the store, safe to alias
+# JSON only: every edit is appended here and the save file is its last snapshot. SQLite commits each edit itself.
+journal = EventJournal(store) if isinstance(store, EventStore) else None
+perf = PerfRecorder() # Hot-path timings: F12 shows them, --perf-dump writes them on exit
+if journal: perf.instrument(journal, '_write_snapshot', "save") # The autosave snapshot, on its background thread
+else: perf.instrument(store, 'save', "save")
+refresh_scheduler = RefreshScheduler() # When each list row's countdown next changes
+shown_countdowns = {} # tree_id -> (diff text, indicator) currently displayed
+store_countdowns = None # countdown_array.StoreCountdowns once the store is big enough; False without NumPy
+closest_reorder_due = None; closest_reorder_key = None # When the Closest First window next reorders
+calendar_markers = {} # date -> calevent id of the markers currently in the calendar grid
+week_view_cache = {} # week start date -> (store.week_versions key, rendered content), oldest first
+week_view_shown = None # (week start date, version key) of the content in the week view widget
+month_marker_cache = {} # (year, month) -> (month_version_key(), dates to mark), oldest first
+prefetcher = None # Prefetcher for neighbouring weeks/months (in-memory store only)
+ics_import = None # (batch generator, after job id) while an .ics import is running
+export_job = None # ExportJob while an export is being written
+perf_window = None # (Toplevel, Text) of the diagnostics window while it's open
 
 # --- Global Widget References ---
 date_input_widget = None; status_label = None; remove_button = None
 status_clear_job = None; update_job_id = None; event_tree = None
+event_list = None # VirtualTreeview wrapping event_tree
+autosave = None # AutosaveService, created with root
 location_entry_var = None; label_entry_var = None; date_entry_var = None
 time_entry_var = None; sort_var = None
+repeat_var = None # "Never", a REPEAT_PRESETS name, or a typed RRULE
 notebook = None
+calendar_tab_frame = None; calendar_tab_built = False # Tab contents are built on first selection
 calendar_widget = None
 selected_date_event_label = None # Label widget itself
 selected_date_event_var = None # StringVar for the label
@@ -124,73 +161,11 @@ style = None # Style object
 input_frame = None # Make input_frame global for styling
 
 # Week View Globals
-week_view_tab_frame = None
+week_view_tab_frame = None; week_tab_built = False
 week_view_label_var = None
 week_view_text = None
 current_week_start_date = None # Stores the date object of the start of the displayed week
 
-# --- Helper Functions ---
-
-def get_week_start(ref_date):
-    """Calculates the start date (Monday) of the week containing ref_date."""
-    # weekday() returns 0 for Monday, 6 for Sunday
-    start_delta = timedelta(days=ref_date.weekday())
-    return ref_date - start_delta
-
-def calculate_next_occurrence(month, day):
-    today = date.today(); year = today.year; target_date_this_year = None
-    try: target_date_this_year = date(year, month, day)
-    except ValueError: # Handle invalid dates like Feb 30
-        if month == 2 and day == 29: # Handle Leap Day specifically
-            temp_year = year;
-            # Find the next leap year starting from the current year
-            while not calendar.isleap(temp_year): temp_year += 1
-            # If today is Mar 1st or later in a leap year, find the *next* leap year
-            if today >= date(year, 3, 1) and calendar.isleap(year):
-                 year = temp_year + 4;
-                 while not calendar.isleap(year): year += 4 # Ensure it's a leap year
-            else: # Otherwise, use the first leap year found
-                year = temp_year
-            try: return date(year, month, day)
-            except ValueError: return None # Should not happen if logic is correct
-        else: return None # Other invalid dates (e.g., Apr 31)
-    # If valid date this year
-    if target_date_this_year and target_date_this_year < today:
-        # Target date has passed this year, move to next year
-        year += 1
-        try:
-            # Special handling if next year isn't a leap year for Feb 29
-            if month == 2 and day == 29 and not calendar.isleap(year):
-                year += 1 # Go to the year after next
-                while not calendar.isleap(year): year += 1 # Find the next leap year
-            return date(year, month, day)
-        except ValueError: return None # Should not happen
-    else:
-        # Target date is today or in the future this year
-        return target_date_this_year
-
-
-def format_timedelta(delta):
-    total_seconds = int(delta.total_seconds()); prefix = "In: " if total_seconds >= 0 else "Ago: "
-    total_seconds = abs(total_seconds); sign = 1 if prefix == "In: " else -1
-    days, rem_secs = divmod(total_seconds, 86400); hours, rem_secs = divmod(rem_secs, 3600); minutes, seconds = divmod(rem_secs, 60)
-    if sign == -1 and days == 0 and hours == 0 and minutes == 0 and seconds < 60: return "Just now or Past"
-    parts = [];
-    if days > 0: parts.append(f"{days}d");
-    if hours > 0: parts.append(f"{hours}h")
-    if minutes > 0: parts.append(f"{minutes}m")
-    if (days == 0 and total_seconds > 0) or not parts : parts.append(f"{seconds}s")
-    if not parts: return "Now"
-    return prefix + " ".join(parts)
-
-def calculate_indicator_symbol(target_dt):
-    now = datetime.now(); delta = target_dt - now; days_left = delta.total_seconds() / 86400.0
-    if days_left < 0: return INDICATOR_PAST
-    elif days_left <= INDICATOR_THRESHOLD_URGENT: return INDICATOR_URGENT
-    elif days_left <= INDICATOR_THRESHOLD_SOON: return INDICATOR_SOON
-    elif days_left <= INDICATOR_THRESHOLD_NEAR: return INDICATOR_NEAR
-    else: return INDICATOR_FAR
-
 # --- Status Bar Function ---
 def update_status(message, clear_after=True):
     global status_label, status_clear_job, root
@@ -211,44 +186,32 @@ def update_status(message, clear_after=True):
     # else: print(f"Status (Label/Root not ready): {message}") # Optional debug
 
 # --- Save/Load Functions ---
-def save_data(): # Saves both events and settings
-    global settings # Access global settings dictionary
-    custom_events_to_save = []
-    for event in tracked_events:
-        if event.get('is_custom', False):
-            event_data = {'label': event['label'],'target_dt_iso': event['target_dt'].strftime(DATETIME_ISO_FORMAT)}
-            if event.get('location'): event_data['location'] = event['location']
-            custom_events_to_save.append(event_data)
-    data_to_save = { "settings": settings, "events": custom_events_to_save }
-    try:
-        with open(SAVE_FILENAME, 'w') as f: json.dump(data_to_save, f, indent=4)
-        update_status(f"Saved settings and {len(custom_events_to_save)} custom events.")
-    except Exception as e: update_status(f"Error saving data: {e}"); print(f"Error saving data to {SAVE_FILENAME}: {e}")
-
-def load_data(): # Loads both settings and events
-    global settings # Modify global settings dictionary
-    loaded_events_data = []
-    if not os.path.exists(SAVE_FILENAME): update_status("No data file found. Using defaults.", clear_after=False); return loaded_events_data
+# Edits are written to the journal as they happen; autosave folds them into the save file in the background
+@perf.timed("load")
+def load_data(): # Loads both settings and events into the store
+    if not store.exists(): update_status("No data file found. Using defaults.", clear_after=False); return 0
     try:
-        with open(SAVE_FILENAME, 'r') as f: loaded_data = json.load(f)
-        loaded_settings = loaded_data.get("settings", {}); settings["dark_mode"] = loaded_settings.get("dark_mode", False)
-        loaded_events_raw = loaded_data.get("events", []); loaded_count = 0
-        for item in loaded_events_raw:
-            try:
-                target_dt = datetime.strptime(item['target_dt_iso'], DATETIME_ISO_FORMAT)
-                if 'label' not in item or not item['label']: continue
-                loaded_event = {'label': item['label'], 'target_dt': target_dt, 'is_custom': True, 'tree_id': None, 'location': item.get('location', None)}
-                loaded_events_data.append(loaded_event); loaded_count += 1
-            except (KeyError, ValueError, TypeError) as e: print(f"Skipping invalid event item during load: {item}. Error: {e}")
+        loaded_count = store.load()
         update_status(f"Loaded settings and {loaded_count} custom events.")
-        return loaded_events_data
-    except json.JSONDecodeError as e: update_status(f"Error: Corrupted data in {SAVE_FILENAME}. Using defaults."); print(f"Error parsing JSON: {e}"); settings = {"dark_mode": False}; return []
-    except Exception as e: update_status(f"Error loading data file: {e}. Using defaults."); print(f"Error loading file: {e}"); settings = {"dark_mode": False}; return []
+        return loaded_count
+    except json.JSONDecodeError as e: update_status(f"Error: Corrupted data in {store.filename}. Using defaults."); print(f"Error parsing JSON: {e}"); store.reset_settings(); return 0
+    except Exception as e: update_status(f"Error loading data file: {e}. Using defaults."); print(f"Error loading file: {e}"); store.reset_settings(); return 0
+
+@perf.timed("load: journal replay")
+def replay_journal(): # Applies the edits logged since the snapshot, then keeps logging new ones
+    if journal is None: return
+    try:
+        replayed_count = journal.replay()
+        if replayed_count: update_status(f"Replayed {replayed_count} unsaved edits from the journal.")
+    except Exception as e: update_status(f"Error reading journal: {e}"); print(f"Error replaying {journal.path}: {e}")
+    try: journal.open()
+    except OSError as e: update_status(f"Error opening journal: {e}"); print(f"Error opening {journal.path}: {e}")
 
 
 # --- Core Logic & UI Handlers ---
 
 # Function to apply theme colors (CORRECTED VERSION)
+@perf.timed("apply_styles")
 def apply_styles():
     global root, style, settings, calendar_widget, date_input_widget, status_label
     global selected_date_event_label, event_tree, input_frame, week_view_text
@@ -328,16 +291,9 @@ def apply_styles():
                  except tk.TclError as e: print(f"TclError configuring DateEntry styles: {e}")
 
 
-        # --- Refresh Treeview Row Tags ---
-        if event_tree and event_tree.winfo_exists():
-            for i, item_id in enumerate(event_tree.get_children()):
-                tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-                current_tags = list(event_tree.item(item_id, 'tags'))
-                # Remove old tags cleanly before adding new one
-                if 'oddrow' in current_tags: current_tags.remove('oddrow')
-                if 'evenrow' in current_tags: current_tags.remove('evenrow')
-                if tag not in current_tags: current_tags.append(tag)
-                event_tree.item(item_id, tags=tuple(current_tags))
+        # --- Refresh Treeview Row Tags (only the materialized rows exist) ---
+        if event_list and event_tree and event_tree.winfo_exists():
+            event_list.restripe()
 
         # --- Refresh week view ONLY if data changes, not just style ---
         # The update will be triggered by on_tab_changed or sort_and_redisplay when needed.
@@ -360,6 +316,8 @@ def toggle_dark_mode():
     global dark_mode_var, settings
     if dark_mode_var:
         settings["dark_mode"] = dark_mode_var.get()
+        if journal: journal.record_settings(); autosave.notify()
+        else: store.save() # SQLite: events are already committed, this writes the settings
         apply_styles() # Apply styles will trigger week view update if visible
         # Trigger week view update IF it's the selected tab after style change
         on_tab_changed(None)
@@ -368,9 +326,10 @@ def toggle_dark_mode():
 
 # --- Week View Functions ---
 
+@perf.timed("update_week_view")
 def update_week_view():
     """Refreshes the content of the week view text widget."""
-    global week_view_text, week_view_label_var, current_week_start_date, tracked_events
+    global week_view_text, week_view_label_var, current_week_start_date, week_view_shown
     if not all([week_view_text, week_view_label_var, current_week_start_date]):
         print("Week view components not ready for update.") # Debug
         return # Components not ready
@@ -385,49 +344,30 @@ def update_week_view():
     week_range_str = f"Week: {current_week_start_date.strftime(DATE_FORMAT_SHORT)} - {week_end_date.strftime(DATE_FORMAT_SHORT)}"
     week_view_label_var.set(week_range_str)
 
-    # Filter events for the current week
-    events_this_week = []
-    for event in tracked_events:
-        if 'target_dt' not in event: continue # Skip if event data is incomplete
-        event_date = event['target_dt'].date()
-        if current_week_start_date <= event_date <= week_end_date:
-            events_this_week.append(event)
-
-    # Sort events by datetime
-    events_this_week.sort(key=lambda ev: ev['target_dt'])
+    # Rendered content is cached per week and reused while the week's events are unchanged
+    version_key = store.week_versions[current_week_start_date]
+    cached = week_view_cache.get(current_week_start_date)
+    if cached is None or cached[0] != version_key:
+        cached = (version_key, render_week(current_week_start_date))
+        cache_rendered_week(current_week_start_date, cached)
+    if prefetcher: # Neighbouring weeks, computed while the user reads this one
+        prefetcher.request(('week', current_week_start_date + timedelta(weeks=offset)) for offset in PREFETCH_OFFSETS
+                           if not is_week_cached(current_week_start_date + timedelta(weeks=offset)))
+    shown_key = (current_week_start_date, version_key)
+    if week_view_shown == shown_key: return # Already on screen
 
     # Enable text widget for update, clear, disable after
     try:
         week_view_text.config(state=tk.NORMAL)
         week_view_text.delete('1.0', tk.END)
-
-        # Group events by day and format
-        for i in range(7):
-            day_date = current_week_start_date + timedelta(days=i)
-            day_events = [ev for ev in events_this_week if ev['target_dt'].date() == day_date]
-
-            # Add day header
-            day_header = day_date.strftime(DATE_FORMAT_SHORT) # e.g., "Mon, Jan 01, 2024"
-            week_view_text.insert(tk.END, f"\n{day_header}\n", "bold_date")
-
-            if day_events:
-                for ev in day_events:
-                    time_str = ev['target_dt'].strftime(TIME_FORMAT)
-                    loc_str = f" ({ev.get('location')})" if ev.get('location') else ""
-                    event_line = f"  {time_str} - {ev['label']}{loc_str}\n"
-                    week_view_text.insert(tk.END, event_line, "event_item")
-            else:
-                 week_view_text.insert(tk.END, "  No events scheduled\n", "event_item") # Use same tag for consistent indent
-
-        # Remove leading newline if present
-        if week_view_text.get("1.0", "1.1") == "\n":
-             week_view_text.delete("1.0", "1.1")
-
+        week_view_text.insert('1.0', *cached[1]) # One call: (text, tag) pairs flattened
         week_view_text.config(state=tk.DISABLED) # Make read-only again
         week_view_text.see("1.0") # Scroll to top
+        week_view_shown = shown_key
 
     except tk.TclError as e:
         print(f"Error updating week view text widget: {e}")
+        week_view_shown = None
         try:
             # Ensure it's disabled even if error occurred mid-update
              if week_view_text.winfo_exists():
@@ -435,6 +375,49 @@ def update_week_view():
         except tk.TclError: pass # Widget might be gone
 
 
+def cache_rendered_week(week_start_date, entry):
+    week_view_cache.pop(week_start_date, None) # Re-insert as the newest entry
+    week_view_cache[week_start_date] = entry
+    while len(week_view_cache) > WEEK_VIEW_CACHE_WEEKS: del week_view_cache[next(iter(week_view_cache))]
+
+def is_week_cached(week_start_date):
+    cached = week_view_cache.get(week_start_date)
+    return cached is not None and cached[0] == store.week_versions[week_start_date]
+
+
+def render_week(week_start_date):
+    """Week view content as a flat (text, tag, text, tag, ...) tuple for a single Text.insert() call."""
+    # Events and series occurrences for the week, already sorted by datetime
+    week_start_dt = datetime.combine(week_start_date, datetime.min.time())
+    events_this_week = store.occurrences_between(week_start_dt, week_start_dt + timedelta(days=7))
+
+    # Group events by day in one pass (they're already in time order)
+    events_by_day = {}
+    for ev in events_this_week:
+        events_by_day.setdefault(ev['target_dt'].date(), []).append(ev)
+
+    # Format each day
+    segments = []
+    for i in range(7):
+        day_date = week_start_date + timedelta(days=i)
+        day_events = events_by_day.get(day_date)
+
+        # Add day header (no blank line before the first one)
+        day_header = day_date.strftime(DATE_FORMAT_SHORT) # e.g., "Mon, Jan 01, 2024"
+        segments += (f"\n{day_header}\n" if i else f"{day_header}\n", "bold_date")
+
+        if day_events:
+            event_lines = []
+            for ev in day_events:
+                time_str = ev['target_dt'].strftime(TIME_FORMAT)
+                loc_str = f" ({ev.get('location')})" if ev.get('location') else ""
+                event_lines.append(f"  {time_str} - {ev['label']}{loc_str}\n")
+            segments += ("".join(event_lines), "event_item")
+        else:
+            segments += ("  No events scheduled\n", "event_item") # Use same tag for consistent indent
+    return tuple(segments)
+
+
 def show_previous_week():
     global current_week_start_date
     if current_week_start_date:
@@ -462,9 +445,11 @@ def on_tab_changed(event):
         selected_tab_widget_path = notebook.select()
         # Check if the selected tab is the week view tab
         if week_view_tab_frame and week_view_tab_frame.winfo_exists() and selected_tab_widget_path == str(week_view_tab_frame):
+             if not week_tab_built: build_week_tab()
              update_week_view() # Refresh week view when it becomes visible
         # Check if selected tab is Calendar View and update markers/selected date info
         elif calendar_tab_frame and calendar_tab_frame.winfo_exists() and selected_tab_widget_path == str(calendar_tab_frame):
+            if not calendar_tab_built: build_calendar_tab()
             update_calendar_markers() # Refresh markers
             show_events_for_selected_date() # Refresh label below calendar
 
@@ -476,61 +461,155 @@ def on_tab_changed(event):
 
 # --- (Other core logic/UI handlers remain largely the same) ---
 
+@perf.timed("update_calendar_markers")
 def update_calendar_markers():
-    global calendar_widget, tracked_events, settings # Need settings for colors
+    """Syncs the event markers with the dates shown in the calendar's month grid.
+
+    Only the visible grid is marked, and only the dates whose marker state
+    changed are touched (calendar_markers remembers what is on screen).
+    """
+    global calendar_widget, settings # Need settings for colors
     if not tkcalendar_AVAILABLE or not calendar_widget: return
     is_dark = settings.get("dark_mode", False)
     colors = DARK_COLORS if is_dark else LIGHT_COLORS
+    displayed_month = get_displayed_month()
+    if displayed_month is None: return
+    version_key = month_version_key(displayed_month)
+    cached = month_marker_cache.get(displayed_month)
+    if cached is None or cached[0] != version_key:
+        cached = (version_key, month_event_dates(displayed_month))
+        cache_month_dates(displayed_month, cached)
+    event_dates = cached[1]
+    if prefetcher: # Neighbouring months, for scrolling through the calendar
+        prefetcher.request(('month', month) for month in (shift_month(displayed_month, offset) for offset in PREFETCH_OFFSETS)
+                           if not is_month_cached(month))
     try:
         if not calendar_widget.winfo_exists(): return
-        calendar_widget.calevent_remove(tag='event_marker')
-    except tk.TclError: return
-    event_dates = set(event['target_dt'].date() for event in tracked_events if 'target_dt' in event)
-    for event_date in event_dates:
-        try:
-             if calendar_widget.winfo_exists():
-                 calendar_widget.calevent_create(event_date, 'Event', tags='event_marker')
-             else: break
-        except tk.TclError: break
+        for event_date in calendar_markers.keys() - event_dates:
+            calendar_widget.calevent_remove(calendar_markers.pop(event_date))
+        for event_date in event_dates - calendar_markers.keys():
+            calendar_markers[event_date] = calendar_widget.calevent_create(event_date, 'Event', tags='event_marker')
+        # Ensure marker style uses current theme colors
+        calendar_widget.tag_config('event_marker', background=colors['cal_event_marker_bg'], foreground=colors['cal_event_marker_fg'])
+    except tk.TclError: pass
+
+
+def get_displayed_month():
+    """(year, month) the calendar shows, or None."""
+    if not tkcalendar_AVAILABLE or not calendar_widget: return None
+    try: month, year = calendar_widget.get_displayed_month()
+    except tk.TclError: return None
+    return (year, month)
+
+def shift_month(year_month, offset):
+    year, month = divmod(year_month[0] * 12 + year_month[1] - 1 + offset, 12)
+    return (year, month + 1)
+
+def month_grid_range(year_month):
+    """(start, end) datetimes covering every day the month's calendar grid can show.
+
+    The grid shows up to six weeks: the month plus the end of the previous
+    one and the start of the next.
+    """
+    month_start = datetime(year_month[0], year_month[1], 1)
+    month_end = datetime(*shift_month(year_month, 1), 1)
+    return month_start - timedelta(days=CALENDAR_GRID_LEAD_DAYS), month_end + timedelta(days=CALENDAR_GRID_TRAIL_DAYS)
+
+def calendar_grid_range():
+    """month_grid_range() of the displayed month, or (None, None)."""
+    displayed_month = get_displayed_month()
+    return month_grid_range(displayed_month) if displayed_month else (None, None)
+
+def month_version_key(year_month):
+    """store.week_versions of every week in the month's grid: changes exactly when the grid's events do."""
+    grid_start, grid_end = month_grid_range(year_month)
+    week_start = get_week_start(grid_start.date())
+    return tuple(store.week_versions[week_start + timedelta(weeks=i)] for i in range((grid_end.date() - week_start).days // 7 + 1))
+
+def month_event_dates(year_month):
+    """Dates in the month's grid with a one-off event, series occurrence or built-in holiday."""
+    return frozenset(ev['target_dt'].date() for ev in store.occurrences_between(*month_grid_range(year_month)))
+
+def cache_month_dates(year_month, entry):
+    month_marker_cache.pop(year_month, None) # Re-insert as the newest entry
+    month_marker_cache[year_month] = entry
+    while len(month_marker_cache) > MONTH_MARKER_CACHE_MONTHS: del month_marker_cache[next(iter(month_marker_cache))]
+
+def is_month_cached(year_month):
+    cached = month_marker_cache.get(year_month)
+    return cached is not None and cached[0] == month_version_key(year_month)
+
+
+# --- Prefetch ---
+
+def compute_prefetch(key):
+    """Runs on the prefetch worker: the version key first, then the content it describes."""
+    kind, which = key
+    if kind == 'week':
+        version_key = store.week_versions[which]
+        return (version_key, render_week(which))
+    version_key = month_version_key(which)
+    return (version_key, month_event_dates(which))
+
+def deliver_prefetch(key, entry):
+    """Caches a prefetched week or month on the Tk thread (the store hasn't changed since it was computed)."""
+    kind, which = key
+    if kind == 'week': cache_rendered_week(which, entry)
+    else: cache_month_dates(which, entry)
+
+
+def format_event_row(tree_id, event, now):
+    """Values for an Event List row; also schedules the row's countdown refresh."""
+    formatted_diff = format_timedelta(event['target_dt'] - now)
+    indicator = calculate_indicator_symbol(event['target_dt'], now)
+    shown_countdowns[tree_id] = (formatted_diff, indicator)
+    refresh_scheduler.schedule(tree_id, event['target_dt'], now)
+    target_dt_str = event['target_dt'].strftime(DATETIME_DISPLAY_FORMAT)
+    label = event['label'] + SERIES_MARK if 'recurrence' in event else event['label']
+    return (indicator, label, event.get('location') or '', target_dt_str, formatted_diff)
+
+def release_event_row(tree_id):
+    """Called when a recycled Treeview item stops showing an event."""
+    refresh_scheduler.discard(tree_id); shown_countdowns.pop(tree_id, None)
+
+
+def mark_calendar_date(day):
+    """Adds the event marker for one date if it is in the visible grid and doesn't have one yet."""
+    if not tkcalendar_AVAILABLE or not calendar_widget or day in calendar_markers: return
+    grid_start, grid_end = calendar_grid_range()
+    if grid_start is None or not grid_start.date() <= day < grid_end.date(): return # Marked when its month is shown
+    try:
+        if calendar_widget.winfo_exists(): calendar_markers[day] = calendar_widget.calevent_create(day, 'Event', tags='event_marker')
+    except tk.TclError: pass
+
+def unmark_calendar_date(day):
+    """Removes the event marker for one date once no events are left on it."""
+    if not tkcalendar_AVAILABLE or not calendar_widget or day not in calendar_markers or store.occurrences_on(day): return
     try:
-        if calendar_widget.winfo_exists():
-            # Ensure marker style uses current theme colors
-            calendar_widget.tag_config('event_marker', background=colors['cal_event_marker_bg'], foreground=colors['cal_event_marker_fg'])
+        if calendar_widget.winfo_exists(): calendar_widget.calevent_remove(calendar_markers.pop(day))
     except tk.TclError: pass
 
 
+def show_added_event(new_event):
+    """Puts a newly added event on screen: one row at its sorted position, one calendar marker."""
+    try:
+        position = event_list.rows.index(new_event) if event_list else None
+        if position is not None: event_list.insert_row(position)
+        mark_calendar_date(new_event['target_dt'].date())
+        on_tab_changed(None) # Refresh week view / calendar label if visible
+    except tk.TclError as e: print(f"Error showing added event (widget likely destroyed): {e}")
+
+
+@perf.timed("sort_and_redisplay")
 def sort_and_redisplay():
-    global tracked_events, event_tree, root, sort_var
-    if not event_tree or not sort_var or not root: return
+    global event_tree, root, sort_var
+    if not event_tree or not event_list or not sort_var or not root: return
     try:
-        sort_method = sort_var.get(); now = datetime.now()
-        # Filter out any potential malformed events before sorting
-        valid_events = [ev for ev in tracked_events if 'target_dt' in ev and 'label' in ev]
-
-        if sort_method == SORT_ALPHA: valid_events.sort(key=lambda event: event['label'].lower())
-        elif sort_method == SORT_ALPHA_REV: valid_events.sort(key=lambda event: event['label'].lower(), reverse=True)
-        else: valid_events.sort(key=lambda event: abs(event['target_dt'] - now)) # Closest first (past or future)
-
-        tracked_events = valid_events # Update the main list with sorted valid events
-
-        if event_tree.winfo_exists():
-            # Clear existing items before re-inserting
-            for item in event_tree.get_children(): event_tree.delete(item)
-        else: return # Stop if treeview is gone
-
-        # Re-populate the treeview
-        for i, event in enumerate(tracked_events):
-            target_dt_str = event['target_dt'].strftime(DATETIME_DISPLAY_FORMAT)
-            difference = event['target_dt'] - now; formatted_diff = format_timedelta(difference)
-            tag = 'evenrow' if i % 2 == 0 else 'oddrow' # Determine tag based on index
-            indicator = calculate_indicator_symbol(event['target_dt'])
-            location_str = event.get('location', '')
-            if event_tree.winfo_exists():
-                # Apply the correct row tag during insert
-                new_tree_id = event_tree.insert('', tk.END, values=(indicator, event['label'], location_str, target_dt_str, formatted_diff), tags=(tag,))
-                # Update the event dict with its new Treeview ID
-                tracked_events[i]['tree_id'] = new_tree_id # Use index i which corresponds to the sorted list
-            else: break # Stop if treeview destroyed mid-loop
+        if not event_tree.winfo_exists(): return # Stop if treeview is gone
+
+        # Views read the store's indexes, so nothing is re-sorted here, and
+        # only the visible window of rows (plus overscan) is materialized
+        event_list.set_rows(store.view(sort_var.get()))
 
         update_remove_button_state()
         update_calendar_markers() # Updates markers with current theme color
@@ -541,8 +620,36 @@ def sort_and_redisplay():
     except Exception as e: print(f"Unexpected error during sort/redisplay: {e}")
 
 
+def refresh_closest_order(now):
+    """Re-renders the Closest First window once two rows around it are due to swap places."""
+    global closest_reorder_due, closest_reorder_key
+    if not event_list or not isinstance(event_list.rows, ClosestFirstView): return
+    window_key = (event_list.window_start, len(event_list.slots), store.version)
+    if window_key == closest_reorder_key:
+        if closest_reorder_due is None or now < closest_reorder_due: return
+        try: event_list.refresh() # Rebinds only the rows that moved
+        except tk.TclError: return
+        window_key = (event_list.window_start, len(event_list.slots), store.version)
+    window_start = event_list.window_start
+    closest_reorder_due = event_list.rows.next_reorder_time(window_start, window_start + len(event_list.slots), now)
+    closest_reorder_key = window_key
+
+
+def show_moved_series(moved_series, now):
+    """Re-renders the list window and re-formats the rows of series that moved to their next occurrence."""
+    try:
+        event_list.refresh() # Moves rows whose position changed
+        for series_event in moved_series:
+            if series_event['tree_id'] is not None:
+                event_tree.item(series_event['tree_id'], values=format_event_row(series_event['tree_id'], series_event, now))
+        update_calendar_markers()
+        on_tab_changed(None)
+    except tk.TclError as e: print(f"Error showing moved series (widget likely destroyed): {e}")
+
+
+@perf.timed("update_display tick")
 def update_display():
-    global tracked_events, root, event_tree, update_job_id
+    global root, event_tree, update_job_id
     # Check if essential widgets exist
     if not event_tree or not root or not root.winfo_exists():
         # Cancel timer if root or treeview is gone
@@ -552,50 +659,35 @@ def update_display():
         update_job_id = None; return # Stop the update loop
 
     now = datetime.now(); items_to_remove_from_tracking = []
-    current_tracked_tree_ids = set() # Keep track of IDs currently in our tracked_events list
 
-    try:
-        # Get visible items safely
-        visible_items_in_treeview = set(event_tree.get_children())
-    except tk.TclError:
-        # Treeview was destroyed between checks, cancel timer and stop
-        if update_job_id and root:
-            try: root.after_cancel(update_job_id)
-            except: pass
-        update_job_id = None; return
-
-    # Iterate over a copy in case tracked_events is modified elsewhere
-    current_tracked_events = tracked_events[:]
-    for event in current_tracked_events:
-        if 'target_dt' not in event: continue # Skip malformed event
-
-        tree_id = event.get('tree_id')
-        if tree_id:
-            current_tracked_tree_ids.add(tree_id) # Record the ID we expect to see
-
-            # Check if the event *should* be in the treeview and *is* actually there
-            if tree_id in visible_items_in_treeview:
-                difference = event['target_dt'] - now; formatted_diff = format_timedelta(difference)
-                indicator = calculate_indicator_symbol(event['target_dt'])
-                try:
-                    # Update existing item if it's still there
-                    event_tree.set(tree_id, column='diff', value=formatted_diff)
-                    event_tree.set(tree_id, column='indicator', value=indicator)
-                except tk.TclError:
-                    # Item was deleted from treeview between get_children and set, mark for removal from tracking
-                    items_to_remove_from_tracking.append(event)
-                    visible_items_in_treeview.discard(tree_id) # No longer visible
-            else:
-                 # Event has a tree_id but it's NOT in visible_items_in_treeview
-                 # This means it was likely deleted from the tree (e.g., by remove_selected_event)
-                 # Mark it for removal from our internal list to maintain consistency
-                 items_to_remove_from_tracking.append(event)
-        # else: # Event doesn't have a tree_id yet (maybe just added, will be handled by sort_and_redisplay)
-             # pass
+    # Only rows whose countdown text or indicator changes by now are due
+    for tree_id, formatted_diff, indicator in due_countdowns(now):
+        try:
+            # Update existing item if it's still there (skip Tcl calls for unchanged cells)
+            shown_diff, shown_indicator = shown_countdowns.get(tree_id, (None, None))
+            if formatted_diff != shown_diff: event_tree.set(tree_id, column='diff', value=formatted_diff)
+            if indicator != shown_indicator: event_tree.set(tree_id, column='indicator', value=indicator)
+            shown_countdowns[tree_id] = (formatted_diff, indicator)
+        except tk.TclError:
+            # Item was deleted from the treeview behind our back, stop tracking it
+            shown_countdowns.pop(tree_id, None); refresh_scheduler.discard(tree_id)
+            stale_event = store.find_by_tree_id(tree_id)
+            if stale_event: items_to_remove_from_tracking.append(stale_event)
+        except Exception as e: print(f"Unexpected error refreshing row {tree_id}: {e}")
+
+    # Series whose listed occurrence has passed move on to their next one
+    moved_series = store.advance_series(now)
+    if moved_series: show_moved_series(moved_series, now)
+
+    # Closest First order drifts as time passes; re-render only when rows actually swap
+    refresh_closest_order(now)
 
     # Clean up internal tracking list if necessary
     if items_to_remove_from_tracking:
-        tracked_events = [ev for ev in tracked_events if ev not in items_to_remove_from_tracking]
+        store.remove(items_to_remove_from_tracking)
+        if journal: journal.record_remove(items_to_remove_from_tracking); autosave.notify()
+        try: event_list.refresh()
+        except tk.TclError: pass
 
     # Schedule next update, checking root existence again
     try:
@@ -607,9 +699,35 @@ def update_display():
     except Exception as e: print(f"Unexpected error scheduling next update: {e}"); update_job_id = None
 
 
-def add_event_to_tracker(label, target_dt, location=None, is_custom=False):
+def due_countdowns(now):
+    """(tree_id, countdown text, indicator) of the Event List rows whose display changes by now.
+
+    Big in-memory stores tick through a NumPy StoreCountdowns (imported only
+    then, and only if NumPy is installed); everything else through refresh_scheduler.
+    """
+    global store_countdowns
+    use_array = isinstance(store, EventStore) and len(store) >= COUNTDOWN_ARRAY_MIN_EVENTS
+    if use_array and store_countdowns is None:
+        try:
+            from countdown_array import StoreCountdowns
+            store_countdowns = StoreCountdowns(store)
+        except ImportError: store_countdowns = False # Stay on the scheduler
+    if use_array and store_countdowns: return store_countdowns.due_rows(event_list.slot_events.items(), now)
+    due_rows = []
+    for tree_id, target_dt in refresh_scheduler.pop_due(now):
+        due_rows.append((tree_id, format_timedelta(target_dt - now), calculate_indicator_symbol(target_dt, now)))
+        refresh_scheduler.schedule(tree_id, target_dt, now)
+    return due_rows
+
+def refuse_read_only():
+    """Shows why edits aren't possible and returns True if the store is a read-only archive."""
+    if store.read_only: update_status(f"{os.path.basename(store.filename)} is a read-only archive; convert it with archive.py to-json to edit it.")
+    return store.read_only
+
+def add_event_to_tracker(label, target_dt, location=None, is_custom=False, recurrence=None):
+    if refuse_read_only(): return None
     # Check for duplicate label before adding
-    if any(e.get('label','').lower() == label.lower() for e in tracked_events):
+    if store.find_by_label(label) is not None:
         messagebox.showwarning("Duplicate Label", f"An event with the label '{label}' already exists.")
         return None # Indicate failure due to duplicate
 
@@ -617,15 +735,8 @@ def add_event_to_tracker(label, target_dt, location=None, is_custom=False):
         messagebox.showerror("Internal Error", "Target datetime missing for add_event_to_tracker.")
         return None # Indicate failure
 
-    new_event = {
-        'label': label,
-        'target_dt': target_dt,
-        'location': location if location else None,
-        'is_custom': is_custom,
-        'tree_id': None # Will be set when added to treeview by sort_and_redisplay
-    }
-    tracked_events.append(new_event)
-    return new_event # Return the added event
+    # tree_id will be set when added to treeview by sort_and_redisplay
+    return store.add(label, target_dt, location=location, is_custom=is_custom, recurrence=recurrence)
 
 
 def add_custom_event(event=None): # Accept event argument for binding
@@ -689,10 +800,21 @@ def add_custom_event(event=None): # Accept event argument for binding
     if target_date_obj and target_time_obj:
         target_dt = datetime.combine(target_date_obj, target_time_obj)
 
+        # --- Get Repeat Rule (first occurrence at the entered date/time) ---
+        repeat_str = repeat_var.get().strip() if repeat_var else REPEAT_NEVER
+        rrule_text = REPEAT_PRESETS.get(repeat_str.capitalize(), repeat_str) if repeat_str else None
+        recurrence = None
+        if rrule_text:
+            try: recurrence = RecurrenceRule.parse(rrule_text, target_dt)
+            except ValueError as e:
+                messagebox.showerror("Input Error", f"Invalid repeat rule: {e}\nUse a preset or an RRULE such as FREQ=WEEKLY;BYDAY=MO,WE.")
+                return
+
         # --- Add to Tracker (handles duplicate label check) ---
-        new_event = add_event_to_tracker(label, target_dt, location=location, is_custom=True)
+        new_event = add_event_to_tracker(label, target_dt, location=location, is_custom=True, recurrence=recurrence)
 
         if new_event: # If adding was successful (no duplicate label)
+            if journal: journal.record_add(new_event); autosave.notify()
             # --- Clear Input Fields ---
             label_entry_var.set("")
             # Reset date field carefully
@@ -706,9 +828,10 @@ def add_custom_event(event=None): # Accept event argument for binding
 
             time_entry_var.set(DEFAULT_TIME) # Reset time
             location_entry_var.set("") # Clear location
+            if repeat_var: repeat_var.set(REPEAT_NEVER) # Back to a one-off event
 
             update_status(f"Added custom event: {label}")
-            sort_and_redisplay() # Sort includes redisplay and updates calendar/week view
+            show_added_event(new_event) # Inserts just this row, no full re-sort/rebuild
             try:
                 if label_entry.winfo_exists(): label_entry.focus_set() # Set focus back to label for next entry
             except tk.TclError: pass
@@ -721,48 +844,134 @@ def add_custom_event(event=None): # Accept event argument for binding
         messagebox.showerror("Input Error", "Failed to determine target date or time.")
 
 
+# --- iCalendar Import ---
+
+def import_ics_file():
+    """Asks for an .ics file and imports it one batch per Tk callback, so the window stays responsive."""
+    global ics_import
+    if ics_import is not None: update_status("An import is already running."); return
+    if refuse_read_only(): return
+    path = filedialog.askopenfilename(title="Import iCalendar File", filetypes=[("iCalendar files", "*.ics"), ("All files", "*.*")])
+    if not path: return
+    progress = ImportProgress()
+    batches = import_batches(path, progress)
+    update_status(f"Importing {os.path.basename(path)}...", clear_after=False)
+    ics_import = (batches, root.after_idle(import_next_batch, batches, progress, 0))
+
+def import_next_batch(batches, progress, added_count):
+    """Commits one batch to the store, redisplays once and schedules the next batch."""
+    global ics_import
+    ics_import = None # Set again only once the next batch is scheduled, so an unexpected error can't block later imports
+    try:
+        try: batch = next(batches, None)
+        except (OSError, UnicodeError) as e:
+            update_status(f"Error importing file: {e}"); print(f"Error importing .ics file: {e}")
+            return
+        if batch is None:
+            update_status(f"Imported {added_count} events ({progress.vevents - added_count - progress.skipped} duplicate labels, {progress.skipped} invalid).")
+            return
+        batch_added = store.add_many(batch)
+        added_count += batch_added
+        if journal and batch_added:
+            journal.record_add_many([ev for ev in batch if store.find_by_label(ev['label']) is ev]) # Not the duplicates add_many skipped
+            autosave.notify()
+        if batch_added: sort_and_redisplay() # One redisplay per batch
+        update_status(f"Importing... {progress.fraction():.0%} ({added_count} events added)", clear_after=False)
+        try: ics_import = (batches, root.after(1, import_next_batch, batches, progress, added_count)) # Lets pending UI events run between batches
+        except tk.TclError: pass
+    finally:
+        if ics_import is None: batches.close() # Finished, failed or couldn't be rescheduled
+
+
+# --- Export ---
+
+def ask_export_range():
+    """Asks for an optional date range. Returns (start_dt, end_dt), (None, None) for everything, or None if cancelled."""
+    range_str = simpledialog.askstring("Export Range", "Export events from a date range, as YYYY-MM-DD to YYYY-MM-DD\n(inclusive; leave blank to export everything):", parent=root)
+    if range_str is None: return None
+    if not range_str.strip(): return (None, None)
+    try:
+        start_str, end_str = [part.strip() for part in range_str.lower().split(" to ")]
+        start_dt = datetime.strptime(start_str, EXPORT_RANGE_FORMAT)
+        end_dt = datetime.strptime(end_str, EXPORT_RANGE_FORMAT) + timedelta(days=1) # Inclusive end date
+    except ValueError:
+        messagebox.showerror("Input Error", f"Invalid range: {range_str!r}\nUse YYYY-MM-DD to YYYY-MM-DD.")
+        return None
+    if end_dt <= start_dt: messagebox.showerror("Input Error", "The range ends before it starts."); return None
+    return (start_dt, end_dt)
+
+def export_events_file():
+    """Asks for a target file and a range, then writes the export on a background thread."""
+    global export_job
+    if export_job is not None: update_status("An export is already running."); return
+    path = filedialog.asksaveasfilename(title="Export Events", defaultextension=".ics",
+                                        filetypes=[("iCalendar files", "*.ics"), ("CSV files", "*.csv")])
+    if not path: return
+    export_range = ask_export_range()
+    if export_range is None: return
+    start_dt, end_dt = export_range
+    try: export_job = ExportJob(path, events_for_export(store, start_dt, end_dt), expanded=start_dt is not None).start()
+    except ValueError as e: messagebox.showerror("Export Error", str(e)); return
+    update_status(f"Exporting to {os.path.basename(path)}...", clear_after=False)
+    root.after(EXPORT_POLL_MS, check_export)
+
+def check_export():
+    global export_job
+    if export_job is None: return
+    if not export_job.done():
+        try: root.after(EXPORT_POLL_MS, check_export)
+        except tk.TclError: pass
+        return
+    job, export_job = export_job, None
+    if job.error: update_status(f"Error exporting: {job.error}"); print(f"Error exporting to {job.path}: {job.error}")
+    else: update_status(f"Exported {job.count} events to {os.path.basename(job.path)}.")
+
+
 def remove_selected_event():
-    global tracked_events, remove_button, event_tree
-    if not event_tree or not remove_button: return # Widgets not ready
+    global remove_button, event_tree
+    if not event_tree or not event_list or not remove_button: return # Widgets not ready
 
     try:
         if not event_tree.winfo_exists(): return
-        selected_tree_ids = event_tree.selection() # Get tuple of selected item IDs
-        if not selected_tree_ids:
+        # Selection is tracked per event, including rows scrolled out of the materialized window
+        selected_events = event_list.selected_events()
+        if not selected_events:
             update_status("No events selected to remove.", clear_after=True)
             return
     except tk.TclError: return # Treeview likely destroyed
 
+    if refuse_read_only(): return
     # Confirmation dialog
-    num_selected = len(selected_tree_ids)
+    num_selected = len(selected_events)
     confirm_msg = f"Remove {num_selected} selected event(s)?" if num_selected > 1 else f"Remove selected event?"
     if not messagebox.askyesno("Confirm Removal", confirm_msg):
         return
 
+    event_list.clear_selection()
     removed_count = 0
-    tree_ids_to_remove = set(selected_tree_ids) # Use set for efficient lookup
-    new_tracked_events = [] # Build a new list of events to keep
-
-    # Iterate through the *current* tracked_events list
-    for event in tracked_events:
-        tree_id = event.get('tree_id')
-        if tree_id in tree_ids_to_remove:
-            # Event is selected for removal
-            removed_count += 1
-            # Try removing from Treeview widget if it still exists
-            try:
-                if event_tree.exists(tree_id):
-                    event_tree.delete(tree_id)
-            except tk.TclError: pass # Ignore error if item already gone from treeview
-            # Do *not* add this event to new_tracked_events
+    try:
+        if num_selected > BULK_REMOVE_THRESHOLD:
+            stored_events = list({id(ev): ev for ev in selected_events if store.find_by_label(ev['label']) is ev}.values()) # What remove() will drop
+            removed_count = store.remove(stored_events)
+            if journal and removed_count: journal.record_remove(stored_events); autosave.notify()
+            event_list.refresh() # Recycles the window's items for the remaining rows
+            update_calendar_markers() # Update calendar dots
         else:
-            # Event is not selected, keep it
-            new_tracked_events.append(event)
+            # Delete row by row from the bottom up so earlier positions stay valid
+            positioned_events = [(event_list.rows.index(ev), ev) for ev in selected_events]
+            positioned_events = [(pos, ev) for pos, ev in positioned_events if pos is not None]
+            positioned_events.sort(key=lambda pair: pair[0], reverse=True)
+            removed_events = []
+            for position, event in positioned_events:
+                if store.remove([event]): removed_events.append(event)
+                event_list.remove_row(position)
+            removed_count = len(removed_events)
+            if journal and removed_events: journal.record_remove(removed_events); autosave.notify()
+            for event in selected_events: unmark_calendar_date(event['target_dt'].date())
+    except tk.TclError as e: print(f"Error removing rows (widget likely destroyed): {e}")
 
     if removed_count > 0:
-        tracked_events = new_tracked_events # Update the main list
         update_status(f"Removed {removed_count} event(s).")
-        update_calendar_markers() # Update calendar dots
         on_tab_changed(None) # Trigger week view update if visible
         update_remove_button_state() # Disable remove button if selection is now empty
     else:
@@ -775,8 +984,8 @@ def update_remove_button_state(event=None): # Accept event for binding
     if remove_button and event_tree:
          try:
              if not remove_button.winfo_exists() or not event_tree.winfo_exists(): return
-             # Enable button only if there's a selection in the treeview
-             state = tk.NORMAL if event_tree.selection() else tk.DISABLED
+             # Enable button only if there's a selection in the event list
+             state = tk.NORMAL if event_list and event_list.selected else tk.DISABLED
              remove_button.config(state=state)
          except tk.TclError:
               # Handle case where treeview or button is destroyed during check
@@ -818,7 +1027,7 @@ def scroll_calendar_month(event):
 
 def show_events_for_selected_date(event=None): # Accept event argument
     """ Updates the label below the calendar with events for the selected date """
-    global calendar_widget, tracked_events, selected_date_event_var, selected_date_event_label
+    global calendar_widget, selected_date_event_var, selected_date_event_label
     if not tkcalendar_AVAILABLE or not calendar_widget or not selected_date_event_var or not selected_date_event_label:
         return # Components not ready
 
@@ -846,13 +1055,8 @@ def show_events_for_selected_date(event=None): # Accept event argument
         except: pass
         return
 
-    # Filter events for the selected date
-    matching_events = [
-        event for event in tracked_events
-        if 'target_dt' in event and event['target_dt'].date() == selected_date_obj
-    ]
-    # Sort events by time for the selected day
-    matching_events.sort(key=lambda ev: ev['target_dt'].time())
+    # Events and series occurrences for the selected date, sorted by time
+    matching_events = store.occurrences_on(selected_date_obj)
 
     # Format the display text
     if not matching_events:
@@ -880,6 +1084,36 @@ def show_events_for_selected_date(event=None): # Accept event argument
         print(f"Error updating selected date label: {e}")
 
 
+# --- Diagnostics Window (F12) ---
+
+def toggle_perf_window(event=None):
+    """Opens or closes the live view of the hot-path timings."""
+    global perf_window
+    if perf_window:
+        try: perf_window[0].destroy()
+        except tk.TclError: pass
+        perf_window = None; return
+    window = tk.Toplevel(root); window.title("Performance"); window.geometry("760x320")
+    window.protocol("WM_DELETE_WINDOW", toggle_perf_window)
+    controls = ttk.Frame(window, padding=(5, 5, 5, 0)); controls.pack(fill=tk.X)
+    ttk.Button(controls, text="Reset", command=perf.reset).pack(side=tk.LEFT)
+    ttk.Label(controls, text="Times in ms; tcl = Tcl calls per call.").pack(side=tk.LEFT, padx=10)
+    text = tk.Text(window, wrap=tk.NONE, font=('Courier', 10), padx=5, pady=5, state=tk.DISABLED)
+    text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    perf_window = (window, text)
+    refresh_perf_window()
+
+def refresh_perf_window():
+    if not perf_window: return
+    window, text = perf_window
+    try:
+        if not window.winfo_exists(): return
+        text.config(state=tk.NORMAL); text.delete('1.0', tk.END)
+        text.insert('1.0', perf.report()); text.config(state=tk.DISABLED)
+        root.after(PERF_REFRESH_MS, refresh_perf_window)
+    except tk.TclError: pass # Window closed
+
+
 def on_closing():
     global root, status_clear_job, update_job_id
     print("Closing application...")
@@ -892,9 +1126,23 @@ def on_closing():
         try: root.after_cancel(status_clear_job); print("Cancelled status clear.")
         except Exception as e: print(f"Error cancelling status: {e}");
     status_clear_job = None
+    if prefetcher: prefetcher.close()
+    if ics_import: # Batches already committed are kept (and journaled)
+        try: root.after_cancel(ics_import[1])
+        except tk.TclError: pass
+        ics_import[0].close()
+    if export_job: export_job.wait() # Don't leave a half-written temp file behind
 
-    # Save data
-    save_data()
+    # Nothing to write: every edit is already in the journal. Just let a running background save finish.
+    if autosave:
+        try: autosave.close()
+        except Exception as e: print(f"Error finishing autosave: {e}")
+    else:
+        try: store.save(); store.close()
+        except Exception as e: print(f"Error closing {store.filename}: {e}")
+    if perf_dump_filename:
+        try: perf.dump(perf_dump_filename); print(f"Wrote performance data to {perf_dump_filename}")
+        except Exception as e: print(f"Error writing {perf_dump_filename}: {e}")
 
     # Destroy window
     print("Destroying main window...")
@@ -906,9 +1154,159 @@ def on_closing():
         print(f"Error destroying window (may already be closing): {e}");
     root = None # Ensure root is cleared
 
+# --- Deferred Startup ---
+# Only the Event List is needed for the first frame. tkcalendar is loaded DEFERRED_STARTUP_DELAY_MS
+# after it; the Calendar and Week tabs are built the first time they are selected.
+
+def load_tkcalendar():
+    """Imports tkcalendar and sets up its locale date pattern, the first time. Returns tkcalendar_AVAILABLE."""
+    global tkcalendar_AVAILABLE, tkcalendar_checked, DateEntry, Calendar, tkcalendar_pattern
+    if tkcalendar_checked: return tkcalendar_AVAILABLE
+    tkcalendar_checked = True
+    try:
+        from tkcalendar import DateEntry, Calendar # Import Calendar widget too
+    except ImportError:
+        print("Warning: 'tkcalendar' library not found. Some features disabled.")
+        print("         Install with: pip install tkcalendar")
+        return False
+    import calendar
+    # Set first day of the week (optional, Monday is default in many locales)
+    # Let's default to Monday for consistency in the view
+    calendar.setfirstweekday(calendar.MONDAY)
+    # Common patterns: 'm/d/yy', 'mm/dd/yyyy', 'd-M-Y', 'dd-Mon-YYYY', etc.
+    # Let's use a locale-aware default if possible, otherwise a common one.
+    try:
+        # Use locale's short date format if possible
+        import locale
+        locale.setlocale(locale.LC_TIME, '') # Use system locale
+        pattern = locale.nl_langinfo(locale.D_FMT).replace('%','').lower()
+        # Basic conversion for common strftime codes to tkcalendar codes
+        pattern = pattern.replace('y', 'yy', 1) # %y -> yy (first occurrence only)
+        pattern = pattern.replace('yy', 'yyyy') # Ensure %Y -> yyyy
+        # For simplicity, stick to mm/dd/yyyy as fallback
+        if 'd' in pattern and 'm' in pattern and 'y' in pattern: tkcalendar_pattern = pattern
+    except Exception: pass # Keep the mm/dd/yyyy default
+    tkcalendar_AVAILABLE = True
+    return True
+
+def upgrade_date_input():
+    """Replaces the plain date entry with a DateEntry, keeping the date it holds."""
+    global date_input_widget
+    if not load_tkcalendar() or isinstance(date_input_widget, DateEntry): return
+    try:
+        if root.focus_get() is date_input_widget: # Don't swap the field out from under the user
+            root.after(DATE_INPUT_RETRY_MS, upgrade_date_input); return
+    except (tk.TclError, KeyError): pass # focus_get() can fail while a menu or dialog has focus
+    try: current_date = datetime.strptime(date_entry_var.get().strip(), DATE_FORMAT).date()
+    except ValueError: current_date = date.today()
+    try:
+        new_widget = DateEntry(input_frame, textvariable=date_entry_var,
+                               date_pattern=tkcalendar_pattern, width=18, borderwidth=2,
+                               state="readonly", # Forces calendar use
+                               )
+        new_widget.set_date(current_date)
+        date_input_widget.destroy(); date_input_widget = new_widget
+        date_input_widget.grid(row=2, column=1, padx=5, pady=6, sticky=tk.W)
+        date_hint_label.config(text=f"({tkcalendar_pattern.upper()})") # e.g., MM/DD/YYYY
+        apply_styles() # DateEntry colors
+    except tk.TclError as e: print(f"Error creating DateEntry: {e}")
+
+def build_calendar_tab():
+    """Fills the Calendar tab (loading tkcalendar if that hasn't happened yet)."""
+    global calendar_tab_built, calendar_widget, selected_date_event_var, selected_date_event_label
+    calendar_tab_built = True
+    if load_tkcalendar():
+        calendar_widget = Calendar(calendar_tab_frame, selectmode='day',
+                                   year=datetime.now().year, month=datetime.now().month, day=datetime.now().day,
+                                   showweeknumbers=False, date_pattern=tkcalendar_pattern,
+                                   showothermonthdays=False, # Cleaner look
+                                   # Styles are applied in apply_styles
+                                   )
+        calendar_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Event marker tag is configured during apply_styles / update_calendar_markers
+
+        # Bind events
+        calendar_widget.bind("<<CalendarSelected>>", show_events_for_selected_date)
+        calendar_widget.bind("<<CalendarMonthChanged>>", lambda event: update_calendar_markers()) # Markers cover the visible grid only
+        calendar_widget.bind("<MouseWheel>", scroll_calendar_month) # Windows/macOS
+        calendar_widget.bind("<Button-4>", scroll_calendar_month) # Linux scroll up
+        calendar_widget.bind("<Button-5>", scroll_calendar_month) # Linux scroll down
+
+        # Label to show events for the selected date
+        selected_date_event_var = tk.StringVar(root, value="Click a date on the calendar to see its events.")
+        # Initial wraplength calculation moved to show_events_for_selected_date for dynamic update
+        selected_date_event_label = ttk.Label(calendar_tab_frame,
+                                             textvariable=selected_date_event_var,
+                                             wraplength=300, # Initial placeholder, will be adjusted
+                                             padding=(5, 5), relief=tk.GROOVE, borderwidth=1, # Keep relief for visibility
+                                             justify=tk.LEFT, anchor='nw')
+        selected_date_event_label.pack(fill=tk.X, pady=(10, 0), padx=5, side=tk.BOTTOM)
+
+    else: # tkcalendar not available
+        ttk.Label(calendar_tab_frame,
+                  text="Calendar view requires 'tkcalendar'.\nInstall using pip:\npip install tkcalendar",
+                  wraplength=300, justify=tk.CENTER, style='TLabel' # Use default style
+                 ).pack(pady=50, padx=20, expand=True, fill=tk.BOTH)
+    apply_styles()
+
+def build_week_tab():
+    """Fills the Week View tab."""
+    global week_tab_built, week_view_label_var, week_view_text
+    week_tab_built = True
+    # Navigation controls for Week View
+    week_nav_frame = ttk.Frame(week_view_tab_frame)
+    week_nav_frame.pack(fill=tk.X, pady=(0, 5))
+
+    prev_week_btn = ttk.Button(week_nav_frame, text="◀ Prev Week", command=show_previous_week, width=12)
+    prev_week_btn.pack(side=tk.LEFT, padx=(0, 5))
+
+    today_week_btn = ttk.Button(week_nav_frame, text="Today", command=show_current_week, width=8)
+    today_week_btn.pack(side=tk.LEFT, padx=5)
+
+    next_week_btn = ttk.Button(week_nav_frame, text="Next Week ▶", command=show_next_week, width=12)
+    next_week_btn.pack(side=tk.LEFT, padx=(5, 10))
+
+    week_view_label_var = tk.StringVar(root, value="Week: Loading...")
+    week_label = ttk.Label(week_nav_frame, textvariable=week_view_label_var, anchor=tk.W)
+    week_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+    # Text area for displaying week events
+    week_text_frame = ttk.Frame(week_view_tab_frame) # Frame for text + scrollbar
+    week_text_frame.pack(fill=tk.BOTH, expand=True)
+
+    week_view_text = tk.Text(week_text_frame, wrap=tk.WORD, height=15, width=70,
+                             padx=5, pady=5, state=tk.DISABLED) # Start disabled (read-only)
+                             # Font/colors set by apply_styles
+
+    week_scrollbar_y = ttk.Scrollbar(week_text_frame, orient=tk.VERTICAL, command=week_view_text.yview, style='Vertical.TScrollbar')
+    week_view_text.configure(yscrollcommand=week_scrollbar_y.set)
+
+    # Use grid within the text_frame for layout flexibility
+    week_text_frame.grid_rowconfigure(0, weight=1)
+    week_text_frame.grid_columnconfigure(0, weight=1)
+    week_view_text.grid(row=0, column=0, sticky="nsew")
+    week_scrollbar_y.grid(row=0, column=1, sticky="ns")
+
+    # Define tags used in the text widget (colors/fonts applied in apply_styles)
+    base_font = tkFont.nametofont("TkDefaultFont") # Get default font for sizing
+    week_view_text.tag_configure("bold_date", font=(base_font.actual()['family'], base_font.actual()['size'], 'bold'))
+    week_view_text.tag_configure("event_item", lmargin1=15, lmargin2=15) # Indent event lines
+    apply_styles()
+
+def finish_startup():
+    """The startup work kept off the path to the first frame."""
+    upgrade_date_input()
+    startup_profile.mark("tkcalendar + date picker (deferred)")
+    if show_startup_profile: print(startup_profile.report())
+
 # --- Create Main Window ---
-root = tk.Tk(); root.title("Event Time Tracker"); root.geometry("950x700")
+root = tk.Tk()
+perf.count_tcl_calls(root) # Before any other widget, so they all share the counting interpreter
+root.title("Event Time Tracker"); root.geometry("950x700")
 root.minsize(600, 450) # Set a minimum size (increased height slightly for week view)
+autosave = AutosaveService(root, journal) if journal else None
+# The worker reads the store directly: only the in-memory store (a SQLite connection stays on its own thread)
+prefetcher = Prefetcher(root, store, compute_prefetch, deliver_prefetch) if isinstance(store, EventStore) else None
 
 # --- Style ---
 style = ttk.Style(root)
@@ -947,40 +1345,12 @@ location_entry.bind("<Return>", add_custom_event) # Bind Enter key
 
 # Row 2: Date
 ttk.Label(input_frame, text="Date:").grid(row=2, column=0, padx=5, pady=6, sticky=tk.W);
-date_entry_var = tk.StringVar(root)
-date_format_helper_text = ""
-if tkcalendar_AVAILABLE:
-    # Common patterns: 'm/d/yy', 'mm/dd/yyyy', 'd-M-Y', 'dd-Mon-YYYY', etc.
-    # Let's use a locale-aware default if possible, otherwise a common one.
-    try:
-        # Use locale's short date format if possible
-        import locale
-        locale.setlocale(locale.LC_TIME, '') # Use system locale
-        tkcalendar_pattern = locale.nl_langinfo(locale.D_FMT).replace('%','').lower()
-        # Basic conversion for common strftime codes to tkcalendar codes
-        tkcalendar_pattern = tkcalendar_pattern.replace('y', 'yy', 1) # %y -> yy (first occurrence only)
-        tkcalendar_pattern = tkcalendar_pattern.replace('yy', 'yyyy') # Ensure %Y -> yyyy
-        # Handle potential leading zeros if needed based on locale (tricky)
-        # For simplicity, stick to mm/dd/yyyy as fallback
-        if not ('d' in tkcalendar_pattern and 'm' in tkcalendar_pattern and 'y' in tkcalendar_pattern):
-            tkcalendar_pattern = 'mm/dd/yyyy' # Fallback
-    except Exception:
-        tkcalendar_pattern = 'mm/dd/yyyy' # Default fallback
-
-    date_input_widget = DateEntry(input_frame, textvariable=date_entry_var,
-                                  date_pattern=tkcalendar_pattern, width=18, borderwidth=2,
-                                  state="readonly", # Forces calendar use
-                                  )
-    date_input_widget.set_date(date.today()) # Set initial value
-    date_format_helper_text = tkcalendar_pattern.upper() # e.g., MM/DD/YYYY
-else:
-    # Fallback to standard Entry if tkcalendar not installed
-    date_input_widget = ttk.Entry(input_frame, textvariable=date_entry_var, width=20)
-    default_date_str = date.today().strftime(DATE_FORMAT); date_entry_var.set(default_date_str)
-    date_format_helper_text = DATE_FORMAT # e.g., Month DD, YYYY
+date_entry_var = tk.StringVar(root, value=date.today().strftime(DATE_FORMAT))
+# A plain entry for the first frame; upgrade_date_input() swaps in a DateEntry once tkcalendar is loaded
+date_input_widget = ttk.Entry(input_frame, textvariable=date_entry_var, width=20)
 date_input_widget.grid(row=2, column=1, padx=5, pady=6, sticky=tk.W)
 # Add a subtle label showing the expected format
-date_hint_label = ttk.Label(input_frame, text=f"({date_format_helper_text})", foreground="grey")
+date_hint_label = ttk.Label(input_frame, text=f"({DATE_FORMAT})", foreground="grey")
 date_hint_label.grid(row=2, column=2, padx=5, pady=6, sticky=tk.W)
 
 # Row 3: Time
@@ -992,9 +1362,18 @@ time_hint_label = ttk.Label(input_frame, text="(HH:MM:SS)", foreground="grey")
 time_hint_label.grid(row=3, column=2, padx=5, pady=6, sticky=tk.W)
 time_entry.bind("<Return>", add_custom_event) # Bind Enter key
 
-# Row 4: Add Button (Centered)
+# Row 4: Repeat (preset or typed RRULE)
+ttk.Label(input_frame, text="Repeat:").grid(row=4, column=0, padx=5, pady=6, sticky=tk.W);
+repeat_var = tk.StringVar(root, value=REPEAT_NEVER);
+repeat_combobox = ttk.Combobox(input_frame, textvariable=repeat_var, values=list(REPEAT_PRESETS), width=24);
+repeat_combobox.grid(row=4, column=1, padx=5, pady=6, sticky=tk.W);
+repeat_hint_label = ttk.Label(input_frame, text="(or an RRULE, e.g. FREQ=WEEKLY;BYDAY=MO,WE)", foreground="grey")
+repeat_hint_label.grid(row=4, column=2, padx=5, pady=6, sticky=tk.W)
+repeat_combobox.bind("<Return>", add_custom_event) # Bind Enter key
+
+# Row 5: Add Button (Centered)
 add_button_frame = ttk.Frame(input_frame); # Use a frame to center the button
-add_button_frame.grid(row=4, column=0, columnspan=4, pady=(10, 5));
+add_button_frame.grid(row=5, column=0, columnspan=4, pady=(10, 5));
 add_button = ttk.Button(add_button_frame, text="Add Custom Event", command=add_custom_event);
 add_button.pack() # Pack inside the frame to center it
 
@@ -1040,9 +1419,10 @@ event_tree.column('location', width=150, minwidth=100, anchor=tk.W, stretch=tk.Y
 event_tree.column('target_dt_str', width=180, minwidth=160, anchor=tk.CENTER, stretch=tk.NO);
 event_tree.column('diff', width=180, minwidth=120, anchor=tk.W, stretch=tk.NO)
 
-# Scrollbar
-scrollbar = ttk.Scrollbar(tree_container, orient=tk.VERTICAL, command=event_tree.yview, style='Vertical.TScrollbar');
-event_tree.configure(yscrollcommand=scrollbar.set);
+# Scrollbar (driven by the virtual list, which spans the whole sorted model)
+scrollbar = ttk.Scrollbar(tree_container, orient=tk.VERTICAL, style='Vertical.TScrollbar');
+event_list = VirtualTreeview(event_tree, scrollbar, format_event_row, release_row=release_event_row,
+                             set_tree_id=store.set_tree_id)
 
 # Grid layout for treeview and scrollbar
 tree_container.grid_columnconfigure(0, weight=1); # Treeview expands horizontally
@@ -1050,91 +1430,22 @@ tree_container.grid_rowconfigure(0, weight=1); # Treeview expands vertically
 event_tree.grid(row=0, column=0, sticky='nsew');
 scrollbar.grid(row=0, column=1, sticky='ns');
 
-# Bind selection change to update button state
-event_tree.bind('<<TreeviewSelect>>', update_remove_button_state)
+# Bind selection change to update button state (after the virtual list's own handler)
+event_tree.bind('<<TreeviewSelect>>', update_remove_button_state, add='+')
 
 # --- Tab 2: Calendar View ---
 calendar_tab_frame = ttk.Frame(notebook, padding=10);
 calendar_tab_frame.pack(fill=tk.BOTH, expand=True)
 notebook.add(calendar_tab_frame, text=' Calendar View ')
 
-if tkcalendar_AVAILABLE:
-    # Use the same pattern determined for DateEntry for consistency
-    calendar_pattern = tkcalendar_pattern if 'tkcalendar_pattern' in globals() else 'mm/dd/yyyy'
-    calendar_widget = Calendar(calendar_tab_frame, selectmode='day',
-                               year=datetime.now().year, month=datetime.now().month, day=datetime.now().day,
-                               showweeknumbers=False, date_pattern=calendar_pattern,
-                               showothermonthdays=False, # Cleaner look
-                               # Styles are applied in apply_styles
-                               )
-    calendar_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-    # Event marker tag is configured during apply_styles / update_calendar_markers
-
-    # Bind events
-    calendar_widget.bind("<<CalendarSelected>>", show_events_for_selected_date)
-    calendar_widget.bind("<MouseWheel>", scroll_calendar_month) # Windows/macOS
-    calendar_widget.bind("<Button-4>", scroll_calendar_month) # Linux scroll up
-    calendar_widget.bind("<Button-5>", scroll_calendar_month) # Linux scroll down
-
-    # Label to show events for the selected date
-    selected_date_event_var = tk.StringVar(root, value="Click a date on the calendar to see its events.")
-    # Initial wraplength calculation moved to show_events_for_selected_date for dynamic update
-    selected_date_event_label = ttk.Label(calendar_tab_frame,
-                                         textvariable=selected_date_event_var,
-                                         wraplength=300, # Initial placeholder, will be adjusted
-                                         padding=(5, 5), relief=tk.GROOVE, borderwidth=1, # Keep relief for visibility
-                                         justify=tk.LEFT, anchor='nw')
-    selected_date_event_label.pack(fill=tk.X, pady=(10, 0), padx=5, side=tk.BOTTOM)
-
-else: # tkcalendar not available
-    ttk.Label(calendar_tab_frame,
-              text="Calendar view requires 'tkcalendar'.\nInstall using pip:\npip install tkcalendar",
-              wraplength=300, justify=tk.CENTER, style='TLabel' # Use default style
-             ).pack(pady=50, padx=20, expand=True, fill=tk.BOTH)
+# Contents are built by build_calendar_tab() when the tab is first selected
 
 # --- Tab 3: Week View ---
 week_view_tab_frame = ttk.Frame(notebook, padding=10)
 week_view_tab_frame.pack(fill=tk.BOTH, expand=True)
 notebook.add(week_view_tab_frame, text=' Week View ')
 
-# Navigation controls for Week View
-week_nav_frame = ttk.Frame(week_view_tab_frame)
-week_nav_frame.pack(fill=tk.X, pady=(0, 5))
-
-prev_week_btn = ttk.Button(week_nav_frame, text="◀ Prev Week", command=show_previous_week, width=12)
-prev_week_btn.pack(side=tk.LEFT, padx=(0, 5))
-
-today_week_btn = ttk.Button(week_nav_frame, text="Today", command=show_current_week, width=8)
-today_week_btn.pack(side=tk.LEFT, padx=5)
-
-next_week_btn = ttk.Button(week_nav_frame, text="Next Week ▶", command=show_next_week, width=12)
-next_week_btn.pack(side=tk.LEFT, padx=(5, 10))
-
-week_view_label_var = tk.StringVar(root, value="Week: Loading...")
-week_label = ttk.Label(week_nav_frame, textvariable=week_view_label_var, anchor=tk.W)
-week_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
-
-# Text area for displaying week events
-week_text_frame = ttk.Frame(week_view_tab_frame) # Frame for text + scrollbar
-week_text_frame.pack(fill=tk.BOTH, expand=True)
-
-week_view_text = tk.Text(week_text_frame, wrap=tk.WORD, height=15, width=70,
-                         padx=5, pady=5, state=tk.DISABLED) # Start disabled (read-only)
-                         # Font/colors set by apply_styles
-
-week_scrollbar_y = ttk.Scrollbar(week_text_frame, orient=tk.VERTICAL, command=week_view_text.yview, style='Vertical.TScrollbar')
-week_view_text.configure(yscrollcommand=week_scrollbar_y.set)
-
-# Use grid within the text_frame for layout flexibility
-week_text_frame.grid_rowconfigure(0, weight=1)
-week_text_frame.grid_columnconfigure(0, weight=1)
-week_view_text.grid(row=0, column=0, sticky="nsew")
-week_scrollbar_y.grid(row=0, column=1, sticky="ns")
-
-# Define tags used in the text widget (colors/fonts applied in apply_styles)
-base_font = tkFont.nametofont("TkDefaultFont") # Get default font for sizing
-week_view_text.tag_configure("bold_date", font=(base_font.actual()['family'], base_font.actual()['size'], 'bold'))
-week_view_text.tag_configure("event_item", lmargin1=15, lmargin2=15) # Indent event lines
+# Contents are built by build_week_tab() when the tab is first selected
 
 
 # --- Bottom Controls (Below Notebook) ---
@@ -1154,12 +1465,20 @@ dark_mode_check.pack(side=tk.LEFT, padx=(10, 5)) # Add padding
 remove_button = ttk.Button(bottom_frame, text="Remove Selected", command=remove_selected_event, state=tk.DISABLED);
 remove_button.pack(side=tk.RIGHT, padx=(5, 0)) # Pack to the right
 
+# Import/Export Buttons (Left of Remove)
+export_button = ttk.Button(bottom_frame, text="Export...", command=export_events_file)
+export_button.pack(side=tk.RIGHT, padx=(5, 0))
+import_button = ttk.Button(bottom_frame, text="Import .ics...", command=import_ics_file)
+import_button.pack(side=tk.RIGHT, padx=(5, 0))
+
 
 # --- Initial Setup & Start ---
 def initialize_app():
-    global dark_mode_var, settings, tracked_events, current_week_start_date # Added week start date
+    global dark_mode_var, settings, current_week_start_date # Added week start date
+    startup_profile.mark("main loop start")
     update_status("Loading data...")
-    loaded_custom_events = load_data() # Loads settings AND events now
+    load_data() # Loads settings AND custom events into the store
+    replay_journal() # Edits made after that snapshot (e.g. before a crash)
 
     # Set dark mode checkbox based on loaded settings *before* applying styles
     if dark_mode_var:
@@ -1171,26 +1490,15 @@ def initialize_app():
     # Apply initial style based on loaded settings
     apply_styles()
 
-    # Add loaded custom events first
-    tracked_events.extend(loaded_custom_events)
-
     # Add built-in events (avoiding duplicates with loaded custom ones)
     update_status("Adding built-in events...")
-    loaded_custom_labels = {ev.get('label','').lower() for ev in tracked_events if ev.get('is_custom', False)};
-    built_in_added = 0
-    for label, (month, day) in INITIAL_EVENTS_DATA.items():
-        # Only add if a custom event with the same label doesn't exist
-        if label.lower() not in loaded_custom_labels:
-            next_date = calculate_next_occurrence(month, day)
-            if next_date:
-                # Add built-in event with default time 00:00:00
-                add_event_to_tracker(label, datetime.combine(next_date, datetime.min.time()),
-                                     location=None, is_custom=False)
-                built_in_added += 1
+    built_in_added = store.add_builtin_events()
 
     if built_in_added > 0: update_status(f"Added {built_in_added} built-in events.")
     else: update_status("No new built-in events added (might exist as custom).") # More informative status
 
+    startup_profile.mark("load data + built-ins")
+
     # Set initial week view date
     current_week_start_date = get_week_start(date.today())
 
@@ -1204,10 +1512,16 @@ def initialize_app():
 
     # Start the periodic update loop for time differences in the list view
     update_display();
+    startup_profile.mark("event list")
 
     update_status("Ready.") # Final status
+    root.update_idletasks() # Draw the populated window now: the first usable frame
+    startup_profile.mark("first frame")
+    root.after(DEFERRED_STARTUP_DELAY_MS, finish_startup)
 
 # Schedule initialization after the main loop starts
-root.after(100, initialize_app)
+startup_profile.mark("window + widgets")
+root.after_idle(initialize_app)
 root.protocol("WM_DELETE_WINDOW", on_closing);
+root.bind_all("<F12>", toggle_perf_window) # Hidden diagnostics window
 root.mainloop()
\ No newline at end of file
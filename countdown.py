@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Works out when a row's countdown text or indicator next changes.
+
+format_timedelta() only shows seconds within a day of the target (and for the
+first minute after it just says "Just now or Past"), and the indicator symbol
+only changes at the INDICATOR_THRESHOLD_* boundaries. RefreshScheduler keeps
+the next change time of every row in a heap, so each tick only touches the
+rows whose displayed values actually change.
+"""
+from datetime import timedelta
+import heapq
+import itertools
+
+from event_store import INDICATOR_THRESHOLD_URGENT, INDICATOR_THRESHOLD_SOON, INDICATOR_THRESHOLD_NEAR
+
+
+SECONDS_PER_DAY = 86400
+# Indicator bucket edges in seconds, largest first (a bucket includes its upper edge)
+INDICATOR_EDGES = (INDICATOR_THRESHOLD_NEAR * SECONDS_PER_DAY, INDICATOR_THRESHOLD_SOON * SECONDS_PER_DAY,
+                   INDICATOR_THRESHOLD_URGENT * SECONDS_PER_DAY)
+CHANGE_MARGIN_SECONDS = 0.001 # Land just past a boundary rather than exactly on it
+
+
+def seconds_until_text_change(seconds_left):
+    """Seconds until format_timedelta() of a delta of seconds_left gives a different string."""
+    whole = int(seconds_left) # Truncates toward zero, like format_timedelta
+    if whole == 0: return seconds_left + 1 # "In: 0s" until a full second has passed
+    if seconds_left > 0:
+        if whole >= SECONDS_PER_DAY: return seconds_left - 60 * (whole // 60) # "Xd Yh Zm": once a minute
+        return seconds_left - whole # Within a day: every second
+    elapsed = -seconds_left; whole = -whole
+    if whole < 60: return 60 - elapsed # "Just now or Past" for the first minute
+    if whole >= SECONDS_PER_DAY: return 60 * (whole // 60 + 1) - elapsed
+    return whole + 1 - elapsed
+
+def seconds_until_indicator_change(seconds_left):
+    """Seconds until calculate_indicator_symbol() changes bucket, or None if it never will."""
+    if seconds_left < 0: return None # INDICATOR_PAST is final
+    for edge in INDICATOR_EDGES:
+        if seconds_left > edge: return seconds_left - edge
+    return seconds_left # Urgent until the target passes
+
+def next_change_time(target_dt, now):
+    """Returns the datetime at which the row for target_dt next needs refreshing."""
+    seconds_left = (target_dt - now).total_seconds()
+    wait = seconds_until_text_change(seconds_left)
+    indicator_wait = seconds_until_indicator_change(seconds_left)
+    if indicator_wait is not None and indicator_wait < wait: wait = indicator_wait
+    return now + timedelta(seconds=wait + CHANGE_MARGIN_SECONDS)
+
+
+class RefreshScheduler:
+    """Min-heap of row refresh times, keyed by any hashable row key (e.g. a Treeview item id).
+
+    Rescheduling or discarding a key leaves its old heap entry behind; stale
+    entries are skipped when popped and the heap is rebuilt when they pile up.
+    """
+
+    def __init__(self):
+        self._heap = [] # (due, seq, key)
+        self._entries = {} # key -> (seq, target_dt) of its live heap entry
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def clear(self):
+        self._heap.clear(); self._entries.clear()
+
+    def schedule(self, key, target_dt, now):
+        """(Re)schedules key for the next time its countdown display changes."""
+        seq = next(self._counter)
+        self._entries[key] = (seq, target_dt)
+        heapq.heappush(self._heap, (next_change_time(target_dt, now), seq, key))
+        if len(self._heap) > 2 * len(self._entries) + 64: self._compact()
+
+    def schedule_many(self, keyed_targets, now):
+        """Schedules (key, target_dt) pairs in one O(n) heapify, e.g. after a full redisplay."""
+        for key, target_dt in keyed_targets:
+            seq = next(self._counter)
+            self._entries[key] = (seq, target_dt)
+            self._heap.append((next_change_time(target_dt, now), seq, key))
+        heapq.heapify(self._heap)
+
+    def discard(self, key):
+        self._entries.pop(key, None)
+
+    def pop_due(self, now):
+        """Removes and returns the (key, target_dt) pairs due at or before now.
+
+        Callers refresh those rows and schedule() them again.
+        """
+        due_rows = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, seq, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != seq: continue # Stale entry
+            del self._entries[key]
+            due_rows.append((key, entry[1]))
+        return due_rows
+
+    def _compact(self):
+        live_seqs = {seq for seq, _ in self._entries.values()}
+        self._heap = [item for item in self._heap if item[1] in live_seqs]
+        heapq.heapify(self._heap)
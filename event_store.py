@@ -0,0 +1,698 @@
+# -*- coding: utf-8 -*-
+"""GUI-free core of the Event Time Tracker.
+
+Holds the shared constants, the time/countdown helpers and the EventStore
+class (add/remove/query/sort/persist). Only lightweight standard-library
+modules are imported here, so batch jobs and servers can load and query the
+event data without tkinter, tkcalendar or any locale setup.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+import json
+from operator import attrgetter
+import os
+import sys
+
+from holidays import HOLIDAY_RULES, next_holiday_dates, holidays_between
+from recurrence import RecurrenceRule, SERIES_GRACE, expand
+
+
+# --- Constants ---
+DATE_FORMAT = "%B %d, %Y" # For display in treeview, status messages etc.
+DATE_FORMAT_SHORT = "%a, %b %d, %Y" # For Week View day headers
+TIME_FORMAT = "%H:%M:%S"
+DATETIME_ISO_FORMAT = "%Y-%m-%dT%H:%M:%S" # For saving/loading
+DATETIME_DISPLAY_FORMAT = "%b %d, %Y %H:%M:%S" # For treeview display
+SAVE_FILENAME = "event_tracker_data.json" # Renamed to reflect content
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3') # Save file names that select the SQLite backend
+ARCHIVE_SUFFIX = ".evarc" # Save file names that open a read-only archive (archive.py)
+LOAD_BATCH_SIZE = 10000 # Events built per fast-path batch in EventStore.load()
+WEEK_TOUCH_LIMIT = 256 # Bulk edits larger than this invalidate every week at once
+
+# Sort Options
+SORT_ALPHA = "Alphabetical (A-Z)"
+SORT_ALPHA_REV = "Alphabetical (Z-A)"
+SORT_CLOSEST = "Closest First"
+SORT_OPTIONS = [SORT_CLOSEST, SORT_ALPHA, SORT_ALPHA_REV]
+DEFAULT_SORT = SORT_CLOSEST
+
+# Indicator Symbols & Thresholds
+INDICATOR_PAST = '✅'; INDICATOR_URGENT = '🔥'; INDICATOR_SOON = '⏳'
+INDICATOR_NEAR = '🗓️'; INDICATOR_FAR = '•'
+INDICATOR_THRESHOLD_URGENT = 1; INDICATOR_THRESHOLD_SOON = 7; INDICATOR_THRESHOLD_NEAR = 30
+
+DEFAULT_SETTINGS = {"dark_mode": False} # Default to light mode
+
+# Built-in yearly events: label -> (month, day) or (month, weekday, ordinal); see holidays.py
+INITIAL_EVENTS_DATA = HOLIDAY_RULES
+
+
+# --- Helper Functions ---
+
+def get_week_start(ref_date):
+    """Calculates the start date (Monday) of the week containing ref_date."""
+    # weekday() returns 0 for Monday, 6 for Sunday
+    start_delta = timedelta(days=ref_date.weekday())
+    return ref_date - start_delta
+
+def format_timedelta(delta):
+    total_seconds = int(delta.total_seconds()); prefix = "In: " if total_seconds >= 0 else "Ago: "
+    total_seconds = abs(total_seconds); sign = 1 if prefix == "In: " else -1
+    days, rem_secs = divmod(total_seconds, 86400); hours, rem_secs = divmod(rem_secs, 3600); minutes, seconds = divmod(rem_secs, 60)
+    if sign == -1 and days == 0 and hours == 0 and minutes == 0 and seconds < 60: return "Just now or Past"
+    parts = [];
+    if days > 0: parts.append(f"{days}d");
+    if hours > 0: parts.append(f"{hours}h")
+    if minutes > 0: parts.append(f"{minutes}m")
+    if (days == 0 and total_seconds > 0) or not parts : parts.append(f"{seconds}s")
+    if not parts: return "Now"
+    return prefix + " ".join(parts)
+
+def calculate_indicator_symbol(target_dt, now=None):
+    if now is None: now = datetime.now() # Pass now in when formatting many rows at once
+    delta = target_dt - now; days_left = delta.total_seconds() / 86400.0
+    if days_left < 0: return INDICATOR_PAST
+    elif days_left <= INDICATOR_THRESHOLD_URGENT: return INDICATOR_URGENT
+    elif days_left <= INDICATOR_THRESHOLD_SOON: return INDICATOR_SOON
+    elif days_left <= INDICATOR_THRESHOLD_NEAR: return INDICATOR_NEAR
+    else: return INDICATOR_FAR
+
+
+class Event:
+    """One event record: label, target_dt, location, is_custom, tree_id and, for a series, recurrence.
+
+    A slotted object rather than a dict, so a record takes well under half the
+    memory (no per-record hash table; see benchmark.py --memory). Code in this
+    module reads the attributes; the rest of the app uses the dict-style access
+    it was written against: event.label, event.get('location'), keys(),
+    items() and copy(), with 'recurrence' present only on a series (a one-off
+    event's recurrence attribute is None). Unknown or absent keys raise
+    KeyError. Records compare by identity, as the indexes expect.
+    """
+    __slots__ = ('label', 'target_dt', 'location', 'is_custom', 'tree_id', 'recurrence', '__weakref__') # Weakly cached by SQLiteEventStore
+
+    def __init__(self, label, target_dt, location=None, is_custom=False, recurrence=None):
+        self.label = label; self.target_dt = target_dt; self.location = location; self.is_custom = is_custom
+        self.tree_id = None # Set by the front end when the event is displayed
+        self.recurrence = recurrence
+
+    def __getitem__(self, key):
+        if key in EVENT_KEYS and (key != 'recurrence' or self.recurrence is not None): return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in EVENT_KEYS: raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in EVENT_KEYS and (key != 'recurrence' or self.recurrence is not None)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self else default
+
+    def keys(self):
+        return EVENT_FIELDS if self.recurrence is not None else EVENT_FIELDS[:-1]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def copy(self):
+        event = Event(self.label, self.target_dt, self.location, self.is_custom, self.recurrence); event.tree_id = self.tree_id
+        return event
+
+    def __repr__(self):
+        return f"Event({dict(self.items())!r})"
+
+EVENT_FIELDS = Event.__slots__[:-1] # In make_event() order, recurrence last
+EVENT_KEYS = frozenset(EVENT_FIELDS)
+
+def make_event(label, target_dt, location=None, is_custom=False, recurrence=None):
+    """Builds the event record used throughout the app.
+
+    A recurring event (a series) also carries its RecurrenceRule under
+    'recurrence'; its target_dt is the occurrence the list shows (see
+    RecurrenceRule.series_target()). Locations are interned: a store
+    usually has many events at the same few places.
+    """
+    return Event(label, target_dt, sys.intern(location) if location else None, is_custom, recurrence)
+
+def occurrence_of(series, occurrence_dt):
+    """A read-only copy of a series event for one of its occurrences (for week/day views)."""
+    occurrence = series.copy(); occurrence.target_dt = occurrence_dt
+    return occurrence
+
+
+EPOCH = datetime(1970, 1, 1) # Binary/SQL backends store the naive target_dt as whole seconds since this
+ONE_SECOND = timedelta(seconds=1)
+
+def to_epoch_seconds(dt):
+    return (dt - EPOCH) // ONE_SECOND
+
+def from_epoch_seconds(seconds):
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def event_to_record(event):
+    """Save-file layout of one custom event."""
+    recurrence = event.recurrence
+    start_dt = recurrence.dtstart if recurrence else event.target_dt # A series is saved from its first occurrence
+    record = {'label': event.label, 'target_dt_iso': start_dt.strftime(DATETIME_ISO_FORMAT)}
+    if event.location: record['location'] = event.location
+    if recurrence:
+        record['rrule'] = recurrence.to_rrule()
+        if recurrence.exdates: record['exdates'] = sorted(exdate.strftime(DATETIME_ISO_FORMAT) for exdate in recurrence.exdates)
+    return record
+
+def parse_iso_datetime(text):
+    """datetime.strptime(text, DATETIME_ISO_FORMAT), but via the C fromisoformat() for the canonical form.
+
+    strptime goes through regex matching and locale checks and is ~10x slower.
+    Only the exact YYYY-MM-DDTHH:MM:SS layout takes the fast path: fromisoformat()
+    also accepts e.g. UTC offsets ("2024-01-01T10:00+01"), which would give an
+    aware datetime that can't be compared with the store's naive ones.
+    """
+    if (len(text) == 19 and text[4] == '-' and text[7] == '-' and text[10] == 'T' and text[13] == ':' and text[16] == ':'
+            and (text[:4] + text[5:7] + text[8:10] + text[11:13] + text[14:16] + text[17:]).isdigit()):
+        return datetime.fromisoformat(text)
+    return datetime.strptime(text, DATETIME_ISO_FORMAT)
+
+def event_from_record(item):
+    """Builds a custom event from its save-file layout; None if it has no label.
+
+    Raises KeyError/ValueError/TypeError for malformed items.
+    """
+    target_dt = parse_iso_datetime(item['target_dt_iso'])
+    label = item.get('label')
+    if not label: return None
+    if not isinstance(label, str): raise TypeError(f"label must be a string, not {type(label).__name__}")
+    recurrence = None
+    if item.get('rrule'):
+        recurrence = RecurrenceRule.parse(item['rrule'], target_dt, exdates=[parse_iso_datetime(exdate) for exdate in item.get('exdates', [])])
+        target_dt = recurrence.series_target()
+    return make_event(label, target_dt, location=item.get('location', None), is_custom=True, recurrence=recurrence)
+
+def events_from_records(items):
+    """Batch version of event_from_record() for loading: builds the Event records inline.
+
+    Raises KeyError/ValueError/TypeError/AttributeError on the first malformed item;
+    callers fall back to event_from_record() per item for that batch. Series
+    (items with an 'rrule') go through event_from_record().
+    """
+    parse = parse_iso_datetime; intern = sys.intern
+    if not all(type(item.get('label') or '') is str for item in items): raise TypeError("label must be a string")
+    events = [Event(item['label'], parse(item['target_dt_iso']), intern(item['location']) if item.get('location') else None, True)
+              for item in items if item.get('label') and 'rrule' not in item]
+    if len(events) < len(items): events.extend(event_from_record(item) for item in items if item.get('label') and 'rrule' in item)
+    return events
+
+def builtin_occurrences(store, start_dt, end_dt):
+    """Copies of the stored built-in events for their other years' dates in [start_dt, end_dt) (from the holiday table)."""
+    occurrences = []
+    for day, label in holidays_between(start_dt.date(), end_dt.date() + timedelta(days=1)):
+        occurrence_dt = datetime.combine(day, datetime.min.time())
+        if not start_dt <= occurrence_dt < end_dt: continue
+        builtin_event = store.find_by_label(label)
+        if builtin_event is None or builtin_event.is_custom or builtin_event.target_dt == occurrence_dt: continue # Shadowed, or already listed
+        occurrences.append(occurrence_of(builtin_event, occurrence_dt))
+    return occurrences
+
+def merge_occurrences(events, series, start_dt, end_dt, extra=()):
+    """The one-off events among events plus each occurrence of the given series in [start_dt, end_dt), in time order.
+
+    Series windows come from recurrence.expand(), so re-reading a window is a
+    cache hit. extra holds further ready-made occurrences (built-in holidays).
+    """
+    occurrences = [ev for ev in events if ev.recurrence is None]
+    for series_event in series:
+        occurrences.extend(occurrence_of(series_event, occurrence_dt) for occurrence_dt in expand(series_event.recurrence, start_dt, end_dt))
+    occurrences.extend(extra)
+    if series or extra: occurrences.sort(key=attrgetter('target_dt')) # Stable: equal times keep store order
+    return occurrences
+
+def snapshot_data(events, settings, journal_seq=0):
+    """JSON-ready save layout: settings plus the custom events among events.
+
+    journal_seq records the last journal entry the snapshot already includes.
+    """
+    data = {"settings": dict(settings), "events": [event_to_record(ev) for ev in events if ev.is_custom]}
+    if journal_seq: data["journal_seq"] = journal_seq
+    return data
+
+def write_json_atomic(path, data):
+    """Writes data to a temp file, fsyncs it and renames it over path.
+
+    A crash at any point leaves either the old or the new file, never a torn one.
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+        f.flush(); os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def _label_sort_key(event):
+    return event.label.lower()
+
+def label_identity_key(label):
+    """Key under which two labels count as duplicates (case-insensitive)."""
+    return label.casefold()
+
+
+# --- Sorted Views ---
+
+class LabelOrderView:
+    """Alphabetical (A-Z, or Z-A with reverse=True) view of a store, as a read-only sequence.
+
+    Reads straight from the store's label-ordered list, so it stays current
+    as events are added and removed.
+    """
+
+    def __init__(self, store, reverse=False):
+        self.store = store; self.reverse = reverse
+
+    def __len__(self):
+        return len(self.store.events)
+
+    def __getitem__(self, index):
+        events = self.store.events
+        if isinstance(index, slice):
+            start, stop, _ = index.indices(len(events))
+            if not self.reverse: return events[start:stop]
+            total = len(events)
+            return events[max(0, total - stop):total - start][::-1]
+        if index < 0: index += len(events)
+        return events[len(events) - 1 - index] if self.reverse else events[index]
+
+    def index(self, event):
+        """Row of event in this view, or None."""
+        position = self.store._label_position(event)
+        if position is None or not self.reverse: return position
+        return len(self.store.events) - 1 - position
+
+
+class ClosestFirstView:
+    """Events ordered by distance from the current instant (past or future), as a read-only sequence.
+
+    Past events newest-first and future events soonest-first are two runs that
+    are already sorted in the store's time index. Rows are read off a two-way
+    merge of those runs starting at the requested position (a binary search
+    finds where), so the order is right at whatever moment it's read, nothing
+    is ever re-sorted, and only the requested rows are materialized. On equal
+    distance the past event comes first.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store._index_times)
+
+    def __getitem__(self, index):
+        total = len(self)
+        if isinstance(index, slice):
+            start, stop, _ = index.indices(total)
+            return self.rows(start, stop)
+        if index < 0: index += total
+        if not 0 <= index < total: raise IndexError("ClosestFirstView index out of range")
+        return self.rows(index, index + 1)[0]
+
+    def rows(self, start, stop, now=None):
+        """Events at positions [start, stop) as of now."""
+        if now is None: now = datetime.now()
+        times = self.store._index_times; events = self.store._index_events
+        pivot = bisect_left(times, now) # times[:pivot] are past, times[pivot:] are future
+        stop = min(stop, len(times))
+        if start >= stop: return []
+        past_taken = self._split(start, now, pivot)
+        past = pivot - 1 - past_taken; future = pivot + start - past_taken # Next candidates of each run
+        merged = []
+        for _ in range(stop - start):
+            if past >= 0 and (future >= len(times) or now - times[past] <= times[future] - now):
+                merged.append(events[past]); past -= 1
+            else:
+                merged.append(events[future]); future += 1
+        return merged
+
+    def _split(self, position, now, pivot):
+        """How many past events come before the given position in the merged order."""
+        times = self.store._index_times
+        past_count = pivot; future_count = len(times) - pivot
+        low = max(0, position - future_count); high = min(position, past_count)
+        # Smallest past_taken where the next past event would not come before the last future one taken
+        while low < high:
+            past_taken = (low + high) // 2
+            future_taken = position - past_taken
+            next_past_distance = now - times[pivot - 1 - past_taken]
+            last_future_distance = times[pivot + future_taken - 1] - now
+            if next_past_distance <= last_future_distance: low = past_taken + 1
+            else: high = past_taken
+        return low
+
+    def index(self, event, now=None):
+        """Row of event in this view as of now (O(log n)), or None."""
+        if now is None: now = datetime.now()
+        times = self.store._index_times
+        time_position = self.store._time_position(event)
+        if time_position is None: return None
+        pivot = bisect_left(times, now); target_dt = times[time_position]
+        if time_position < pivot:
+            # Past: newer past events, plus future events strictly closer
+            closer_future = bisect_left(times, now + (now - target_dt), pivot) - pivot
+            return (pivot - 1 - time_position) + closer_future
+        # Future: sooner future events, plus past events at least as close
+        closer_past = pivot - bisect_left(times, now - (target_dt - now), 0, pivot)
+        return (time_position - pivot) + closer_past
+
+    def next_reorder_time(self, start, stop, now=None):
+        """When the rows around [start, stop) next change order, or None if they never will.
+
+        Two events of the same run never swap; a past event listed before a
+        future one is overtaken once now reaches the midpoint between them.
+        """
+        if now is None: now = datetime.now()
+        window = self.rows(max(0, start - 1), stop + 1, now)
+        reorder_times = [earlier.target_dt + (later.target_dt - earlier.target_dt) / 2
+                         for earlier, later in zip(window, window[1:])
+                         if earlier.target_dt < now <= later.target_dt]
+        return min(reorder_times) if reorder_times else None
+
+
+# --- Change Tracking ---
+
+class WeekVersions:
+    """Change counters per week (keyed by Monday), for caching what a week displays.
+
+    ``store.week_versions[week_start]`` changes whenever an event that shows
+    in that week is added, removed or moved. A one-off event only touches the
+    week of its target date; a series or a built-in holiday shows in many
+    weeks, so it bumps the counter shared by all of them.
+    """
+
+    def __init__(self):
+        self._weeks = {} # week start date -> counter
+        self.shared = 0
+
+    def __getitem__(self, week_start):
+        return (self._weeks.get(week_start, 0), self.shared)
+
+    def touch(self, event):
+        if event.recurrence is not None or not event.is_custom: self.shared += 1; return
+        week_start = get_week_start(event.target_dt.date())
+        self._weeks[week_start] = self._weeks.get(week_start, 0) + 1
+
+    def touch_many(self, events):
+        if len(events) > WEEK_TOUCH_LIMIT: self.touch_all()
+        else:
+            for event in events: self.touch(event)
+
+    def touch_all(self):
+        self.shared += 1
+
+
+# --- Event Store ---
+
+class EventStore:
+    """Tracked events plus user settings, with add/remove/query/view/persist APIs.
+
+    ``events`` is kept in label order (parallel to ``_label_keys``) and the
+    time index (``_index_times``/``_index_events``) in target_dt order; both
+    are updated by bisect on add/remove, so range and day queries are a binary
+    search plus a slice and view() never has to sort. Hash indexes map the
+    case-folded label and the front end's tree_id to each event, so duplicate
+    checks and lookups are O(1). ``version`` increases on every change;
+    ``week_versions`` tells which weeks a change affected. The
+    ``settings`` dict is only ever updated in place so callers may keep a
+    reference to it.
+    """
+    read_only = False
+
+    def __init__(self, filename=SAVE_FILENAME):
+        self.filename = filename
+        self.events = [] # Sorted by _label_sort_key
+        self._label_keys = [] # _label_sort_key of each entry in events
+        self.settings = dict(DEFAULT_SETTINGS)
+        self._index_times = [] # Sorted target_dt values
+        self._index_events = [] # Events in the same order as _index_times
+        self._by_label = {} # label_identity_key(label) -> event
+        self._by_tree_id = {} # tree_id -> event, for events currently displayed
+        self._series = {} # id(event) -> recurring event
+        self._series_due = None # When the earliest series next needs advancing; None = recompute
+        self.version = 0
+        self.week_versions = WeekVersions()
+        self.journal_seq = 0 # Last journal entry included in the loaded/saved snapshot
+
+    def __len__(self):
+        return len(self.events)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    # --- Add / Remove ---
+
+    def find_by_label(self, label):
+        """Returns the event whose label matches case-insensitively, or None."""
+        return self._by_label.get(label_identity_key(label))
+
+    def find_by_tree_id(self, tree_id):
+        return self._by_tree_id.get(tree_id)
+
+    def set_tree_id(self, event, tree_id):
+        """Records which front-end row (if any) shows event."""
+        old_tree_id = event.tree_id
+        if old_tree_id is not None and self._by_tree_id.get(old_tree_id) is event: del self._by_tree_id[old_tree_id]
+        event.tree_id = tree_id
+        if tree_id is not None: self._by_tree_id[tree_id] = event
+
+    def add(self, label, target_dt, location=None, is_custom=False, recurrence=None):
+        """Adds an event to the label and time indexes and returns it.
+
+        With a RecurrenceRule the event is a series listed at its series_target()
+        (target_dt is ignored). Returns None for a duplicate label or missing datetime.
+        """
+        if recurrence is not None: target_dt = recurrence.series_target()
+        if not target_dt or self.find_by_label(label) is not None: return None
+        new_event = make_event(label, target_dt, location=location, is_custom=is_custom, recurrence=recurrence)
+        if recurrence is not None: self._series[id(new_event)] = new_event; self._series_due = None
+        label_key = _label_sort_key(new_event)
+        position = bisect_right(self._label_keys, label_key)
+        self._label_keys.insert(position, label_key); self.events.insert(position, new_event)
+        self._by_label[label_identity_key(label)] = new_event
+        self._index_add(new_event)
+        self.version += 1; self.week_versions.touch(new_event)
+        return new_event
+
+    def add_many(self, new_events):
+        """Bulk add of make_event() records: skips duplicate labels, then sorts once.
+
+        Returns the number added. Cheaper than add() per event for imports and loading.
+        """
+        added_events = []
+        by_label = self._by_label
+        for event in new_events:
+            identity_key = event.label.casefold() # label_identity_key(), inlined for bulk loads
+            if identity_key in by_label: continue
+            by_label[identity_key] = event; added_events.append(event)
+        if not added_events: return 0
+        for event in added_events:
+            if event.recurrence is not None: self._series[id(event)] = event; self._series_due = None
+        # Sort on precomputed keys so each label is lowered once, not once for the sort and again for _label_keys
+        label_keys = self._label_keys + [_label_sort_key(ev) for ev in added_events]
+        all_events = self.events + added_events
+        order = sorted(range(len(all_events)), key=label_keys.__getitem__)
+        self.events[:] = [all_events[i] for i in order]
+        self._label_keys[:] = [label_keys[i] for i in order]
+        self._index_events.extend(added_events)
+        self._index_events.sort(key=attrgetter('target_dt')) # Two sorted runs: timsort merges them
+        self._index_times[:] = [ev.target_dt for ev in self._index_events]
+        self.version += 1; self.week_versions.touch_many(added_events)
+        return len(added_events)
+
+    def remove(self, events_to_remove):
+        """Removes the given event records (matched by identity) in place. Returns the number removed."""
+        events_to_remove = list(events_to_remove)
+        if not events_to_remove: return 0
+        self.week_versions.touch_many(events_to_remove)
+        if len(events_to_remove) * 32 < len(self.events):
+            # A few events: bisect to each one
+            removed_count = 0
+            for event in events_to_remove:
+                position = self._label_position(event)
+                if position is None: continue
+                del self.events[position]; del self._label_keys[position]
+                self._index_remove(event); self._unindex(event); removed_count += 1
+        else:
+            stored_events = {id(ev): ev for ev in events_to_remove if self.find_by_label(ev.label) is ev} # Once each, even if listed twice
+            if stored_events:
+                kept_events = [ev for ev in self.events if id(ev) not in stored_events]
+                for event in stored_events.values(): self._index_remove(event); self._unindex(event)
+                self.events[:] = kept_events # In place: views read these lists
+                self._label_keys[:] = [_label_sort_key(ev) for ev in kept_events]
+            removed_count = len(stored_events)
+        if removed_count: self.version += 1
+        return removed_count
+
+    def _unindex(self, event):
+        """Drops event from the hash indexes."""
+        del self._by_label[label_identity_key(event.label)]
+        if self._series.pop(id(event), None) is not None: self._series_due = None
+        if event.tree_id is not None and self._by_tree_id.get(event.tree_id) is event: del self._by_tree_id[event.tree_id]
+
+    def add_builtin_events(self):
+        """Adds the yearly INITIAL_EVENTS_DATA events that aren't shadowed by a custom event."""
+        built_in_events = []
+        for label, next_date in next_holiday_dates().items():
+            if self.find_by_label(label) is not None: continue
+            built_in_events.append(make_event(label, datetime.combine(next_date, datetime.min.time())))
+        return self.add_many(built_in_events)
+
+    def _label_position(self, event):
+        """Index of event in ``events``, or None if it isn't stored."""
+        if self.find_by_label(event.label) is not event: return None # O(1) membership check
+        position = bisect_left(self._label_keys, _label_sort_key(event))
+        if position < len(self.events) and self.events[position] is event: return position
+        return None
+
+    # --- Time Index ---
+
+    def _index_add(self, event):
+        position = bisect_right(self._index_times, event.target_dt) # After equal times: keeps insertion order
+        self._index_times.insert(position, event.target_dt)
+        self._index_events.insert(position, event)
+
+    def _time_position(self, event):
+        """Index of event in the time index, or None if it isn't stored."""
+        target_dt = event.target_dt
+        position = bisect_left(self._index_times, target_dt)
+        # Several events may share a datetime; match the dict itself
+        while position < len(self._index_times) and self._index_times[position] == target_dt:
+            if self._index_events[position] is event: return position
+            position += 1
+        return None
+
+    def _index_remove(self, event):
+        position = self._time_position(event)
+        if position is None: return False
+        del self._index_times[position]; del self._index_events[position]
+        return True
+
+    def move(self, event, target_dt):
+        """Moves a stored event to a new target_dt, repositioning it in the time index."""
+        if not self._index_remove(event): return False
+        if 'recurrence' not in event: self.week_versions.touch(event) # A series' occurrences don't move with it
+        event.target_dt = target_dt
+        self._index_add(event)
+        if 'recurrence' not in event: self.week_versions.touch(event)
+        if id(event) in self._series: self._series_due = None
+        self.version += 1
+        return True
+
+    def advance_series(self, now=None):
+        """Moves each series whose listed occurrence has passed (plus SERIES_GRACE) on to its next one.
+
+        Cheap to call every tick: only scans the series once the earliest of them is due.
+        Returns the events that moved.
+        """
+        if not self._series: return []
+        if now is None: now = datetime.now()
+        if self._series_due is None: self._series_due = self._next_series_due(now)
+        if now <= self._series_due: return []
+        moved_events = []
+        for event in list(self._series.values()):
+            if event.target_dt + SERIES_GRACE >= now: continue # series_target() still keeps it
+            next_target = event.recurrence.series_target(now)
+            if next_target != event.target_dt and self.move(event, next_target): moved_events.append(event)
+        self._series_due = self._next_series_due(now)
+        return moved_events
+
+    def _next_series_due(self, now):
+        # Series still listed at a passed occurrence have ended: they never move again
+        upcoming = [ev.target_dt for ev in self._series.values() if ev.target_dt + SERIES_GRACE > now]
+        return min(upcoming) + SERIES_GRACE if upcoming else datetime.max
+
+    # --- Queries ---
+
+    def events_between(self, start_dt, end_dt):
+        """Returns the events with start_dt <= target_dt < end_dt, in time order."""
+        start = bisect_left(self._index_times, start_dt)
+        end = bisect_left(self._index_times, end_dt, start)
+        return self._index_events[start:end]
+
+    def events_on(self, day):
+        """Returns the events on the given date, in time order."""
+        day_start = datetime.combine(day, datetime.min.time())
+        return self.events_between(day_start, day_start + timedelta(days=1))
+
+    def occurrences_between(self, start_dt, end_dt):
+        """Like events_between(), but with every occurrence of each series in the window (as copies)."""
+        return merge_occurrences(self.events_between(start_dt, end_dt), self._series.values(), start_dt, end_dt, builtin_occurrences(self, start_dt, end_dt))
+
+    def occurrences_on(self, day):
+        """Events and series occurrences on the given date, in time order."""
+        day_start = datetime.combine(day, datetime.min.time())
+        return self.occurrences_between(day_start, day_start + timedelta(days=1))
+
+    def event_dates(self):
+        """Returns the set of dates that have at least one event (series count at their listed occurrence)."""
+        return {ev.target_dt.date() for ev in self.events}
+
+    def view(self, sort_method=DEFAULT_SORT):
+        """Returns a live, read-only sequence of the events in one of the SORT_OPTIONS orders.
+
+        Views read the store's indexes directly: creating one is O(1) and they
+        reflect later adds and removes without re-sorting.
+        """
+        if sort_method == SORT_ALPHA: return LabelOrderView(self)
+        if sort_method == SORT_ALPHA_REV: return LabelOrderView(self, reverse=True)
+        return ClosestFirstView(self)
+
+    # --- Persistence ---
+
+    def reset_settings(self):
+        self.settings.clear(); self.settings.update(DEFAULT_SETTINGS)
+
+    def to_dict(self):
+        """Returns the JSON-ready save layout: settings plus the custom events."""
+        return snapshot_data(self.events, self.settings, self.journal_seq)
+
+    def save(self, filename=None):
+        """Atomically writes settings and custom events to disk. Returns the number of events saved."""
+        data_to_save = self.to_dict()
+        write_json_atomic(filename or self.filename, data_to_save)
+        return len(data_to_save["events"])
+
+    def load(self, filename=None):
+        """Loads settings and custom events from disk and adds the events.
+
+        Returns the number of events added. Raises OSError / json.JSONDecodeError
+        if the file can't be read; invalid event items are skipped. Events are
+        built LOAD_BATCH_SIZE at a time on the fast path; only a batch holding a
+        malformed item is redone item by item.
+        """
+        with open(filename or self.filename, 'rb') as f: raw_data = f.read()
+        try: from orjson import loads # Optional, much faster decoder; imported here so headless imports stay light
+        except ImportError: loads = json.loads
+        loaded_data = loads(raw_data) # orjson's error subclasses JSONDecodeError
+        loaded_settings = loaded_data.get("settings", {})
+        self.settings["dark_mode"] = loaded_settings.get("dark_mode", False)
+        self.journal_seq = loaded_data.get("journal_seq", 0)
+        items = loaded_data.get("events", [])
+        loaded_events = []
+        for batch_start in range(0, len(items), LOAD_BATCH_SIZE):
+            batch = items[batch_start:batch_start + LOAD_BATCH_SIZE]
+            try: loaded_events.extend(events_from_records(batch)); continue
+            except (KeyError, ValueError, TypeError, AttributeError): pass
+            for item in batch:
+                try:
+                    loaded_event = event_from_record(item)
+                    if loaded_event: loaded_events.append(loaded_event)
+                except (KeyError, ValueError, TypeError, AttributeError) as e: print(f"Skipping invalid event item during load: {item}. Error: {e}")
+        return self.add_many(loaded_events)
+
+    def exists(self, filename=None):
+        return os.path.exists(filename or self.filename)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Streaming export of events to iCalendar (.ics) and CSV.
+
+Events are turned into lines/rows by generators and written EXPORT_CHUNK_ROWS
+at a time to a temp file that replaces the target once complete, so neither
+document is ever held in memory. ExportJob runs the write on a background
+thread; the event list it gets is taken on the Tk thread first (use
+events_for_export()).
+
+A full export writes the stored events, with series as one VEVENT carrying
+their RRULE/EXDATE. A date-range export writes what the calendar shows in
+that range: one-off events found through the time index, plus every series
+and built-in holiday occurrence in the range, each as its own VEVENT.
+"""
+import csv
+from datetime import datetime, timezone
+import hashlib
+import os
+import threading
+
+from recurrence import RRULE_DATETIME_FORMAT
+
+
+EXPORT_CHUNK_ROWS = 2000 # Lines/rows joined per write
+ICS_LINE_OCTETS = 75 # RFC 5545 folding limit, excluding the CRLF
+EXPORT_FORMATS = ('ics', 'csv')
+CSV_HEADER = ('label', 'start', 'location', 'is_custom', 'rrule', 'exdates')
+PRODID = "-//Event Time Tracker//EN"
+
+
+def events_for_export(store, start_dt=None, end_dt=None):
+    """The events to export, as a list taken now (call on the thread that edits the store).
+
+    With a range (both ends), only the time index window [start_dt, end_dt) is read.
+    """
+    if start_dt is None and end_dt is None: return list(store)
+    if start_dt is None or end_dt is None: raise ValueError("An export range needs both a start and an end")
+    return store.occurrences_between(start_dt, end_dt)
+
+def export_format(path):
+    """'ics' or 'csv' from the file extension. Raises ValueError for anything else."""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension not in EXPORT_FORMATS: raise ValueError(f"Unsupported export format: {extension or path!r} (use .ics or .csv)")
+    return extension
+
+
+# --- iCalendar ---
+
+def escape_text(value):
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def fold_line(line):
+    """Content line with CRLF, folded into ICS_LINE_OCTETS-octet pieces (never inside a UTF-8 character)."""
+    if len(line) <= ICS_LINE_OCTETS and line.isascii(): return line + "\r\n"
+    pieces = []; piece_start = 0; octets = 0
+    for position, char in enumerate(line):
+        char_octets = len(char.encode('utf-8'))
+        limit = ICS_LINE_OCTETS if not pieces else ICS_LINE_OCTETS - 1 # Continuations start with a space
+        if octets + char_octets > limit: pieces.append(line[piece_start:position]); piece_start = position; octets = 0
+        octets += char_octets
+    pieces.append(line[piece_start:])
+    return "\r\n ".join(pieces) + "\r\n"
+
+def _uid(event, occurrence=False):
+    """Stable UID: labels are unique in a store; occurrences of one series/holiday also need their date."""
+    digest = hashlib.sha1(event['label'].casefold().encode('utf-8')).hexdigest()[:16]
+    if occurrence: digest += "-" + event['target_dt'].strftime(RRULE_DATETIME_FORMAT)
+    return f"{digest}@event-tracker"
+
+def vevent_lines(event, dtstamp, expanded):
+    """Folded lines of one VEVENT. expanded: the event is one occurrence, not the stored series."""
+    recurrence = None if expanded else event.get('recurrence')
+    start_dt = recurrence.dtstart if recurrence else event['target_dt']
+    lines = ["BEGIN:VEVENT", f"UID:{_uid(event, expanded and ('recurrence' in event or not event['is_custom']))}", f"DTSTAMP:{dtstamp}"]
+    if not event['is_custom'] and start_dt.time() == datetime.min.time(): lines.append(f"DTSTART;VALUE=DATE:{start_dt:%Y%m%d}") # Built-in holidays are all-day
+    else: lines.append(f"DTSTART:{start_dt.strftime(RRULE_DATETIME_FORMAT)}") # Floating (local) time, like the app
+    lines.append(f"SUMMARY:{escape_text(event['label'])}")
+    if event.get('location'): lines.append(f"LOCATION:{escape_text(event['location'])}")
+    if recurrence:
+        lines.append(f"RRULE:{recurrence.to_rrule()}")
+        if recurrence.exdates: lines.append("EXDATE:" + ",".join(exdate.strftime(RRULE_DATETIME_FORMAT) for exdate in sorted(recurrence.exdates)))
+    lines.append("END:VEVENT")
+    return "".join(map(fold_line, lines))
+
+def ics_lines(events, expanded=False):
+    """Yields the text of a VCALENDAR holding events, one VEVENT at a time."""
+    dtstamp = datetime.now(timezone.utc).strftime(RRULE_DATETIME_FORMAT) + "Z"
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + fold_line(f"PRODID:{PRODID}") + "CALSCALE:GREGORIAN\r\n"
+    for event in events: yield vevent_lines(event, dtstamp, expanded)
+    yield "END:VCALENDAR\r\n"
+
+
+# --- CSV ---
+
+def csv_rows(events, expanded=False):
+    """Yields the CSV header and one row per event."""
+    yield CSV_HEADER
+    for event in events:
+        recurrence = None if expanded else event.get('recurrence')
+        start_dt = recurrence.dtstart if recurrence else event['target_dt']
+        yield (event['label'], start_dt.isoformat(), event.get('location') or '', int(event['is_custom']),
+               recurrence.to_rrule() if recurrence else '',
+               " ".join(exdate.isoformat() for exdate in sorted(recurrence.exdates)) if recurrence else '')
+
+
+# --- Writing ---
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size: yield chunk; chunk = []
+    if chunk: yield chunk
+
+def write_export(path, events, expanded=False, fmt=None):
+    """Streams events to path (.ics or .csv) via a temp file and an atomic rename. Returns the number written."""
+    fmt = fmt or export_format(path)
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+            if fmt == 'ics':
+                for chunk in _chunks(ics_lines(events, expanded), EXPORT_CHUNK_ROWS): f.write("".join(chunk))
+            else:
+                writer = csv.writer(f)
+                for chunk in _chunks(csv_rows(events, expanded), EXPORT_CHUNK_ROWS): writer.writerows(chunk)
+            f.flush(); os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try: os.remove(temp_path)
+        except OSError: pass
+        raise
+    return len(events)
+
+
+class ExportJob:
+    """write_export() on a background thread. Poll done() from the Tk thread; then read count or error."""
+
+    def __init__(self, path, events, expanded=False):
+        self.path = path; self.events = events; self.expanded = expanded
+        self.fmt = export_format(path) # Fail now, on the caller's thread, for a bad extension
+        self.count = 0; self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def wait(self):
+        self._thread.join()
+
+    def _run(self):
+        try: self.count = write_export(self.path, self.events, self.expanded, self.fmt)
+        except Exception as e: self.error = e
+        finally: self.events = None # Drop the list as soon as it's written
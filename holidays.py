@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Exact dates of the built-in yearly events, precomputed per range of years.
+
+Each holiday is a rule: a fixed (month, day), or (month, weekday, ordinal)
+for floating holidays such as Thanksgiving (4th Thursday of November) or
+Memorial Day (last Monday of May). holiday_table() computes every rule for
+a whole block of years in one pass (under a millisecond for 32 years) and
+keeps the result in memory, so paging the calendar across years is a
+lookup. Nothing is written to disk.
+
+The floating holidays keep their historical "(Approx)" labels: saved data
+and custom events that shadow a built-in one refer to them by label.
+"""
+from datetime import date
+import threading
+
+from recurrence import nth_weekday
+
+
+MONDAY = 0; THURSDAY = 3 # date.weekday() numbering
+HOLIDAY_RULES = {
+    "New Year's Day": (1, 1), "Martin Luther King, Jr. Day (Approx)": (1, MONDAY, 3),
+    "Groundhog Day": (2, 2), "My Birthday": (2, 5), "Valentine's Day": (2, 14),
+    "Presidents' Day (Approx)": (2, MONDAY, 3), "St. Patrick's Day": (3, 17),
+    "April Fools' Day": (4, 1), "Memorial Day (Approx)": (5, MONDAY, -1),
+    "Juneteenth": (6, 19), "Independence Day": (7, 4),
+    "Labor Day (Approx)": (9, MONDAY, 1), "Columbus Day (Approx)": (10, MONDAY, 2),
+    "Halloween": (10, 31), "Veterans Day": (11, 11),
+    "Thanksgiving Day (Approx)": (11, THURSDAY, 4), "Christmas Day": (12, 25),
+    "New Year's Eve": (12, 31),
+}
+HOLIDAY_BATCH_YEARS = 32 # Years computed per batch when a lookup misses the table
+LEAP_DAY_SEARCH_YEARS = 8 # Longest gap between two Feb 29ths (e.g. 2096 -> 2104)
+
+_table = {} # year -> {label: date}, for HOLIDAY_RULES
+_lock = threading.Lock() # The Tk thread and the prefetch worker may both fill the table
+
+
+def rule_date(rule, year):
+    """Date of one rule in a year, or None if it has none that year (Feb 29)."""
+    if len(rule) == 3: return nth_weekday(year, rule[0], rule[1], rule[2])
+    month, day = rule
+    try: return date(year, month, day)
+    except ValueError: return None
+
+def compute_years(first_year, last_year, rules=HOLIDAY_RULES):
+    """{year: {label: date}} for every year in [first_year, last_year], computed in one batch."""
+    return {year: {label: day for label, day in ((label, rule_date(rule, year)) for label, rule in rules.items()) if day}
+            for year in range(first_year, last_year + 1)}
+
+def holiday_table(first_year, last_year):
+    """{year: {label: date}} for [first_year, last_year]; missing years are computed in one batch and kept."""
+    with _lock:
+        missing = [year for year in range(first_year, last_year + 1) if year not in _table]
+        if missing: _table.update(compute_years(missing[0], max(missing[-1], missing[0] + HOLIDAY_BATCH_YEARS - 1)))
+        return {year: _table[year] for year in range(first_year, last_year + 1)}
+
+def next_holiday_dates(today=None):
+    """{label: date} of each holiday's next occurrence on or after today."""
+    if today is None: today = date.today()
+    next_dates = {}
+    for days in holiday_table(today.year, today.year + LEAP_DAY_SEARCH_YEARS).values():
+        for label, day in days.items():
+            if label not in next_dates and day >= today: next_dates[label] = day
+    return next_dates
+
+def holidays_between(start_date, end_date):
+    """(date, label) pairs with start_date <= date < end_date, in date order."""
+    if end_date <= start_date: return []
+    pairs = [(day, label) for days in holiday_table(start_date.year, end_date.year).values()
+             for label, day in days.items() if start_date <= day < end_date]
+    pairs.sort(key=lambda pair: pair[0])
+    return pairs
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""Streaming iCalendar (.ics) import.
+
+The file is read as a chain of generators: raw lines -> unfolded content
+lines -> VEVENT property maps -> event records -> batches. Only the current
+line, the current VEVENT and one batch are in memory at any time, so a file
+with hundreds of thousands of VEVENTs imports in flat memory and the caller
+can commit and redisplay once per batch.
+
+Supported per VEVENT: SUMMARY (the label), DTSTART (date, local, TZID or
+UTC), LOCATION, RRULE and EXDATE. A TZID time is taken as wall-clock time;
+UTC times are converted to local time, like the rest of the app's naive
+datetimes. VEVENTs without SUMMARY or DTSTART are skipped.
+"""
+from datetime import datetime, timezone
+import os
+
+from event_store import make_event
+from recurrence import RecurrenceRule
+
+
+ICS_IMPORT_BATCH_SIZE = 5000 # Events per batch: one store commit and one redisplay each
+_TEXT_ESCAPES = {'n': "\n", 'N': "\n", '\\': "\\", ';': ";", ',': ","}
+
+
+class ImportProgress:
+    """Counts shared by the stages of one import; read between batches for the status bar."""
+
+    def __init__(self, total_bytes=0):
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        self.vevents = 0 # VEVENT blocks seen
+        self.skipped = 0 # VEVENTs that couldn't be turned into an event
+
+    def fraction(self):
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+
+# --- Pipeline Stages ---
+
+def unfold_lines(raw_lines, progress=None):
+    """Joins folded content lines (continuations start with a space or tab); yields each logical line.
+
+    raw_lines are bytes, as read from a file opened in binary mode, so progress can count bytes.
+    """
+    pending = None
+    for raw_line in raw_lines:
+        if progress is not None: progress.bytes_read += len(raw_line)
+        line = raw_line.decode('utf-8', 'replace').rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None: pending += line[1:]; continue
+        if pending: yield pending
+        pending = line
+    if pending: yield pending
+
+def parse_property(line):
+    """Splits 'NAME;PARAM=value:VALUE' into (NAME, {PARAM: value}, VALUE). Quoted parameter values may contain ':' and ';'."""
+    colon = line.find(':')
+    if colon < 0: raise ValueError(f"Content line without ':': {line[:60]!r}")
+    head = line[:colon]
+    if '"' in head: # Rare: a quoted parameter value may hide the real ':'
+        head_parts = _split_unquoted(line, ':')
+        head = head_parts[0]; colon = len(head)
+    name, _, params_text = head.partition(';')
+    params = {}
+    if params_text:
+        for param in _split_unquoted(params_text, ';'):
+            key, _, param_value = param.partition('=')
+            params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, line[colon + 1:]
+
+def _split_unquoted(text, separator):
+    parts = []; start = 0; in_quotes = False
+    for position, char in enumerate(text):
+        if char == '"': in_quotes = not in_quotes
+        elif char == separator and not in_quotes: parts.append(text[start:position]); start = position + 1
+    parts.append(text[start:])
+    return parts
+
+def iter_vevents(lines, progress=None):
+    """Yields one {NAME: (params, value)} dict per VEVENT (EXDATE: a list of them). Nested components are skipped."""
+    properties = None; depth = 0 # depth > 0 while inside a component nested in the VEVENT (e.g. VALARM)
+    for line in lines:
+        head = line[:6].upper() # Only component delimiters need a case-insensitive look
+        if head == "BEGIN:":
+            if properties is not None: depth += 1
+            elif line[6:].upper() == "VEVENT": properties = {}
+            continue
+        if head[:4] == "END:":
+            if properties is None: continue
+            if depth: depth -= 1; continue
+            if progress is not None: progress.vevents += 1
+            yield properties; properties = None
+            continue
+        if properties is None or depth: continue
+        try: name, params, value = parse_property(line)
+        except ValueError: continue
+        if name == 'EXDATE': properties.setdefault(name, []).append((params, value))
+        else: properties.setdefault(name, (params, value)) # First occurrence wins
+
+def unescape_text(value):
+    """Undoes iCalendar TEXT escaping (\\n, \\\\, \\;, \\,)."""
+    if "\\" not in value: return value
+    chars = []; escaped = False
+    for char in value:
+        if escaped: chars.append(_TEXT_ESCAPES.get(char, char)); escaped = False
+        elif char == "\\": escaped = True
+        else: chars.append(char)
+    return "".join(chars)
+
+def parse_ics_datetime(value, params=None):
+    """DATE or DATE-TIME value -> naive local datetime (a DATE is midnight). Raises ValueError."""
+    value = value.strip()
+    if len(value) == 8 or (params and params.get('VALUE', '').upper() == 'DATE'):
+        if len(value) < 8 or not value[:8].isdigit(): raise ValueError(f"Invalid DATE: {value!r}")
+        return datetime(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    # Sliced by hand: strptime costs more than the rest of the VEVENT put together
+    if len(value) not in (15, 16) or value[8] != 'T' or not (value[:8] + value[9:15]).isdigit(): raise ValueError(f"Invalid DATE-TIME: {value!r}")
+    parsed = datetime(int(value[:4]), int(value[4:6]), int(value[6:8]), int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    if value[15:] == 'Z': return parsed.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    if value[15:]: raise ValueError(f"Invalid DATE-TIME: {value!r}")
+    return parsed
+
+def vevent_to_event(properties):
+    """make_event() record for a VEVENT property map (a custom event, a series if it has an RRULE). Raises ValueError/KeyError."""
+    label = unescape_text(properties['SUMMARY'][1]).strip()
+    if not label: raise ValueError("Empty SUMMARY")
+    start_params, start_value = properties['DTSTART']
+    target_dt = parse_ics_datetime(start_value, start_params)
+    location = unescape_text(properties['LOCATION'][1]).strip() if 'LOCATION' in properties else None
+    recurrence = None
+    if 'RRULE' in properties:
+        exdates = [parse_ics_datetime(exdate, params) for params, value in properties.get('EXDATE', ()) for exdate in value.split(',') if exdate]
+        recurrence = RecurrenceRule.parse(properties['RRULE'][1], target_dt, exdates=exdates)
+        target_dt = recurrence.series_target()
+    return make_event(label, target_dt, location=location, is_custom=True, recurrence=recurrence)
+
+def iter_events(vevents, progress=None):
+    """Converts VEVENT maps to event records, skipping (and counting) the ones that can't be converted."""
+    for properties in vevents:
+        try: yield vevent_to_event(properties)
+        except (KeyError, ValueError, OverflowError) as e: # OverflowError: dates or a repeat INTERVAL out of range
+            if progress is not None: progress.skipped += 1
+            summary = properties.get('SUMMARY', (None, '?'))[1]
+            print(f"Skipping VEVENT {summary[:40]!r}: {e}")
+
+def batched(items, batch_size):
+    """Yields lists of up to batch_size items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size: yield batch; batch = []
+    if batch: yield batch
+
+
+# --- Entry Point ---
+
+def import_batches(path, progress=None, batch_size=ICS_IMPORT_BATCH_SIZE):
+    """Yields lists of event records parsed from an .ics file, batch_size at a time.
+
+    Pass an ImportProgress to follow bytes read and VEVENTs skipped. The file
+    stays open until the generator is exhausted or closed.
+    """
+    if progress is not None: progress.total_bytes = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        yield from batched(iter_events(iter_vevents(unfold_lines(f, progress), progress), progress), batch_size)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""Append-only operation log next to the JSON save file.
+
+Every edit (add, remove, settings change) is appended as one JSON line the
+moment it happens and fsynced, so a crash or power loss loses nothing and an
+edit costs one small write instead of rewriting the whole save file. The save
+file becomes a snapshot: it records the seq of the last journal entry it
+includes, and startup loads it and then replays only the entries after that. Once the journal passes
+compact_bytes it is folded into a fresh snapshot on a background thread.
+"""
+import json
+import os
+import threading
+
+from event_store import event_to_record, event_from_record, snapshot_data, write_json_atomic
+
+
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_COMPACT_BYTES = 256 * 1024 # Fold the journal into the snapshot once it grows past this
+
+
+class EventJournal:
+    """Append-only log of the edits made to an EventStore since its last snapshot.
+
+    Only custom events are journaled; built-in events are re-added at startup.
+    """
+
+    def __init__(self, store, path=None, compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.store = store
+        self.path = path or store.filename + JOURNAL_SUFFIX
+        self.compact_bytes = compact_bytes
+        self.seq = store.journal_seq # seq of the last entry written or replayed
+        self._file = None
+        self._size = 0
+        self._lock = threading.Lock() # Appends vs. the journal rewrite at the end of a compaction
+        self._compaction = None # Background compaction thread while one is running
+
+    # --- Startup ---
+
+    def replay(self):
+        """Applies the entries newer than the loaded snapshot to the store. Returns the number applied.
+
+        A torn last line (crash mid-append) ends the replay; everything before it is kept.
+        """
+        self.seq = max(self.seq, self.store.journal_seq)
+        if not os.path.exists(self.path): return 0
+        applied = 0
+        pending_adds = [] # Consecutive adds go to the store in one batch
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try: entry = json.loads(line)
+                except ValueError: print(f"Journal {self.path}: stopping at torn entry."); break
+                seq = entry.get('seq', 0)
+                if seq <= self.store.journal_seq: continue # Already in the snapshot
+                self.seq = max(self.seq, seq)
+                op = entry.get('op')
+                try:
+                    if op == 'add':
+                        event = event_from_record(entry['event'])
+                        if event: pending_adds.append(event)
+                        applied += 1
+                        continue
+                    if pending_adds: self.store.add_many(pending_adds); pending_adds = []
+                    if op == 'remove':
+                        events = [self.store.find_by_label(label) for label in entry['labels']]
+                        self.store.remove([ev for ev in events if ev is not None])
+                    elif op == 'settings': self.store.settings.update(entry['settings'])
+                    else: print(f"Journal {self.path}: skipping unknown op {op!r}."); continue
+                    applied += 1
+                except (KeyError, ValueError, TypeError) as e: print(f"Skipping invalid journal entry {seq}: {e}")
+        if pending_adds: self.store.add_many(pending_adds)
+        return applied
+
+    def open(self):
+        """Opens the journal for appending, first cutting off a torn last line."""
+        if self._file is None:
+            if os.path.exists(self.path):
+                with open(self.path, 'rb+') as f:
+                    data = f.read()
+                    if data and not data.endswith(b"\n"): f.truncate(data.rfind(b"\n") + 1)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._size = self._file.tell()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None: self._file.close(); self._file = None
+
+    # --- Recording Edits ---
+
+    def record_add(self, event):
+        if event['is_custom']: self._append({'op': 'add', 'event': event_to_record(event)})
+
+    def record_add_many(self, events):
+        """One journal write for a batch of adds (imports)."""
+        self._append_many([{'op': 'add', 'event': event_to_record(ev)} for ev in events if ev['is_custom']])
+
+    def record_remove(self, events):
+        labels = [ev['label'] for ev in events if ev['is_custom']]
+        if labels: self._append({'op': 'remove', 'labels': labels})
+
+    def record_settings(self):
+        self._append({'op': 'settings', 'settings': dict(self.store.settings)})
+
+    def _append(self, entry):
+        """Writes one entry and fsyncs it (neither a crash nor a power loss drops it)."""
+        self._append_many([entry])
+
+    def _append_many(self, entries):
+        """Writes the entries with one write and one fsync."""
+        if not entries: return
+        with self._lock:
+            if self._file is None: return
+            lines = []
+            for entry in entries:
+                self.seq += 1; entry['seq'] = self.seq
+                lines.append(json.dumps(entry, separators=(',', ':')) + "\n")
+            data = "".join(lines)
+            self._file.write(data); self._file.flush(); os.fsync(self._file.fileno())
+            self._size += len(data.encode('utf-8')) # Bytes, like compact_bytes and tell()
+        if self._size > self.compact_bytes: self.compact_async()
+
+    # --- Compaction ---
+
+    def _take_snapshot(self):
+        """Copies what the snapshot needs; call on the thread that edits the store."""
+        with self._lock: seq = self.seq
+        return list(self.store.events), dict(self.store.settings), seq
+
+    def wait(self):
+        """Blocks until a running background compaction has finished."""
+        if self._compaction is not None: self._compaction.join(); self._compaction = None
+
+    def compact(self):
+        """Writes a snapshot and drops the journal entries it covers. Returns the number of events saved."""
+        self.wait()
+        return self._write_snapshot(*self._take_snapshot())
+
+    def compact_async(self):
+        """Like compact(), but serializes and writes on a background thread."""
+        if self._compaction is not None and self._compaction.is_alive(): return
+        self._compaction = threading.Thread(target=self._compact_worker, args=self._take_snapshot(), daemon=True)
+        self._compaction.start()
+
+    def _compact_worker(self, events, settings, seq):
+        try: self._write_snapshot(events, settings, seq)
+        except Exception as e: print(f"Error compacting journal {self.path}: {e}")
+
+    def _write_snapshot(self, events, settings, seq):
+        data = snapshot_data(events, settings, seq)
+        write_json_atomic(self.store.filename, data)
+        self.store.journal_seq = seq
+        self._truncate(seq)
+        return len(data["events"])
+
+    def _truncate(self, snapshot_seq):
+        """Rewrites the journal keeping only the entries appended after the snapshot was taken."""
+        with self._lock:
+            reopen = self._file is not None
+            if reopen: self._file.close(); self._file = None
+            kept = []
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try: entry = json.loads(line)
+                        except ValueError: break
+                        if entry.get('seq', 0) > snapshot_seq: kept.append(line)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.writelines(kept); f.flush(); os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            if reopen:
+                self._file = open(self.path, 'a', encoding='utf-8')
+                self._size = self._file.tell()
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Always-on timing of the GUI's hot paths, for diagnosing stutter.
+
+A PerfRecorder keeps, per named section, the all-time call count, total and
+maximum, plus the last PERF_RING_SIZE durations and Tcl call counts in a
+fixed-size ring buffer that p50/p95 are computed from on demand. Recording
+a call costs two perf_counter() reads and a few array stores.
+
+Tcl calls are counted by TclCallCounter, a thin stand-in for the root's
+Tcl interpreter object: every widget created after count_tcl_calls(root)
+inherits it from the root, so each widget operation passes through its
+call() on the way to Tcl.
+"""
+from array import array
+import functools
+import threading
+from time import perf_counter
+
+from event_store import write_json_atomic
+
+
+PERF_RING_SIZE = 512 # Recent calls per section that percentiles are computed from
+
+
+class TclCallCounter:
+    """Wraps a tkapp (root.tk), counting call() invocations and passing everything else through."""
+
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tkapp.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._tkapp, name)
+
+
+class TimingRing:
+    """Call statistics for one section: all-time totals plus the last size calls."""
+    __slots__ = ('durations', 'tcl_calls', 'count', 'total', 'max')
+
+    def __init__(self, size=PERF_RING_SIZE):
+        self.durations = array('d', [0.0]) * size
+        self.tcl_calls = array('l', [0]) * size
+        self.count = 0; self.total = 0.0; self.max = 0.0
+
+    def record(self, seconds, tcl_calls=0):
+        slot = self.count % len(self.durations)
+        self.durations[slot] = seconds; self.tcl_calls[slot] = tcl_calls
+        self.count += 1; self.total += seconds
+        if seconds > self.max: self.max = seconds
+
+    def stats(self):
+        """{count, total_ms, max_ms, p50_ms, p95_ms, tcl_mean, tcl_max}; percentiles and Tcl figures cover the recent calls."""
+        recent_count = min(self.count, len(self.durations))
+        recent = sorted(self.durations[:recent_count])
+        recent_tcl = self.tcl_calls[:recent_count]
+        def percentile(fraction): return recent[min(recent_count - 1, int(fraction * recent_count))] * 1000 if recent else 0.0
+        return {"count": self.count, "total_ms": self.total * 1000, "max_ms": self.max * 1000,
+                "p50_ms": percentile(0.5), "p95_ms": percentile(0.95),
+                "tcl_mean": sum(recent_tcl) / recent_count if recent_count else 0.0, "tcl_max": max(recent_tcl, default=0)}
+
+
+class PerfRecorder:
+    """Named TimingRings, filled by timed() functions and instrument()ed methods."""
+
+    def __init__(self, ring_size=PERF_RING_SIZE):
+        self.ring_size = ring_size
+        self.sections = {} # name -> TimingRing, in first-recorded order
+        self.tcl_counter = None
+        self._tk_thread = threading.get_ident() # Tcl counts only mean something on the Tk thread
+        self._lock = threading.Lock() # Sections are also recorded from background threads (the autosave)
+
+    def count_tcl_calls(self, root):
+        """Routes root's Tcl calls through a TclCallCounter; call before creating any other widget."""
+        self.tcl_counter = root.tk = TclCallCounter(root.tk)
+
+    def record(self, name, seconds, tcl_calls=0):
+        with self._lock:
+            ring = self.sections.get(name)
+            if ring is None: ring = self.sections[name] = TimingRing(self.ring_size)
+            ring.record(seconds, tcl_calls)
+
+    def timed(self, name):
+        """Decorator recording each call of a function under name."""
+        def decorate(func):
+            @functools.wraps(func)
+            def timed_func(*args, **kwargs):
+                counter = self.tcl_counter if threading.get_ident() == self._tk_thread else None
+                calls_before = counter.calls if counter else 0
+                started = perf_counter()
+                try: return func(*args, **kwargs)
+                finally: self.record(name, perf_counter() - started, counter.calls - calls_before if counter else 0)
+            return timed_func
+        return decorate
+
+    def instrument(self, obj, method_name, name):
+        """Times obj.method_name (e.g. a store's save) under name, by wrapping it on that instance."""
+        setattr(obj, method_name, self.timed(name)(getattr(obj, method_name)))
+
+    def reset(self):
+        with self._lock: self.sections.clear()
+
+    # --- Reporting ---
+
+    def snapshot(self):
+        with self._lock: sections = {name: ring.stats() for name, ring in self.sections.items()}
+        return {"sections": sections,
+                "tcl_calls_total": self.tcl_counter.calls if self.tcl_counter else None}
+
+    def report(self):
+        """The snapshot as a text table."""
+        snapshot = self.snapshot()
+        width = max((len(name) for name in snapshot["sections"]), default=7)
+        lines = [f"{'section':<{width}}  {'count':>7}  {'p50 ms':>8}  {'p95 ms':>8}  {'max ms':>8}  {'total ms':>10}  {'tcl/call':>8}  {'tcl max':>7}"]
+        for name, stats in snapshot["sections"].items():
+            lines.append(f"{name:<{width}}  {stats['count']:7d}  {stats['p50_ms']:8.2f}  {stats['p95_ms']:8.2f}  {stats['max_ms']:8.2f}"
+                         f"  {stats['total_ms']:10.1f}  {stats['tcl_mean']:8.1f}  {stats['tcl_max']:7d}")
+        if snapshot["tcl_calls_total"] is not None: lines.append(f"\nTcl calls since start: {snapshot['tcl_calls_total']}")
+        lines.append(f"Percentiles and Tcl figures cover each section's last {self.ring_size} calls.")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        write_json_atomic(path, self.snapshot())
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Background prefetch of view content the user is likely to page to next.
+
+The Tk thread asks for a batch of keys (e.g. the weeks either side of the
+one on screen); a worker thread computes them and puts the results on a
+queue that the Tk thread drains with root.after, so widgets and caches are
+only ever touched on the Tk thread. Every batch remembers the store's
+version: if the store changes while a batch is being computed, its results
+are dropped rather than cached, since the worker may have read the store
+mid-edit.
+"""
+import queue
+import threading
+import tkinter as tk
+
+
+PREFETCH_POLL_MS = 25 # How often the Tk thread collects results while a batch is running
+
+
+class Prefetcher:
+    """Runs compute(key) on a worker thread and hands each result to deliver(key, result) on the Tk thread.
+
+    Only the latest request matters: asking again drops the keys not started yet.
+    """
+
+    def __init__(self, root, store, compute, deliver, poll_ms=PREFETCH_POLL_MS):
+        self.root = root; self.store = store
+        self.compute = compute; self.deliver = deliver
+        self.poll_ms = poll_ms
+        self._requests = queue.Queue() # (keys, store version) batches, or None to stop
+        self._results = queue.Queue() # (key, store version, result); key None ends a batch
+        self._worker = None
+        self._batches = 0 # Batches handed to the worker and not finished yet
+        self._poll_job = None
+
+    def request(self, keys):
+        """Queues keys for computing in the background; call on the Tk thread."""
+        keys = list(keys)
+        if not keys: return
+        while True: # Drop the batches the worker hasn't started; they're for a view the user has left
+            try: self._requests.get_nowait()
+            except queue.Empty: break
+            self._batches -= 1
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._work, daemon=True)
+            self._worker.start()
+        self._requests.put((keys, self.store.version)); self._batches += 1
+        if self._poll_job is None: self._schedule_poll()
+
+    def close(self):
+        if self._poll_job is not None:
+            try: self.root.after_cancel(self._poll_job)
+            except tk.TclError: pass
+            self._poll_job = None
+        if self._worker is not None: self._requests.put(None)
+
+    # --- Worker Thread ---
+
+    def _work(self):
+        while True:
+            batch = self._requests.get()
+            if batch is None: return
+            keys, version = batch
+            for key in keys:
+                if self.store.version != version: break # Stale: the results would be dropped anyway
+                try: self._results.put((key, version, self.compute(key)))
+                except Exception as e: print(f"Prefetch of {key!r} failed (store likely changed mid-read): {e}")
+            self._results.put((None, version, None))
+
+    # --- Tk Thread ---
+
+    def _schedule_poll(self):
+        try: self._poll_job = self.root.after(self.poll_ms, self._poll)
+        except tk.TclError: self._poll_job = None # Root destroyed
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try: key, version, result = self._results.get_nowait()
+            except queue.Empty: break
+            if key is None: self._batches -= 1; continue
+            if version != self.store.version: continue # Computed from data that has since changed
+            try: self.deliver(key, result)
+            except tk.TclError: pass
+        if self._batches > 0: self._schedule_poll()
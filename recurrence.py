@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Recurrence rules (a subset of iCalendar RRULE) expanded lazily per window.
+
+Supported: FREQ=DAILY/WEEKLY/MONTHLY/YEARLY, INTERVAL, BYDAY (weekly days, or
+nth/last weekday such as 2MO or -1FR for monthly/yearly), BYMONTH (yearly),
+COUNT, UNTIL, and exception dates. Weeks start on Monday.
+
+Nothing is expanded up front. A rule without COUNT jumps straight to the
+period containing the requested start, so a rule that repeats forever costs
+nothing until a view asks for a window, and then only that window. (COUNT
+is defined from the first occurrence, so those rules walk from the start;
+they are finite anyway.) expand() memoizes windows with LRU eviction, so
+paging back and forth through weeks or months doesn't expand them again.
+Only the standard library is used, like event_store.
+"""
+from datetime import datetime, date, time, timedelta
+from functools import lru_cache
+
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+WEEKDAY_CODES = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU') # Index = date.weekday()
+EXPANSION_CACHE_WINDOWS = 512 # Expanded (rule, window) results kept by expand()
+MAX_EMPTY_PERIODS = 1000 # Give up on rules that can never match (e.g. BYMONTH=2 on the 30th)
+SERIES_GRACE = timedelta(minutes=1) # A passed occurrence stays listed while it shows "Just now or Past"
+RRULE_DATETIME_FORMAT = "%Y%m%dT%H%M%S"
+
+
+def _days_in_month(year, month):
+    if month == 12: return 31
+    return (date(year, month + 1, 1) - date(year, month, 1)).days
+
+def _month_days(year, month, byday):
+    """Days of the month matching BYDAY entries: (0, weekday) for every such weekday, (n, weekday) for the nth (-1 = last)."""
+    first_weekday = date(year, month, 1).weekday(); last_day = _days_in_month(year, month)
+    days = set()
+    for ordinal, weekday in byday:
+        matching = range(1 + (weekday - first_weekday) % 7, last_day + 1, 7)
+        if not ordinal: days.update(matching)
+        elif -len(matching) <= ordinal <= len(matching): days.add(matching[ordinal - 1 if ordinal > 0 else ordinal])
+    return sorted(days)
+
+def nth_weekday(year, month, weekday, ordinal):
+    """Date of the ordinal-th weekday (0 = Monday) of a month; ordinal -1 is the last one. None if there is none."""
+    days = _month_days(year, month, ((ordinal, weekday),))
+    return date(year, month, days[0]) if days else None
+
+def _parse_rrule_datetime(text):
+    text = text.rstrip('Z')
+    if 'T' in text: return datetime.strptime(text, RRULE_DATETIME_FORMAT)
+    return datetime.combine(datetime.strptime(text, "%Y%m%d").date(), time(23, 59, 59)) # Date-only UNTIL includes the whole day
+
+
+class RecurrenceRule:
+    """An immutable recurrence rule anchored at dtstart (its first candidate occurrence).
+
+    Rules compare and hash by value, so they can key caches.
+    """
+
+    def __init__(self, freq, dtstart, interval=1, byday=(), bymonth=(), count=None, until=None, exdates=()):
+        if freq not in FREQUENCIES: raise ValueError(f"Unsupported FREQ: {freq}")
+        if interval < 1: raise ValueError("INTERVAL must be at least 1")
+        if count is not None and count < 1: raise ValueError("COUNT must be at least 1")
+        self.freq = freq; self.dtstart = dtstart; self.interval = interval
+        self.byday = tuple(sorted(set(byday), key=lambda entry: (entry[1], entry[0]))) # (ordinal, weekday) pairs
+        self.bymonth = tuple(sorted(set(bymonth)))
+        self.count = count; self.until = until
+        self.exdates = frozenset(exdates)
+        self._key = (freq, dtstart, interval, self.byday, self.bymonth, count, until, self.exdates)
+
+    def __eq__(self, other):
+        return isinstance(other, RecurrenceRule) and self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return f"RecurrenceRule({self.to_rrule()!r}, dtstart={self.dtstart!r})"
+
+    # --- Text Form ---
+
+    @classmethod
+    def parse(cls, text, dtstart, exdates=()):
+        """Parses an RRULE value such as 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;COUNT=10'. Raises ValueError."""
+        if text.upper().startswith('RRULE:'): text = text[6:]
+        parts = {}
+        for part in text.strip().split(';'):
+            if not part: continue
+            name, separator, value = part.partition('=')
+            if not separator: raise ValueError(f"Malformed RRULE part: {part!r}")
+            parts[name.strip().upper()] = value.strip().upper()
+        if 'FREQ' not in parts: raise ValueError("RRULE needs a FREQ")
+        byday = []
+        for entry in filter(None, parts.get('BYDAY', '').split(',')):
+            code = entry[-2:]
+            if code not in WEEKDAY_CODES: raise ValueError(f"Unknown BYDAY weekday: {entry!r}")
+            ordinal = int(entry[:-2]) if entry[:-2] else 0 # No prefix: every such weekday
+            if entry[:-2] and not (1 <= abs(ordinal) <= 5): raise ValueError(f"BYDAY ordinal must be 1 to 5 or -1 to -5: {entry!r}")
+            byday.append((ordinal, WEEKDAY_CODES.index(code)))
+        bymonth = [int(month) for month in filter(None, parts.get('BYMONTH', '').split(','))]
+        if any(not 1 <= month <= 12 for month in bymonth): raise ValueError("BYMONTH must be 1-12")
+        return cls(parts['FREQ'], dtstart, interval=int(parts.get('INTERVAL', 1)), byday=byday, bymonth=bymonth,
+                   count=int(parts['COUNT']) if 'COUNT' in parts else None,
+                   until=_parse_rrule_datetime(parts['UNTIL']) if 'UNTIL' in parts else None, exdates=exdates)
+
+    def to_rrule(self):
+        """The RRULE value for this rule (DTSTART and exception dates are kept separately)."""
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1: parts.append(f"INTERVAL={self.interval}")
+        if self.byday: parts.append("BYDAY=" + ",".join(f"{ordinal or ''}{WEEKDAY_CODES[weekday]}" for ordinal, weekday in self.byday))
+        if self.bymonth: parts.append("BYMONTH=" + ",".join(str(month) for month in self.bymonth))
+        if self.count is not None: parts.append(f"COUNT={self.count}")
+        if self.until is not None: parts.append(f"UNTIL={self.until.strftime(RRULE_DATETIME_FORMAT)}")
+        return ";".join(parts)
+
+    def to_text(self):
+        """DTSTART/RRULE/EXDATE lines (iCalendar style): the whole rule as one string, for storage."""
+        lines = [f"DTSTART:{self.dtstart.strftime(RRULE_DATETIME_FORMAT)}", f"RRULE:{self.to_rrule()}"]
+        if self.exdates: lines.append("EXDATE:" + ",".join(exdate.strftime(RRULE_DATETIME_FORMAT) for exdate in sorted(self.exdates)))
+        return "\n".join(lines)
+
+    @classmethod
+    def from_text(cls, text):
+        """Inverse of to_text(). Raises ValueError."""
+        fields = dict(line.partition(':')[::2] for line in text.splitlines() if line)
+        if 'DTSTART' not in fields or 'RRULE' not in fields: raise ValueError("Recurrence text needs DTSTART and RRULE")
+        exdates = [datetime.strptime(exdate, RRULE_DATETIME_FORMAT) for exdate in filter(None, fields.get('EXDATE', '').split(','))]
+        return cls.parse(fields['RRULE'], datetime.strptime(fields['DTSTART'], RRULE_DATETIME_FORMAT), exdates=exdates)
+
+    # --- Expansion ---
+
+    def _first_period(self, start):
+        """Index of a period no later than the one containing start (0 when COUNT needs every occurrence)."""
+        if self.count is not None or start <= self.dtstart: return 0
+        if self.freq == 'DAILY': periods = (start - self.dtstart).days
+        elif self.freq == 'WEEKLY': periods = (start.date() - self.dtstart.date()).days // 7
+        elif self.freq == 'MONTHLY': periods = (start.year - self.dtstart.year) * 12 + start.month - self.dtstart.month
+        else: periods = start.year - self.dtstart.year
+        return max(0, periods // self.interval - 1)
+
+    def _period(self, index):
+        """Candidate occurrences of one period, in order (may include times before dtstart)."""
+        dtstart = self.dtstart; step = index * self.interval
+        weekdays = {weekday for _, weekday in self.byday}
+        if self.freq == 'DAILY':
+            occurrence = dtstart + timedelta(days=step)
+            return [occurrence] if not weekdays or occurrence.weekday() in weekdays else []
+        if self.freq == 'WEEKLY':
+            if not weekdays: return [dtstart + timedelta(weeks=step)]
+            week_start = dtstart - timedelta(days=dtstart.weekday() - 7 * step)
+            return [week_start + timedelta(days=weekday) for weekday in sorted(weekdays)]
+        if self.freq == 'MONTHLY':
+            year, month = divmod(dtstart.month - 1 + step, 12)
+            months = ((dtstart.year + year, month + 1),)
+        else:
+            months = tuple((dtstart.year + step, month) for month in (self.bymonth or (dtstart.month,)))
+        occurrences = []
+        for year, month in months:
+            if self.byday: days = _month_days(year, month, self.byday)
+            else: days = [dtstart.day] if dtstart.day <= _days_in_month(year, month) else [] # e.g. no Feb 30
+            occurrences.extend(datetime.combine(date(year, month, day), dtstart.time()) for day in days)
+        return occurrences
+
+    def iter_from(self, start):
+        """Yields the occurrences at or after start, in order (forever, for rules without COUNT/UNTIL)."""
+        index = self._first_period(start); emitted = 0; empty_periods = 0
+        while empty_periods < MAX_EMPTY_PERIODS:
+            try: period = self._period(index)
+            except (OverflowError, ValueError): return # Past datetime.max: the series ends there
+            candidates = [occurrence for occurrence in period if occurrence >= self.dtstart]
+            empty_periods = 0 if candidates else empty_periods + 1
+            for occurrence in candidates:
+                if self.until is not None and occurrence > self.until: return
+                emitted += 1
+                if self.count is not None and emitted > self.count: return
+                if occurrence >= start and occurrence not in self.exdates: yield occurrence
+            index += 1
+
+    def between(self, start, end):
+        """Occurrences with start <= occurrence < end, in order."""
+        occurrences = []
+        for occurrence in self.iter_from(start):
+            if occurrence >= end: break
+            occurrences.append(occurrence)
+        return occurrences
+
+    def next_occurrence(self, after):
+        """First occurrence at or after the given datetime, or None once the rule has ended."""
+        return next(self.iter_from(after), None)
+
+    def last_occurrence(self):
+        """Final occurrence of a rule with COUNT or UNTIL (None for endless or empty rules)."""
+        if self.count is None and self.until is None: return None
+        last = None
+        for occurrence in self.iter_from(self.dtstart): last = occurrence
+        return last
+
+    def series_target(self, now=None):
+        """The occurrence a list shows for the whole series: the upcoming one, or the last one once it has ended."""
+        if now is None: now = datetime.now()
+        return self.next_occurrence(now - SERIES_GRACE) or self.last_occurrence() or self.dtstart
+
+
+@lru_cache(maxsize=EXPANSION_CACHE_WINDOWS)
+def expand(rule, start, end):
+    """rule.between(start, end), memoized per (rule, window) with LRU eviction. Returns a tuple."""
+    return tuple(rule.between(start, end))
@@ -0,0 +1,491 @@
+# -*- coding: utf-8 -*-
+"""SQLite storage backend with the same query/view API as EventStore.
+
+Events live in one table indexed on the target timestamp (epoch seconds) and
+on the case-folded label, so week/day/range queries, the alphabetical list and
+the Closest First list are all index range scans and only the rows on screen
+are turned into event records. Nothing is loaded up front: opening a database of
+any size is O(1). Every add/remove is its own transaction (bulk adds and
+removes are one transaction each), so no journal or autosave is needed.
+
+Views page by keyset (WHERE (label_key, id) > (?, ?)), never by OFFSET from
+the start: a _RankAnchors remembers the index key at each rank it has seen
+since the last change, and a row is reached by a short scan from the
+nearest one. Scrolling, ticking and the Closest First split therefore cost
+about the rows they read. Event records are cached weakly by row id, so the
+store holds only what the front end still references.
+
+open_store() picks the backend from the file name (JSON, SQLite or a
+read-only archive).
+"""
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import json
+import os
+import sqlite3
+import weakref
+
+from holidays import next_holiday_dates
+from recurrence import RecurrenceRule, SERIES_GRACE
+from event_store import (
+    EventStore, ClosestFirstView, WeekVersions, make_event, label_identity_key, snapshot_data, merge_occurrences, builtin_occurrences,
+    to_epoch_seconds, from_epoch_seconds, EPOCH,
+    DEFAULT_SETTINGS, SORT_ALPHA, SORT_ALPHA_REV, DEFAULT_SORT, SQLITE_SUFFIXES, ARCHIVE_SUFFIX,
+)
+
+
+ITER_PAGE_ROWS = 1000
+RANK_ANCHOR_LIMIT = 512 # Known ranks kept per index order; past this they're dropped and relearned
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,
+    label_key TEXT NOT NULL,             -- label.lower(): list order, as in EventStore
+    label_identity TEXT NOT NULL UNIQUE, -- label.casefold(): duplicate check and lookups
+    target_ts INTEGER NOT NULL,          -- target_dt as seconds since EPOCH
+    location TEXT,
+    is_custom INTEGER NOT NULL,
+    recurrence TEXT                      -- RecurrenceRule.to_text() for a series (target_ts is its listed occurrence)
+);
+CREATE INDEX IF NOT EXISTS events_target_ts ON events (target_ts, id);
+CREATE INDEX IF NOT EXISTS events_label_key ON events (label_key, id);
+CREATE INDEX IF NOT EXISTS events_builtin ON events (id) WHERE is_custom = 0; -- Few rows: checked by add_builtin_events()
+CREATE INDEX IF NOT EXISTS events_series ON events (target_ts) WHERE recurrence IS NOT NULL;
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+_COLUMNS = "id, label, target_ts, location, is_custom, recurrence"
+
+
+def open_store(filename):
+    """Returns a SQLiteEventStore for a *.db/*.sqlite/*.sqlite3 file name, a read-only ArchiveStore for *.evarc, else a JSON EventStore."""
+    if filename.lower().endswith(SQLITE_SUFFIXES): return SQLiteEventStore(filename)
+    if filename.lower().endswith(ARCHIVE_SUFFIX):
+        from archive import ArchiveStore
+        return ArchiveStore(filename)
+    return EventStore(filename)
+
+def _seconds(dt):
+    """dt as (fractional) seconds since EPOCH, comparable with the integer target_ts column."""
+    return (dt - EPOCH).total_seconds()
+
+
+# --- Keyset Paging ---
+
+class _RankAnchors:
+    """Known (rank, key) points of one index order, (column, id) ascending.
+
+    key_at(rank) seeks from the nearest known rank with a keyset query, so it
+    scans only the rows in between; every answer becomes another known point.
+    All points are dropped when the store's version changes.
+    """
+
+    def __init__(self, store, column):
+        self.store = store; self.column = column
+        self._ranks = []; self._keys = [] # Parallel, ascending (rank order is key order)
+        self._version = None
+
+    def _current(self):
+        if self._version != self.store.version or len(self._ranks) > RANK_ANCHOR_LIMIT:
+            self._ranks = []; self._keys = []; self._version = self.store.version
+
+    def add(self, rank, key):
+        self._current()
+        position = bisect_left(self._ranks, rank)
+        if position < len(self._ranks) and self._ranks[position] == rank: return
+        self._ranks.insert(position, rank); self._keys.insert(position, tuple(key))
+
+    def key_at(self, rank):
+        """(column value, id) of the row at rank, or None if there is none."""
+        self._current()
+        if rank < 0: return None
+        position = bisect_left(self._ranks, rank)
+        if position < len(self._ranks) and self._ranks[position] == rank: return self._keys[position]
+        column = self.column; execute = self.store.conn.execute
+        before = self._ranks[position - 1] if position else -1
+        after = self._ranks[position] if position < len(self._ranks) else None
+        if after is not None and after - rank < rank - before: # Closer to the next known rank: scan back from it
+            row = execute(f"SELECT {column}, id FROM events WHERE ({column}, id) < (?, ?) ORDER BY {column} DESC, id DESC LIMIT 1 OFFSET ?",
+                          (*self._keys[position], after - rank - 1)).fetchone()
+        elif before >= 0:
+            row = execute(f"SELECT {column}, id FROM events WHERE ({column}, id) > (?, ?) ORDER BY {column}, id LIMIT 1 OFFSET ?",
+                          (*self._keys[position - 1], rank - before - 1)).fetchone()
+        else: row = execute(f"SELECT {column}, id FROM events ORDER BY {column}, id LIMIT 1 OFFSET ?", (rank,)).fetchone()
+        if row is None: return None
+        self.add(rank, row)
+        return tuple(row)
+
+    def rank_of(self, value):
+        """Number of rows whose (numeric) column is below value, counted from the nearest known rank."""
+        self._current()
+        column = self.column; count = self.store._count
+        position = bisect_left(self._keys, (value,)) # Known keys below value come first
+        below = position - 1 if position else None
+        above = position if position < len(self._keys) else None
+        if below is not None and (above is None or value - self._keys[below][0] <= self._keys[above][0] - value):
+            return self._ranks[below] + 1 + count(f"({column}, id) > (?, ?) AND {column} < ?", (*self._keys[below], value))
+        if above is not None:
+            return self._ranks[above] - count(f"{column} >= ? AND ({column}, id) < (?, ?)", (value, *self._keys[above]))
+        return count(f"{column} < ?", (value,))
+
+    def rows_from(self, rank, count, descending=False):
+        """Up to count events starting at rank, going up the order (or down it with descending)."""
+        key = self.key_at(rank)
+        if key is None or count <= 0: return []
+        column = self.column
+        if descending: sql = f"SELECT {_COLUMNS} FROM events WHERE ({column}, id) <= (?, ?) ORDER BY {column} DESC, id DESC LIMIT ?"
+        else: sql = f"SELECT {_COLUMNS} FROM events WHERE ({column}, id) >= (?, ?) ORDER BY {column}, id LIMIT ?"
+        rows = self.store._query(sql, (*key, count))
+        if rows: # The last row read is where the next page starts
+            last = rows[-1]
+            value = last['label'].lower() if column == 'label_key' else to_epoch_seconds(last['target_dt'])
+            self.add(rank - len(rows) + 1 if descending else rank + len(rows) - 1, (value, self.store._row_id(last)))
+        return rows
+
+
+# --- Views ---
+
+class SQLiteLabelView:
+    """Alphabetical (A-Z, or Z-A with reverse=True) view of a SQLiteEventStore, paged from the label index."""
+
+    def __init__(self, store, reverse=False):
+        self.store = store; self.reverse = reverse
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, index):
+        total = len(self.store)
+        if isinstance(index, slice):
+            start, stop, _ = index.indices(total)
+            if start >= stop: return []
+            if self.reverse: return self.store._label_ranks.rows_from(total - 1 - start, stop - start, descending=True)
+            return self.store._label_ranks.rows_from(start, stop - start)
+        if index < 0: index += total
+        if not 0 <= index < total: raise IndexError("SQLiteLabelView index out of range")
+        return self[index:index + 1][0]
+
+    def index(self, event):
+        """Row of event in this view (two index range counts), or None."""
+        row_id = self.store._row_id(event)
+        if row_id is None: return None
+        label_key = event['label'].lower()
+        position = self.store._count("label_key < ? OR (label_key = ? AND id < ?)", (label_key, label_key, row_id))
+        return len(self.store) - 1 - position if self.reverse else position
+
+
+class SQLiteClosestView(ClosestFirstView):
+    """ClosestFirstView over a SQLiteEventStore.
+
+    Works on ranks in the timestamp index, which don't move as time passes:
+    now's rank splits it into the past run (read downwards) and the future
+    run (read upwards). The merge and the binary search for the split are
+    the same as in ClosestFirstView, with the store's _time_ranks finding
+    each probed rank by a short keyset scan.
+    """
+
+    def __len__(self):
+        return len(self.store)
+
+    def rows(self, start, stop, now=None):
+        """Events at positions [start, stop) as of now."""
+        if now is None: now = datetime.now()
+        now_ts = _seconds(now)
+        total = len(self.store); stop = min(stop, total)
+        if start >= stop: return []
+        ranks = self.store._time_ranks
+        pivot = ranks.rank_of(now_ts) # Ranks below pivot are past
+        past_taken = self._split(start, now_ts, pivot, total)
+        count = stop - start
+        past = ranks.rows_from(pivot - 1 - past_taken, count, descending=True)
+        future = ranks.rows_from(pivot + start - past_taken, count)
+        merged = []; past_index = future_index = 0
+        for _ in range(count):
+            if past_index < len(past) and (future_index >= len(future)
+                                           or now - past[past_index]['target_dt'] <= future[future_index]['target_dt'] - now):
+                merged.append(past[past_index]); past_index += 1
+            else:
+                merged.append(future[future_index]); future_index += 1
+        return merged
+
+    def _split(self, position, now_ts, pivot, total):
+        """How many past events come before the given position in the merged order."""
+        key_at = self.store._time_ranks.key_at
+        future_count = total - pivot
+        low = max(0, position - future_count); high = min(position, pivot)
+        while low < high:
+            past_taken = (low + high) // 2
+            future_taken = position - past_taken
+            next_past_distance = now_ts - key_at(pivot - 1 - past_taken)[0]
+            last_future_distance = key_at(pivot + future_taken - 1)[0] - now_ts
+            if next_past_distance <= last_future_distance: low = past_taken + 1
+            else: high = past_taken
+        return low
+
+    def index(self, event, now=None):
+        """Row of event in this view as of now (index range counts), or None."""
+        if now is None: now = datetime.now()
+        row_id = self.store._row_id(event)
+        if row_id is None: return None
+        now_ts = _seconds(now); target_ts = to_epoch_seconds(event['target_dt'])
+        count = self.store._count
+        if target_ts < now_ts:
+            # Past: newer past events, plus future events strictly closer
+            newer_past = count("(target_ts > ? AND target_ts < ?) OR (target_ts = ? AND id > ?)", (target_ts, now_ts, target_ts, row_id))
+            return newer_past + count("target_ts >= ? AND target_ts < ?", (now_ts, 2 * now_ts - target_ts))
+        # Future: sooner future events, plus past events at least as close
+        sooner_future = count("(target_ts >= ? AND target_ts < ?) OR (target_ts = ? AND id < ?)", (now_ts, target_ts, target_ts, row_id))
+        return sooner_future + count("target_ts >= ? AND target_ts < ?", (2 * now_ts - target_ts, now_ts))
+
+
+# --- Store ---
+
+class SQLiteEventStore:
+    """Events and settings in a SQLite database, with EventStore's add/remove/query/view API.
+
+    Event records are built only for the rows a query returns and are cached
+    weakly by row id: a row keeps its identity (selection, tree_id) across
+    queries for as long as anything still references its record, and the
+    cache never holds more than that. Built-in events are stored with
+    is_custom = 0; add_builtin_events() moves them on once their date passes.
+    """
+    read_only = False
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.journal_seq = 0
+        self.version = 0
+        self.week_versions = WeekVersions()
+        self._existed = os.path.exists(filename) # connect() creates the file
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("PRAGMA journal_mode=WAL") # Each commit appends to the WAL instead of rewriting pages
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._events = weakref.WeakValueDictionary() # row id -> event record still referenced somewhere
+        self._row_ids = weakref.WeakKeyDictionary() # event record -> row id
+        self._label_ranks = _RankAnchors(self, 'label_key')
+        self._time_ranks = _RankAnchors(self, 'target_ts')
+        self._by_tree_id = {}
+        self._length = None; self._length_version = None
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        if self._length_version != self.version:
+            self._length = self.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]; self._length_version = self.version
+        return self._length
+
+    def __iter__(self):
+        """Events in label order, fetched a page at a time (each page seeks past the previous one in the index)."""
+        page = self._query(f"SELECT {_COLUMNS} FROM events ORDER BY label_key, id LIMIT ?", (ITER_PAGE_ROWS,))
+        while page:
+            yield from page
+            page = self._query(f"SELECT {_COLUMNS} FROM events WHERE (label_key, id) > (?, ?) ORDER BY label_key, id LIMIT ?",
+                               (page[-1]['label'].lower(), self._row_id(page[-1]), ITER_PAGE_ROWS))
+
+    # --- Rows ---
+
+    def _event(self, row):
+        row_id, label, target_ts, location, is_custom, recurrence = row
+        event = self._events.get(row_id)
+        if event is None:
+            event = make_event(label, from_epoch_seconds(target_ts), location=location, is_custom=bool(is_custom),
+                               recurrence=RecurrenceRule.from_text(recurrence) if recurrence else None)
+            self._events[row_id] = event; self._row_ids[event] = row_id
+        return event
+
+    def _query(self, sql, parameters=()):
+        return [self._event(row) for row in self.conn.execute(sql, parameters)]
+
+    def _count(self, where, parameters=()):
+        return self.conn.execute(f"SELECT COUNT(*) FROM events WHERE {where}", parameters).fetchone()[0]
+
+    def _custom_count(self):
+        return len(self) - self._count("is_custom = 0") # Counts the small built-in index, not the whole table
+
+    def _row_id(self, event):
+        return self._row_ids.get(event)
+
+    def _forget(self, row_id):
+        event = self._events.pop(row_id, None)
+        if event is None: return
+        self._row_ids.pop(event, None)
+        if event['tree_id'] is not None and self._by_tree_id.get(event['tree_id']) is event: del self._by_tree_id[event['tree_id']]
+
+    # --- Add / Remove ---
+
+    def find_by_label(self, label):
+        """Returns the event whose label matches case-insensitively, or None."""
+        rows = self._query(f"SELECT {_COLUMNS} FROM events WHERE label_identity = ?", (label_identity_key(label),))
+        return rows[0] if rows else None
+
+    def find_by_tree_id(self, tree_id):
+        return self._by_tree_id.get(tree_id)
+
+    def set_tree_id(self, event, tree_id):
+        """Records which front-end row (if any) shows event."""
+        old_tree_id = event['tree_id']
+        if old_tree_id is not None and self._by_tree_id.get(old_tree_id) is event: del self._by_tree_id[old_tree_id]
+        event['tree_id'] = tree_id
+        if tree_id is not None: self._by_tree_id[tree_id] = event
+
+    def _row_values(self, event):
+        label = event['label']; recurrence = event.get('recurrence')
+        return (label, label.lower(), label_identity_key(label), to_epoch_seconds(event['target_dt']),
+                event['location'] or None, int(bool(event['is_custom'])), recurrence.to_text() if recurrence else None)
+
+    def add(self, label, target_dt, location=None, is_custom=False, recurrence=None):
+        """Adds and commits an event and returns it. Returns None for a duplicate label or missing datetime.
+
+        With a RecurrenceRule the event is a series listed at its series_target() (target_dt is ignored).
+        """
+        if recurrence is not None: target_dt = recurrence.series_target()
+        if not target_dt: return None
+        new_event = make_event(label, target_dt, location=location, is_custom=is_custom, recurrence=recurrence)
+        with self.conn:
+            cursor = self.conn.execute("INSERT OR IGNORE INTO events (label, label_key, label_identity, target_ts, location, is_custom, recurrence) "
+                                       "VALUES (?, ?, ?, ?, ?, ?, ?)", self._row_values(new_event))
+        if not cursor.rowcount: return None # Duplicate label
+        self._events[cursor.lastrowid] = new_event; self._row_ids[new_event] = cursor.lastrowid
+        self.version += 1; self.week_versions.touch(new_event)
+        return new_event
+
+    def add_many(self, new_events):
+        """Bulk add in one transaction, skipping duplicate labels. Returns the number added."""
+        new_events = list(new_events)
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO events (label, label_key, label_identity, target_ts, location, is_custom, recurrence) "
+                                  "VALUES (?, ?, ?, ?, ?, ?, ?)", (self._row_values(ev) for ev in new_events))
+        added_count = self.conn.total_changes - before
+        if added_count: self.version += 1; self.week_versions.touch_many(new_events) # Skipped duplicates only over-invalidate
+        return added_count
+
+    def remove(self, events_to_remove):
+        """Removes the given event records (as returned by this store) in one transaction. Returns the number removed."""
+        stored_events = {} # row id -> event, each once
+        for event in events_to_remove:
+            row_id = self._row_id(event)
+            if row_id is not None: stored_events[row_id] = event
+        row_ids = list(stored_events)
+        if not row_ids: return 0
+        before = self.conn.total_changes
+        with self.conn: self.conn.executemany("DELETE FROM events WHERE id = ?", ((row_id,) for row_id in row_ids))
+        self.week_versions.touch_many(list(stored_events.values()))
+        for row_id in row_ids: self._forget(row_id)
+        removed_count = self.conn.total_changes - before
+        if removed_count: self.version += 1
+        return removed_count
+
+    def add_builtin_events(self):
+        """Brings the stored yearly INITIAL_EVENTS_DATA events up to date. Returns the number (re-)added.
+
+        Built-ins already at their next date are left alone and shadowed labels
+        skipped, so once they're current this reads the small built-in index and
+        writes nothing. Passed ones are replaced by their next occurrence.
+        """
+        wanted = {label_identity_key(label): (label, to_epoch_seconds(datetime.combine(day, datetime.min.time())))
+                  for label, day in next_holiday_dates().items()}
+        stale_ids = []; current = set()
+        for row_id, identity, target_ts in self.conn.execute("SELECT id, label_identity, target_ts FROM events WHERE is_custom = 0"):
+            if identity in wanted and wanted[identity][1] == target_ts: current.add(identity)
+            else: stale_ids.append(row_id)
+        missing = [identity for identity in wanted if identity not in current]
+        if missing: # Not stored as a built-in; a custom event may have the label
+            shadowed = {identity for (identity,) in self.conn.execute(
+                f"SELECT label_identity FROM events WHERE is_custom = 1 AND label_identity IN ({', '.join('?' * len(missing))})", missing)}
+            missing = [identity for identity in missing if identity not in shadowed]
+        if not stale_ids and not missing: return 0
+        if stale_ids:
+            with self.conn: self.conn.executemany("DELETE FROM events WHERE id = ?", ((row_id,) for row_id in stale_ids))
+            for row_id in stale_ids: self._forget(row_id)
+            self.version += 1; self.week_versions.touch_all()
+        return self.add_many(make_event(wanted[identity][0], from_epoch_seconds(wanted[identity][1])) for identity in missing)
+
+    def move(self, event, target_dt):
+        """Moves a stored event to a new target_dt."""
+        row_id = self._row_id(event)
+        if row_id is None: return False
+        with self.conn: self.conn.execute("UPDATE events SET target_ts = ? WHERE id = ?", (to_epoch_seconds(target_dt), row_id))
+        if 'recurrence' not in event: self.week_versions.touch(event) # A series' occurrences don't move with it
+        event['target_dt'] = target_dt
+        if 'recurrence' not in event: self.week_versions.touch(event)
+        self.version += 1
+        return True
+
+    def advance_series(self, now=None):
+        """Moves each series whose listed occurrence has passed (plus SERIES_GRACE) on to its next one.
+
+        One query on the partial series index per call. Returns the events that moved.
+        """
+        if now is None: now = datetime.now()
+        passed = self._query(f"SELECT {_COLUMNS} FROM events WHERE recurrence IS NOT NULL AND target_ts < ?", (_seconds(now - SERIES_GRACE),))
+        moved_events = []
+        for event in passed:
+            next_target = event['recurrence'].series_target(now)
+            if next_target != event['target_dt'] and self.move(event, next_target): moved_events.append(event)
+        return moved_events
+
+    # --- Queries ---
+
+    def events_between(self, start_dt, end_dt):
+        """Returns the events with start_dt <= target_dt < end_dt, in time order."""
+        return self._query(f"SELECT {_COLUMNS} FROM events WHERE target_ts >= ? AND target_ts < ? ORDER BY target_ts, id",
+                           (_seconds(start_dt), _seconds(end_dt)))
+
+    def events_on(self, day):
+        """Returns the events on the given date, in time order."""
+        day_start = datetime.combine(day, datetime.min.time())
+        return self.events_between(day_start, day_start + timedelta(days=1))
+
+    def occurrences_between(self, start_dt, end_dt):
+        """Like events_between(), but with every occurrence of each series in the window (as copies)."""
+        series = self._query(f"SELECT {_COLUMNS} FROM events WHERE recurrence IS NOT NULL ORDER BY target_ts, id")
+        return merge_occurrences(self.events_between(start_dt, end_dt), series, start_dt, end_dt, builtin_occurrences(self, start_dt, end_dt))
+
+    def occurrences_on(self, day):
+        """Events and series occurrences on the given date, in time order."""
+        day_start = datetime.combine(day, datetime.min.time())
+        return self.occurrences_between(day_start, day_start + timedelta(days=1))
+
+    def event_dates(self):
+        """Returns the set of dates that have at least one event (from the timestamp index alone)."""
+        days = self.conn.execute("SELECT DISTINCT (target_ts - ((target_ts % 86400) + 86400) % 86400) / 86400 FROM events")
+        return {from_epoch_seconds(day * 86400).date() for (day,) in days}
+
+    def view(self, sort_method=DEFAULT_SORT):
+        """Returns a live, read-only sequence of the events in one of the SORT_OPTIONS orders."""
+        if sort_method == SORT_ALPHA: return SQLiteLabelView(self)
+        if sort_method == SORT_ALPHA_REV: return SQLiteLabelView(self, reverse=True)
+        return SQLiteClosestView(self)
+
+    # --- Persistence ---
+
+    def reset_settings(self):
+        self.settings.clear(); self.settings.update(DEFAULT_SETTINGS)
+
+    def to_dict(self):
+        """Returns the JSON save layout (reads every custom event)."""
+        custom_events = self._query(f"SELECT {_COLUMNS} FROM events WHERE is_custom = 1 ORDER BY label_key, id")
+        return snapshot_data(custom_events, self.settings)
+
+    def save(self, filename=None):
+        """Writes the settings (events are committed as they change). Returns the number of custom events."""
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                                  [(key, json.dumps(value)) for key, value in self.settings.items()])
+        return self._custom_count()
+
+    def load(self, filename=None):
+        """Reads the settings (writes nothing). Returns the number of custom events."""
+        for key, value in self.conn.execute("SELECT key, value FROM settings"): self.settings[key] = json.loads(value)
+        self._events.clear(); self._row_ids.clear(); self._by_tree_id.clear()
+        self.version += 1; self.week_versions.touch_all()
+        return self._custom_count()
+
+    def exists(self, filename=None):
+        """Whether the database file was there before this store opened (and so created) it."""
+        if filename and filename != self.filename: return os.path.exists(filename)
+        return self._existed
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Timing of the GUI's startup phases (python code.py --startup-profile).
+
+code.py creates a StartupProfile before its heavy imports and marks the end
+of each phase: imports, window and widgets, data load, first frame, and the
+work deferred until after it (tkcalendar, the Calendar and Week tabs). The
+report gives each phase's own time and the running total since the profile
+was created; interpreter startup before that isn't included.
+"""
+from time import perf_counter
+
+
+class StartupProfile:
+    """Wall-clock time between successive mark() calls, by phase name."""
+
+    def __init__(self):
+        self.start = self._last = perf_counter()
+        self.phases = [] # (name, seconds, seconds since start)
+
+    def mark(self, name):
+        """Ends the phase that started at the previous mark (or at creation)."""
+        now = perf_counter()
+        self.phases.append((name, now - self._last, now - self.start)); self._last = now
+
+    def elapsed_ms(self, name):
+        """Milliseconds from creation to the end of phase name, or None if it hasn't been marked."""
+        for phase, _, total in self.phases:
+            if phase == name: return total * 1000
+        return None
+
+    def report(self):
+        width = max((len(name) for name, _, _ in self.phases), default=0)
+        lines = [f"{'phase':<{width}}  {'ms':>8}  {'total ms':>9}"]
+        lines += [f"{name:<{width}}  {seconds * 1000:8.1f}  {total * 1000:9.1f}" for name, seconds, total in self.phases]
+        return "\n".join(lines)
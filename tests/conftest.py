@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""The modules are flat files in the repository root; make them importable from the tests.
+
+The GUI's code.py shadows the standard library's code module, which pdb (and
+so pytest) imports. `python -m pytest` run from the root puts the root first
+on sys.path, so the real module is imported here before anything else asks
+for it, and the root is appended rather than prepended.
+"""
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_saved_path = sys.path[:]
+sys.path[:] = [entry for entry in sys.path if os.path.abspath(entry or os.curdir) != ROOT]
+importlib.import_module('code') # The standard library one
+sys.path[:] = _saved_path
+if ROOT not in sys.path: sys.path.append(ROOT)
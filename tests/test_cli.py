@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+import cli
+from journal import JOURNAL_COMPACT_BYTES
+
+
+def test_add_and_remove_round_trip(tmp_path, capsys):
+    path = str(tmp_path / "events.json")
+    assert cli.main(["--file", path, "add", "Dentist", "2030-03-04", "09:15"]) == 0
+    assert cli.main(["--file", path, "search", "dentist"]) == 0
+    assert "Dentist" in capsys.readouterr().out
+    assert cli.main(["--file", path, "remove", "Dentist"]) == 0
+    assert cli.main(["--file", path, "search", "dentist"]) == 1
+
+def test_write_finishes_compaction_before_exit(tmp_path):
+    path = str(tmp_path / "events.json")
+    with open(path + ".journal", 'w', encoding='utf-8') as f:
+        seq = 0
+        while f.tell() <= JOURNAL_COMPACT_BYTES:
+            seq += 1
+            f.write(json.dumps({"op": "add", "seq": seq, "event": {"label": f"Event {seq}", "target_dt_iso": "2031-01-01T10:00:00"}}) + "\n")
+    assert cli.main(["--file", path, "add", "New", "2031-02-02"]) == 0
+    with open(path, encoding='utf-8') as f: snapshot = json.load(f)
+    assert len(snapshot["events"]) == seq + 1 and snapshot["journal_seq"] == seq + 1
+    assert os.path.getsize(path + ".journal") == 0
+    assert not os.path.exists(path + ".tmp")
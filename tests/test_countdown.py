@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+
+from countdown import RefreshScheduler, next_change_time
+from event_store import format_timedelta, calculate_indicator_symbol
+
+
+NOW = datetime(2030, 6, 15, 12, 0, 0)
+
+
+def test_pop_due_in_change_time_order():
+    scheduler = RefreshScheduler()
+    targets = {"far": NOW + timedelta(days=3, seconds=30), "soon": NOW + timedelta(seconds=5.5), "past": NOW - timedelta(seconds=10)}
+    for key, target_dt in targets.items(): scheduler.schedule(key, target_dt, NOW)
+    assert scheduler.pop_due(NOW) == []
+    due_order = []
+    moment = NOW
+    while len(due_order) < 3:
+        moment += timedelta(milliseconds=250)
+        due_order += [key for key, _ in scheduler.pop_due(moment)]
+    assert due_order == ["soon", "far", "past"] # Every second, once a minute, at the end of "Just now or Past"
+    assert len(scheduler) == 0
+
+def test_reschedule_and_discard_drop_stale_entries():
+    scheduler = RefreshScheduler()
+    scheduler.schedule("a", NOW + timedelta(seconds=2.5), NOW)
+    scheduler.schedule("b", NOW + timedelta(seconds=3.5), NOW)
+    scheduler.schedule("a", NOW + timedelta(days=2, seconds=10), NOW) # Now due much later
+    scheduler.discard("b")
+    assert scheduler.pop_due(NOW + timedelta(seconds=2)) == []
+    assert "a" in scheduler and "b" not in scheduler
+    assert [key for key, _ in scheduler.pop_due(NOW + timedelta(seconds=11))] == ["a"]
+
+def test_schedule_many_matches_schedule():
+    one_by_one = RefreshScheduler(); batched = RefreshScheduler()
+    targets = [(f"row{i}", NOW + timedelta(seconds=i * 37.3 - 400)) for i in range(50)]
+    for key, target_dt in targets: one_by_one.schedule(key, target_dt, NOW)
+    batched.schedule_many(targets, NOW)
+    later = NOW + timedelta(seconds=61)
+    assert sorted(one_by_one.pop_due(later)) == sorted(batched.pop_due(later))
+
+def test_next_change_time_is_when_the_display_changes():
+    for offset in (-7200.4, -30.2, 0.3, 59.9, 3600.7, 86400 * 3 + 12.5, 86400 * 8 + 0.5):
+        target_dt = NOW + timedelta(seconds=offset)
+        change = next_change_time(target_dt, NOW)
+        before = change - timedelta(milliseconds=2)
+        shown = (format_timedelta(target_dt - NOW), calculate_indicator_symbol(target_dt, NOW))
+        assert (format_timedelta(target_dt - before), calculate_indicator_symbol(target_dt, before)) == shown
+        assert (format_timedelta(target_dt - change), calculate_indicator_symbol(target_dt, change)) != shown
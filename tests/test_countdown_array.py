@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+import random
+
+import pytest
+
+from countdown import RefreshScheduler
+from event_store import EventStore, format_timedelta, calculate_indicator_symbol, INDICATOR_THRESHOLD_URGENT, INDICATOR_THRESHOLD_NEAR
+
+pytest.importorskip("numpy")
+import countdown_array # noqa: E402
+from countdown_array import StoreCountdowns # noqa: E402
+
+
+START = datetime(2030, 6, 15, 12, 0, 0, 370000)
+
+
+def shown(target_dt, now):
+    return (format_timedelta(target_dt - now), calculate_indicator_symbol(target_dt, now))
+
+def make_store():
+    """Events around START, including some just before a minute boundary or an indicator threshold."""
+    rng = random.Random(5)
+    store = EventStore("events.json")
+    offsets = [rng.uniform(-3 * 86400, 40 * 86400) for _ in range(300)]
+    offsets += [rng.uniform(-200, 200) for _ in range(40)] # Seconds shown, "Just now or Past"
+    offsets += [days * 86400 + rng.uniform(0, 120) for days in (INDICATOR_THRESHOLD_URGENT, INDICATOR_THRESHOLD_NEAR) for _ in range(10)]
+    for i, offset in enumerate(offsets): store.add(f"Event {i:04d}", START + timedelta(seconds=round(offset, 3)), is_custom=True)
+    return store
+
+@pytest.mark.parametrize("rebuild_after_edits", [0, countdown_array.REBUILD_AFTER_EDITS]) # Rebuilt on each edit / rows formatted directly
+def test_store_countdowns_match_scheduler(monkeypatch, rebuild_after_edits):
+    monkeypatch.setattr(countdown_array, 'REBUILD_AFTER_EDITS', rebuild_after_edits)
+    store = make_store()
+    window = {f"I{row:03d}": event for row, event in enumerate(store.events[::4])} # The materialized rows
+    scheduler = RefreshScheduler(); scheduler.schedule_many(((key, event['target_dt']) for key, event in window.items()), START)
+    scheduler_display = {key: shown(event['target_dt'], START) for key, event in window.items()}
+    countdowns = StoreCountdowns(store)
+    array_display = {key: (text, indicator) for key, text, indicator in countdowns.due_rows(window.items(), START)}
+    assert array_display == scheduler_display
+
+    moments = [START + timedelta(seconds=tick) for tick in range(1, 200)]
+    moments += [moments[-1] + timedelta(hours=2)] + [moments[-1] + timedelta(hours=2, seconds=tick) for tick in range(1, 5)] # Clock jump
+    for tick, now in enumerate(moments):
+        if tick == 100: # Edits: an added row, a moved row
+            window["new"] = store.add("New", now + timedelta(seconds=30.5), is_custom=True)
+            store.move(window["I001"], now + timedelta(days=1, seconds=3.25))
+            for key in ("new", "I001"):
+                scheduler.schedule(key, window[key]['target_dt'], now); scheduler_display[key] = array_display[key] = shown(window[key]['target_dt'], now)
+        for key, target_dt in scheduler.pop_due(now):
+            scheduler_display[key] = shown(target_dt, now); scheduler.schedule(key, target_dt, now)
+        for key, text, indicator in countdowns.due_rows(window.items(), now): array_display[key] = (text, indicator)
+        expected = {key: shown(event['target_dt'], now) for key, event in window.items()}
+        assert scheduler_display == expected
+        assert array_display == expected
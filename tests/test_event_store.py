@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+import random
+
+import pytest
+
+from event_store import EventStore, make_event
+
+
+NOW = datetime(2030, 6, 15, 12, 0, 0)
+
+
+def make_store(count=200, seed=1):
+    """A store of custom events spread around NOW, with some sharing a datetime."""
+    rng = random.Random(seed)
+    store = EventStore("events.json")
+    for i in range(count):
+        store.add(f"Event {i:04d}", NOW + timedelta(hours=rng.randint(-500, 500)), is_custom=True)
+    return store
+
+def check_indexes(store):
+    """Every index agrees with store.events."""
+    assert [ev.label.lower() for ev in store.events] == sorted(ev.label.lower() for ev in store.events)
+    assert store._label_keys == [ev.label.lower() for ev in store.events]
+    assert store._index_times == sorted(store._index_times)
+    assert [ev.target_dt for ev in store._index_events] == store._index_times
+    assert {id(ev) for ev in store._index_events} == {id(ev) for ev in store.events}
+    assert len(store._by_label) == len(store.events)
+    for ev in store.events: assert store.find_by_label(ev.label.upper()) is ev
+
+
+def test_add_keeps_indexes_consistent():
+    store = make_store()
+    assert len(store) == 200
+    check_indexes(store)
+
+def test_add_rejects_duplicate_labels_case_insensitively():
+    store = EventStore("events.json")
+    assert store.add("Party", NOW) is not None
+    assert store.add("PARTY", NOW + timedelta(days=1)) is None
+    assert len(store) == 1
+
+def test_add_many_skips_duplicates():
+    store = EventStore("events.json")
+    added = store.add_many([make_event("A", NOW), make_event("a", NOW), make_event("B", NOW)])
+    assert added == 2
+    check_indexes(store)
+
+@pytest.mark.parametrize("remove_count", [3, 150]) # Bisect path and bulk path
+def test_remove_keeps_indexes_consistent(remove_count):
+    store = make_store()
+    doomed = random.Random(2).sample(store.events, remove_count)
+    version = store.version
+    assert store.remove(doomed) == remove_count
+    assert store.version > version
+    assert len(store) == 200 - remove_count
+    for ev in doomed: assert store.find_by_label(ev.label) is None
+    check_indexes(store)
+
+@pytest.mark.parametrize("remove_count", [1, 150])
+def test_remove_with_duplicates(remove_count):
+    store = make_store()
+    doomed = store.events[:remove_count]
+    assert store.remove(doomed + doomed) == remove_count
+    assert len(store) == 200 - remove_count
+    check_indexes(store)
+
+def test_remove_ignores_events_not_in_store():
+    store = make_store(20)
+    stranger = make_event("Event 0001", NOW) # Same label, different record
+    assert store.remove([stranger]) == 0
+    assert len(store) == 20
+    check_indexes(store)
+
+def test_move_repositions_in_time_index():
+    store = make_store(50)
+    event = store.events[10]
+    assert store.move(event, NOW + timedelta(days=365))
+    assert store._index_events[-1] is event
+    check_indexes(store)
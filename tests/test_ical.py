@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+from event_store import make_event
+from export import write_export
+from ical import ImportProgress, import_batches
+from recurrence import RecurrenceRule
+
+
+def test_ics_round_trip(tmp_path):
+    series = RecurrenceRule.parse("FREQ=WEEKLY;BYDAY=MO,TH;COUNT=10", datetime(2030, 1, 7, 18), exdates=[datetime(2030, 1, 10, 18)])
+    events = [make_event("Dentist", datetime(2030, 3, 4, 9, 15), location="Main St; Suite 2", is_custom=True),
+              make_event("Café, \"quotes\" \\ and a very long label " + "x" * 80, datetime(2030, 5, 6, 7, 8, 9), is_custom=True),
+              make_event("Choir", series.series_target(), is_custom=True, recurrence=series)]
+    path = str(tmp_path / "export.ics")
+    assert write_export(path, events) == 3
+    progress = ImportProgress()
+    imported = [ev for batch in import_batches(path, progress, batch_size=2) for ev in batch]
+    assert progress.skipped == 0 and progress.fraction() == 1
+    assert [(ev['label'], ev['target_dt'], ev.get('location'), ev.get('recurrence')) for ev in imported] == \
+           [(ev['label'], ev['target_dt'], ev.get('location'), ev.get('recurrence')) for ev in events]
+
+def test_import_skips_invalid_vevents(tmp_path):
+    path = tmp_path / "bad.ics"
+    path.write_bytes(b"BEGIN:VCALENDAR\r\n"
+                     b"BEGIN:VEVENT\r\nSUMMARY:No start\r\nEND:VEVENT\r\n"
+                     b"BEGIN:VEVENT\r\nSUMMARY:Bad rule\r\nDTSTART:20300101T100000\r\nRRULE:FREQ=MONTHLY;BYDAY=9MO\r\nEND:VEVENT\r\n"
+                     b"BEGIN:VEVENT\r\nSUMMARY:Offset\r\nDTSTART:20300101T100000+0100\r\nEND:VEVENT\r\n"
+                     b"BEGIN:VEVENT\r\nSUMMARY:Good\r\nDTSTART;VALUE=DATE:20300102\r\nEND:VEVENT\r\n"
+                     b"END:VCALENDAR\r\n")
+    progress = ImportProgress()
+    imported = [ev for batch in import_batches(str(path), progress) for ev in batch]
+    assert [(ev['label'], ev['target_dt']) for ev in imported] == [("Good", datetime(2030, 1, 2))]
+    assert progress.skipped == 3
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+from event_store import EventStore
+from journal import EventJournal
+
+
+def open_store(path):
+    store = EventStore(str(path))
+    if store.exists(): store.load()
+    journal = EventJournal(store); journal.replay(); journal.open()
+    return store, journal
+
+
+def test_replay_restores_edits(tmp_path):
+    store, journal = open_store(tmp_path / "events.json")
+    for i in range(3): journal.record_add(store.add(f"Event {i}", datetime(2030, 1, 1 + i), is_custom=True))
+    removed = store.find_by_label("Event 1"); store.remove([removed]); journal.record_remove([removed])
+    store.settings["dark_mode"] = True; journal.record_settings()
+    journal.close()
+    store, journal = open_store(tmp_path / "events.json")
+    assert sorted(ev['label'] for ev in store) == ["Event 0", "Event 2"]
+    assert store.settings["dark_mode"] is True
+    assert journal.seq == 5
+
+def test_replay_stops_at_torn_entry(tmp_path):
+    store, journal = open_store(tmp_path / "events.json")
+    for i in range(3): journal.record_add(store.add(f"Event {i}", datetime(2030, 1, 1 + i), is_custom=True))
+    journal.close()
+    with open(journal.path, 'ab') as f: f.write(b'{"op":"add","event":{"label":"Torn')
+    store, journal = open_store(tmp_path / "events.json")
+    assert sorted(ev['label'] for ev in store) == ["Event 0", "Event 1", "Event 2"]
+    with open(journal.path, 'rb') as f: assert f.read().endswith(b"\n") # open() cut the torn line off
+    journal.record_add(store.add("Event 3", datetime(2030, 1, 4), is_custom=True))
+    journal.close()
+    store, _ = open_store(tmp_path / "events.json")
+    assert len(store) == 4
+
+def test_compaction_skips_entries_in_snapshot(tmp_path):
+    store, journal = open_store(tmp_path / "events.json")
+    journal.record_add(store.add("Before", datetime(2030, 1, 1), is_custom=True))
+    assert journal.compact() == 1
+    journal.record_add(store.add("After", datetime(2030, 1, 2), is_custom=True))
+    journal.close()
+    store, _ = open_store(tmp_path / "events.json")
+    assert sorted(ev['label'] for ev in store) == ["After", "Before"]
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+import json
+
+import pytest
+
+from event_store import EventStore, event_from_record, parse_iso_datetime
+
+
+def test_parse_iso_datetime():
+    assert parse_iso_datetime("2024-01-02T03:04:05") == datetime(2024, 1, 2, 3, 4, 5)
+
+@pytest.mark.parametrize("text", ["2024-01-01T10:00+01", "2024-01-01T10:00:00+01:00", "2024-01-01T10:00:00Z",
+                                  "2024-01-01 10:00:00", "2024-01-01T10:00", "2024-01-01"])
+def test_parse_iso_datetime_rejects_other_layouts(text):
+    with pytest.raises(ValueError): parse_iso_datetime(text)
+
+
+# --- Loading ---
+
+def test_load_skips_malformed_records(tmp_path):
+    path = tmp_path / "events.json"
+    records = [{"label": "Good", "target_dt_iso": "2030-01-01T10:00:00"},
+               {"label": 123, "target_dt_iso": "2030-01-02T10:00:00"},
+               {"label": ["list"], "target_dt_iso": "2030-01-03T10:00:00"},
+               {"label": "Bad date", "target_dt_iso": "2030-01-01T10:00+01"},
+               {"label": "No date"},
+               {"label": "", "target_dt_iso": "2030-01-04T10:00:00"},
+               {"label": "Series", "target_dt_iso": "2030-01-05T10:00:00", "rrule": "FREQ=YEARLY"},
+               {"label": "Also good", "target_dt_iso": "2030-01-06T10:00:00", "location": "Home"}]
+    path.write_text(json.dumps({"settings": {"dark_mode": True}, "events": records}))
+    store = EventStore(str(path))
+    assert store.load() == 3
+    assert sorted(ev['label'] for ev in store) == ["Also good", "Good", "Series"]
+    assert store.settings["dark_mode"] is True
+
+def test_event_from_record_rejects_non_string_labels():
+    with pytest.raises(TypeError): event_from_record({"label": 123, "target_dt_iso": "2030-01-02T10:00:00"})
+    assert event_from_record({"label": None, "target_dt_iso": "2030-01-02T10:00:00"}) is None
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+import pytest
+
+from recurrence import RecurrenceRule, expand
+
+
+def test_weekly_byday():
+    rule = RecurrenceRule.parse("FREQ=WEEKLY;BYDAY=MO,WE", datetime(2024, 1, 1, 9, 30)) # A Monday
+    assert expand(rule, datetime(2024, 1, 1), datetime(2024, 1, 15)) == (
+        datetime(2024, 1, 1, 9, 30), datetime(2024, 1, 3, 9, 30), datetime(2024, 1, 8, 9, 30), datetime(2024, 1, 10, 9, 30))
+
+def test_monthly_nth_weekday():
+    rule = RecurrenceRule.parse("FREQ=MONTHLY;BYDAY=-1FR", datetime(2024, 1, 26))
+    assert [dt.day for dt in expand(rule, datetime(2024, 1, 1), datetime(2024, 5, 1))] == [26, 23, 29, 26]
+
+def test_interval_count_and_exdates():
+    rule = RecurrenceRule.parse("FREQ=DAILY;INTERVAL=2;COUNT=4", datetime(2024, 1, 1), exdates=[datetime(2024, 1, 3)])
+    assert expand(rule, datetime(2023, 1, 1), datetime(2025, 1, 1)) == (datetime(2024, 1, 1), datetime(2024, 1, 5), datetime(2024, 1, 7))
+    assert rule.last_occurrence() == datetime(2024, 1, 7)
+
+def test_until_and_window_start():
+    rule = RecurrenceRule.parse("FREQ=YEARLY;UNTIL=20280101T000000", datetime(2020, 3, 1))
+    assert expand(rule, datetime(2025, 1, 1), datetime(2040, 1, 1)) == (datetime(2025, 3, 1), datetime(2026, 3, 1), datetime(2027, 3, 1))
+
+def test_monthly_skips_short_months():
+    rule = RecurrenceRule.parse("FREQ=MONTHLY", datetime(2024, 1, 31))
+    assert [dt.month for dt in expand(rule, datetime(2024, 1, 1), datetime(2024, 8, 1))] == [1, 3, 5, 7]
+
+def test_expansion_stops_at_datetime_max():
+    rule = RecurrenceRule.parse("FREQ=DAILY;INTERVAL=1000000", datetime(2024, 1, 1))
+    assert len(expand(rule, datetime(2024, 1, 1), datetime.max)) == 3
+    assert rule.next_occurrence(datetime(9000, 1, 1)) is None
+
+def test_text_round_trip():
+    rule = RecurrenceRule.parse("FREQ=WEEKLY;INTERVAL=2;BYDAY=TU;COUNT=5", datetime(2024, 1, 2, 8), exdates=[datetime(2024, 1, 16, 8)])
+    assert RecurrenceRule.from_text(rule.to_text()) == rule
+
+@pytest.mark.parametrize("text", ["FREQ=MONTHLY;BYDAY=9MO", "FREQ=MONTHLY;BYDAY=0MO", "FREQ=MONTHLY;BYDAY=-6FR",
+                                  "FREQ=WEEKLY;BYDAY=XX", "FREQ=YEARLY;BYMONTH=13", "INTERVAL=2", "FREQ"])
+def test_invalid_rules(text):
+    with pytest.raises(ValueError): RecurrenceRule.parse(text, datetime(2024, 1, 1))
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+import random
+
+import pytest
+
+import sqlite_store
+from event_store import EventStore, SORT_ALPHA, SORT_ALPHA_REV, SORT_CLOSEST
+from sqlite_store import SQLiteEventStore
+
+
+NOW = datetime(2030, 6, 15, 12, 0, 0)
+COUNT = 300
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """The same events (whole seconds, many sharing a time) in a SQLiteEventStore and an EventStore."""
+    rng = random.Random(3)
+    sqlite = SQLiteEventStore(str(tmp_path / "events.db")); memory = EventStore(str(tmp_path / "events.json"))
+    for i in rng.sample(range(COUNT), COUNT): # Label order differs from insertion order
+        label = f"Event {i:04d}"; target_dt = NOW + timedelta(hours=rng.randint(-300, 300))
+        sqlite.add(label, target_dt, is_custom=True); memory.add(label, target_dt, is_custom=True)
+    yield sqlite, memory
+    sqlite.close()
+
+def labels(events):
+    return [ev['label'] for ev in events]
+
+
+@pytest.mark.parametrize("sort_method", [SORT_ALPHA, SORT_ALPHA_REV])
+def test_label_view_pages(stores, sort_method):
+    sqlite, memory = stores
+    view = sqlite.view(sort_method); expected = labels(memory.view(sort_method)[:])
+    assert len(view) == COUNT
+    rng = random.Random(4)
+    for _ in range(60): # Random jumps reuse and extend the rank anchors
+        start = rng.randrange(COUNT); stop = start + rng.randint(1, 40)
+        assert labels(view[start:stop]) == expected[start:stop]
+    assert labels(view[:]) == expected
+    assert view[COUNT - 1]['label'] == expected[-1]
+    for position in (0, 17, COUNT - 1): assert view.index(view[position]) == position
+
+@pytest.mark.parametrize("now", [NOW, NOW - timedelta(days=30), NOW + timedelta(days=30), NOW + timedelta(minutes=30)])
+def test_closest_view_pages(stores, now):
+    sqlite, memory = stores
+    view = sqlite.view(SORT_CLOSEST); expected = labels(memory.view(SORT_CLOSEST).rows(0, COUNT, now))
+    for start in range(0, COUNT, 11): # Each page start goes through _split
+        assert labels(view.rows(start, start + 25, now)) == expected[start:start + 25]
+    for position in (0, 50, COUNT - 1): assert view.index(view.rows(position, position + 1, now)[0], now) == position
+
+def test_views_follow_changes(stores):
+    sqlite, memory = stores
+    view = sqlite.view(SORT_ALPHA)
+    assert labels(view[100:110]) == labels(memory.view(SORT_ALPHA)[100:110]) # Learn some anchors
+    for store in (sqlite, memory):
+        store.remove([store.find_by_label(f"Event {i:04d}") for i in range(0, COUNT, 3)])
+        store.add("Event 0100a", NOW, is_custom=True)
+    assert len(view) == len(memory)
+    assert labels(view[:]) == labels(memory.view(SORT_ALPHA)[:])
+    assert labels(sqlite.view(SORT_CLOSEST).rows(40, 80, NOW)) == labels(memory.view(SORT_CLOSEST).rows(40, 80, NOW))
+
+def test_many_anchors_are_dropped_and_relearned(stores, monkeypatch):
+    sqlite, memory = stores
+    monkeypatch.setattr(sqlite_store, 'RANK_ANCHOR_LIMIT', 8)
+    view = sqlite.view(SORT_ALPHA); expected = labels(memory.view(SORT_ALPHA)[:])
+    for start in range(COUNT - 1, -1, -7): assert view[start]['label'] == expected[start]
+
+def test_remove_with_duplicates(stores):
+    sqlite, _ = stores
+    event = sqlite.find_by_label("Event 0007")
+    assert sqlite.remove([event, event]) == 1
+    assert len(sqlite) == COUNT - 1 and sqlite.find_by_label("Event 0007") is None
+
+def test_rows_are_cached_weakly(stores):
+    sqlite, _ = stores
+    assert sqlite.find_by_label("Event 0001") is sqlite.find_by_label("Event 0001")
+    rows = sqlite.view(SORT_ALPHA)[:]
+    assert len(sqlite._events) >= COUNT
+    del rows
+    assert len(sqlite._events) < COUNT
+
+def test_exists_and_builtins(tmp_path):
+    path = str(tmp_path / "new.db")
+    store = SQLiteEventStore(path)
+    assert not store.exists()
+    added = store.add_builtin_events()
+    assert added > 0 and len(store) == added
+    assert store.add_builtin_events() == 0 # Already current: nothing written
+    store.close()
+    store = SQLiteEventStore(path)
+    assert store.exists()
+    store.load()
+    assert len(store) == added
+    store.close()
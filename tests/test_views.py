@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime, timedelta
+import random
+
+import pytest
+
+from event_store import EventStore, ClosestFirstView, SORT_ALPHA, SORT_ALPHA_REV
+
+
+NOW = datetime(2030, 6, 15, 12, 0, 0)
+
+
+def make_store(count=200, seed=1):
+    """A store of custom events spread around NOW, with some sharing a datetime."""
+    rng = random.Random(seed)
+    store = EventStore("events.json")
+    for i in range(count):
+        store.add(f"Event {i:04d}", NOW + timedelta(hours=rng.randint(-500, 500)), is_custom=True)
+    return store
+
+def closest_first(events, now):
+    """Reference order: by distance from now, the past event first on a tie; the past run is read back from now."""
+    past = [ev for ev in events if ev.target_dt < now][::-1]
+    future = [ev for ev in events if ev.target_dt >= now]
+    merged = []
+    while past or future:
+        if past and (not future or now - past[0].target_dt <= future[0].target_dt - now): merged.append(past.pop(0))
+        else: merged.append(future.pop(0))
+    return merged
+
+
+def test_label_views():
+    store = make_store(50)
+    labels = sorted(ev.label for ev in store.events)
+    assert [ev.label for ev in store.view(SORT_ALPHA)[:]] == labels
+    reverse = store.view(SORT_ALPHA_REV)
+    assert [ev.label for ev in reverse[:]] == labels[::-1]
+    assert [ev.label for ev in reverse[5:12]] == labels[::-1][5:12]
+    assert reverse.index(reverse[7]) == 7
+
+@pytest.mark.parametrize("now", [NOW, NOW - timedelta(days=100), NOW + timedelta(days=100), NOW + timedelta(minutes=30)])
+def test_closest_first_view_matches_merge(now):
+    store = make_store()
+    view = ClosestFirstView(store)
+    expected = closest_first(store._index_events, now)
+    assert view.rows(0, len(view), now) == expected
+    for start in range(0, 200, 7): # Every starting position goes through _split
+        assert view.rows(start, start + 13, now) == expected[start:start + 13]
+    for position, event in enumerate(expected): assert view.index(event, now) == position
+
+def test_closest_first_split_counts_past_events():
+    store = make_store()
+    view = ClosestFirstView(store)
+    expected = closest_first(store._index_events, NOW)
+    pivot = sum(1 for t in store._index_times if t < NOW)
+    for position in range(len(expected) + 1):
+        past_before = sum(1 for ev in expected[:position] if ev.target_dt < NOW)
+        assert view._split(position, NOW, pivot) == past_before
+
+def test_closest_first_view_equal_distance_prefers_past():
+    store = EventStore("events.json")
+    store.add("Later", NOW + timedelta(hours=1)); store.add("Earlier", NOW - timedelta(hours=1))
+    assert [ev.label for ev in ClosestFirstView(store).rows(0, 2, NOW)] == ["Earlier", "Later"]
+
+def test_closest_first_view_out_of_range():
+    view = ClosestFirstView(make_store(5))
+    assert view.rows(5, 10, NOW) == []
+    with pytest.raises(IndexError): view[5]
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""Virtual (windowed) mode for the ttk.Treeview in the Event List tab.
+
+Only the visible rows plus a small overscan above and below are materialized
+as Treeview items. Scrolling inside that window is a plain Treeview scroll;
+when the view nears the window's edge the same items are recycled for the
+rows around the new position, so the Treeview never holds the whole dataset.
+"""
+from datetime import datetime
+import tkinter as tk
+from tkinter import ttk
+
+
+VIRTUAL_OVERSCAN_ROWS = 30 # Rows materialized above and below the visible ones
+DEFAULT_VISIBLE_ROWS = 20 # Until the widget has been laid out
+RECENTER_MARGIN_ROWS = 5 # Re-window when the view gets this close to an edge
+
+
+def _set_event_tree_id(event, tree_id):
+    event['tree_id'] = tree_id
+
+
+class VirtualTreeview:
+    """Shows a sorted sequence of events in a Treeview, materializing only a window of rows.
+
+    ``rows`` may be any sequence supporting len(), integer indexing and
+    slicing, such as the live views returned by EventStore.view().
+    format_row(item_id, event, now) returns the values tuple for a row and is
+    called whenever an item is (re)bound to an event; release_row(item_id) is
+    called when an item is unbound. set_tree_id(event, item_id) records which
+    item currently shows an event (None while it is scrolled out of the
+    window); by default it just sets the event's 'tree_id'.
+    """
+
+    def __init__(self, tree, scrollbar, format_row, release_row=None, set_tree_id=None, overscan=VIRTUAL_OVERSCAN_ROWS):
+        self.tree = tree; self.scrollbar = scrollbar
+        self.format_row = format_row; self.release_row = release_row
+        self.set_tree_id = set_tree_id or _set_event_tree_id
+        self.overscan = overscan
+        self.rows = []
+        self.top = 0 # Index in rows of the first visible row
+        self.visible_rows = DEFAULT_VISIBLE_ROWS
+        self.window_start = 0 # Index in rows of the first materialized row
+        self.slots = [] # Treeview item ids; slots[i] shows rows[window_start + i]
+        self.slot_events = {} # item id -> event it shows
+        self.slot_stripes = {} # item id -> 'evenrow'/'oddrow' tag it currently has
+        self.selected = {} # id(event) -> event; selection survives item recycling
+        self._recenter_job = None
+        tree.configure(yscrollcommand=self._on_tree_scrolled)
+        scrollbar.configure(command=self.yview)
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+        tree.bind('<Configure>', self._on_configure, add='+')
+
+    def __len__(self):
+        return len(self.rows)
+
+    # --- Model ---
+
+    def set_rows(self, rows, top=None):
+        """Shows a new (or re-sorted) sequence of rows, keeping the scroll position unless top is given."""
+        self.rows = rows
+        self._render_window(self.top if top is None else top)
+
+    def refresh(self):
+        """Re-renders the materialized window from the current rows."""
+        self._render_window(self.top)
+
+    def insert_row(self, index):
+        """Call after rows gained a row at index: creates at most one item and restripes below it."""
+        window_end = self.window_start + len(self.slots)
+        if index < self.window_start:
+            # Above the window: keep the same rows on screen, their indices just moved down
+            self.window_start += 1; self.top += 1
+            self._restripe_from(0)
+        elif index < window_end or len(self.slots) < self._window_size():
+            position = index - self.window_start
+            self._bind_new_slot(position, index)
+            if len(self.slots) > self._window_size(): # Keep the window size: drop the far end
+                last_slot = self.slots.pop(); self._unbind(last_slot); self.tree.delete(last_slot)
+            self._restripe_from(position + 1)
+        self._update_scrollbar()
+
+    def remove_row(self, index):
+        """Call after rows lost the row at index: deletes at most one item and refills the window."""
+        window_end = self.window_start + len(self.slots)
+        if index < self.window_start:
+            self.window_start -= 1; self.top = max(0, self.top - 1)
+            self._restripe_from(0)
+        elif index < window_end:
+            position = index - self.window_start
+            slot = self.slots.pop(position); self._unbind(slot); self.tree.delete(slot)
+            # Pull in the next row below the window, or the one above it at the end of the list
+            if self.window_start + len(self.slots) < len(self.rows):
+                self._bind_new_slot(len(self.slots), self.window_start + len(self.slots))
+            elif self.window_start > 0:
+                self.window_start -= 1; self._bind_new_slot(0, self.window_start); position += 1
+            self._restripe_from(position)
+        self._update_scrollbar()
+
+    def _bind_new_slot(self, position, index):
+        """Creates an item at slots[position] showing rows[index]."""
+        event = self.rows[index]; stripe = 'evenrow' if index % 2 == 0 else 'oddrow'
+        slot = self.tree.insert('', position, tags=(stripe,))
+        self.tree.item(slot, values=self.format_row(slot, event, datetime.now()))
+        self.slots.insert(position, slot)
+        self.slot_events[slot] = event; self.slot_stripes[slot] = stripe
+        self.set_tree_id(event, slot)
+
+    def selected_events(self):
+        return list(self.selected.values())
+
+    def clear_selection(self):
+        self.selected.clear()
+        try:
+            if self.tree.selection(): self.tree.selection_set(())
+        except tk.TclError: pass
+
+    # --- Window Materialization ---
+
+    def _window_size(self):
+        return min(len(self.rows), self.visible_rows + 2 * self.overscan)
+
+    def _render_window(self, top):
+        total = len(self.rows)
+        top = max(0, min(top, total - self.visible_rows))
+        window_len = self._window_size()
+        window_start = max(0, min(top - self.overscan, total - window_len))
+        focused_event = self.slot_events.get(self.tree.focus())
+
+        # Grow or shrink the item pool; surviving items are recycled below
+        while len(self.slots) < window_len: self.slots.append(self.tree.insert('', tk.END))
+        while len(self.slots) > window_len:
+            slot = self.slots.pop(); self._unbind(slot); self.tree.delete(slot)
+
+        now = datetime.now()
+        window_rows = self.rows[window_start:window_start + window_len] # One read of the model
+        for offset, slot in enumerate(self.slots):
+            index = window_start + offset; event = window_rows[offset]
+            stripe = 'evenrow' if index % 2 == 0 else 'oddrow'
+            if self.slot_events.get(slot) is event:
+                if self.slot_stripes.get(slot) != stripe: # Same event, only its row parity moved
+                    self.tree.item(slot, tags=(stripe,)); self.slot_stripes[slot] = stripe
+                continue
+            self._unbind(slot)
+            self.tree.item(slot, values=self.format_row(slot, event, now), tags=(stripe,))
+            self.slot_events[slot] = event; self.slot_stripes[slot] = stripe
+            self.set_tree_id(event, slot)
+
+        self.window_start = window_start; self.top = top
+        self._restore_selection(focused_event)
+        if window_len: self.tree.yview_moveto((top - window_start) / window_len) # Calls back _on_tree_scrolled
+        else: self._update_scrollbar()
+
+    def _unbind(self, slot):
+        event = self.slot_events.pop(slot, None)
+        if event is None: return
+        self.slot_stripes.pop(slot, None)
+        if event['tree_id'] == slot: self.set_tree_id(event, None)
+        if self.release_row: self.release_row(slot)
+
+    def _restore_selection(self, focused_event):
+        selected_slots = [slot for slot in self.slots if id(self.slot_events[slot]) in self.selected]
+        if tuple(selected_slots) != self.tree.selection(): self.tree.selection_set(selected_slots)
+        if focused_event is not None and focused_event['tree_id'] in self.slot_events:
+            self.tree.focus(focused_event['tree_id'])
+
+    def restripe(self):
+        """Re-applies the odd/even row tags to every materialized item."""
+        self.slot_stripes.clear()
+        self._restripe_from(0)
+
+    def _restripe_from(self, position):
+        """Fixes the odd/even tags of the items from position on, touching only those that changed."""
+        for offset in range(position, len(self.slots)):
+            slot = self.slots[offset]
+            stripe = 'evenrow' if (self.window_start + offset) % 2 == 0 else 'oddrow'
+            if self.slot_stripes.get(slot) != stripe:
+                self.tree.item(slot, tags=(stripe,)); self.slot_stripes[slot] = stripe
+
+    # --- Scrolling ---
+
+    def yview(self, *args):
+        """Scrollbar command: 'moveto fraction' or 'scroll n units|pages' over the whole row set."""
+        total = len(self.rows)
+        if not args or not total: return
+        if args[0] == 'moveto': top = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            top = self.top + int(args[1]) * step
+        else: return
+        self.scroll_to(top)
+
+    def scroll_to(self, top):
+        """Makes rows[top] the first visible row, recycling items only if it leaves the window."""
+        top = max(0, min(top, len(self.rows) - self.visible_rows))
+        offset = top - self.window_start
+        if self.slots and 0 <= offset and offset + self.visible_rows <= len(self.slots) and not self._near_edge(offset):
+            self.top = top
+            self.tree.yview_moveto(offset / len(self.slots)) # Plain Treeview scroll within the window
+        else:
+            self._render_window(top)
+
+    def _near_edge(self, offset):
+        near_start = offset < RECENTER_MARGIN_ROWS and self.window_start > 0
+        near_end = (offset + self.visible_rows > len(self.slots) - RECENTER_MARGIN_ROWS
+                    and self.window_start + len(self.slots) < len(self.rows))
+        return near_start or near_end
+
+    def _on_tree_scrolled(self, first, last):
+        """yscrollcommand of the Treeview: every scroll (wheel, keys, see()) ends up here."""
+        first = float(first); last = float(last)
+        if self.slots:
+            offset = int(round(first * len(self.slots)))
+            self.top = self.window_start + offset
+            if last - first < 1.0: self.visible_rows = max(1, int(round((last - first) * len(self.slots))))
+            if self._near_edge(offset) and not self._recenter_job:
+                self._recenter_job = self.tree.after_idle(self._recenter)
+        self._update_scrollbar()
+
+    def _recenter(self):
+        self._recenter_job = None
+        try: self._render_window(self.top)
+        except tk.TclError: pass # Widget destroyed
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total: self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_rows) / total))
+        else: self.scrollbar.set(0.0, 1.0)
+
+    def _on_configure(self, event=None):
+        """Estimates the visible row count from the widget height when the tree is resized."""
+        try:
+            row_height = int(ttk.Style(self.tree).lookup('Treeview', 'rowheight') or 20)
+            visible_rows = max(1, self.tree.winfo_height() // row_height - 1) # Minus the heading row
+        except (tk.TclError, ValueError): return
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            if len(self.slots) < self._window_size() or self._near_edge(self.top - self.window_start):
+                self.refresh()
+
+    # --- Selection ---
+
+    def _on_select(self, event=None):
+        """Mirrors the Treeview selection for the materialized rows into ``selected``."""
+        for shown_event in self.slot_events.values(): self.selected.pop(id(shown_event), None)
+        for slot in self.tree.selection():
+            shown_event = self.slot_events.get(slot)
+            if shown_event is not None: self.selected[id(shown_event)] = shown_event